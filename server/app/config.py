@@ -1,6 +1,7 @@
 # Configuration settings for the AI Personality Assessment System
 # This file manages environment variables and application settings
 
+import json
 import os
 from dotenv import load_dotenv
 
@@ -15,12 +16,171 @@ class Settings:
     # Database configuration
     # Uses SQLite by default, but can be configured for other databases via environment variable
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./personality_assessment.db")
+
+    # Optional read replicas, as a comma separated list of URLs. Read-only endpoints are spread
+    # over them round-robin; a replica that errors is skipped for DB_REPLICA_RETRY_SECONDS.
+    # After a client commits, its reads go to the primary for DB_READ_YOUR_WRITES_SECONDS.
+    DATABASE_READ_URLS: list = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+    DB_REPLICA_RETRY_SECONDS: float = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+    DB_READ_YOUR_WRITES_SECONDS: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Connection pool settings, applied per process (each server worker has its own pool)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # SQLite tuning, applied to every new connection when DATABASE_URL is a SQLite URL
+    # WAL lets readers proceed while a writer commits; busy_timeout makes writers wait instead of
+    # failing with "database is locked"; SQLITE_CACHE_SIZE is in KiB when negative
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
     
     # OpenRouter AI service configuration
     # Required for generating questions and analyzing responses
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY")
     OPENROUTER_API_URL: str = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1")
-    
+    OPENROUTER_MODEL: str = os.getenv("OPENROUTER_MODEL", "anthropic/claude-3-opus-20240229")
+
+    # LLM providers and per-operation models (app.services.llm_providers). A route is a model
+    # name served by LLM_PROVIDER ('openrouter', 'openai' for any OpenAI-compatible server at
+    # LLM_OPENAI_API_URL, or 'mock'), or 'provider:model'. Question generation and response
+    # analysis default to a cheap, fast model; profiles to OPENROUTER_MODEL. LLM_OPENAI_API_URL
+    # has no default (this API itself listens on localhost:8000): the 'openai' provider counts as
+    # not configured until it is set, e.g. to http://localhost:11434/v1 for a local Ollama server.
+    # LLM_MODEL_PRICES is a JSON object of model -> [prompt, completion] USD per million tokens
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openrouter")
+    LLM_MODEL_QUESTIONS: str = os.getenv("LLM_MODEL_QUESTIONS", "anthropic/claude-3-haiku")
+    LLM_MODEL_ANALYSIS: str = os.getenv("LLM_MODEL_ANALYSIS", "anthropic/claude-3-haiku")
+    LLM_MODEL_PROFILE: str = os.getenv("LLM_MODEL_PROFILE", OPENROUTER_MODEL)
+    LLM_OPENAI_API_URL: str = os.getenv("LLM_OPENAI_API_URL", "")
+    LLM_OPENAI_API_KEY: str = os.getenv("LLM_OPENAI_API_KEY")
+    LLM_MOCK_LATENCY_SECONDS: float = float(os.getenv("LLM_MOCK_LATENCY_SECONDS", "0.05"))
+    LLM_MODEL_PRICES: dict = json.loads(os.getenv("LLM_MODEL_PRICES") or json.dumps({
+        "anthropic/claude-3-opus-20240229": [15.0, 75.0],
+        "anthropic/claude-3-haiku": [0.25, 1.25],
+    }))
+
+    # LLM admission control: concurrency and rate limits for outgoing LLM calls
+    # LLM_LIMITER_BACKEND is 'memory' (per process) or 'database' (shared by all workers)
+    LLM_MAX_IN_FLIGHT: int = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "100000"))
+    LLM_LIMITER_BACKEND: str = os.getenv("LLM_LIMITER_BACKEND", "memory")
+    LLM_COMPLETION_TOKEN_ESTIMATE: int = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "512"))
+
+    # Token budgets: candidate responses longer than LLM_RESPONSE_TOKEN_BUDGET are compacted
+    # ('extractive' keeps key sentences, 'truncate' keeps the start) before analysis, and each
+    # operation requests at most this many completion tokens
+    LLM_RESPONSE_TOKEN_BUDGET: int = int(os.getenv("LLM_RESPONSE_TOKEN_BUDGET", "600"))
+    LLM_COMPACTION_STRATEGY: str = os.getenv("LLM_COMPACTION_STRATEGY", "extractive")
+    LLM_COMPLETION_TOKENS_QUESTIONS: int = int(os.getenv("LLM_COMPLETION_TOKENS_QUESTIONS", "400"))
+    LLM_COMPLETION_TOKENS_ANALYSIS: int = int(os.getenv("LLM_COMPLETION_TOKENS_ANALYSIS", "300"))
+    LLM_COMPLETION_TOKENS_PROFILE: int = int(os.getenv("LLM_COMPLETION_TOKENS_PROFILE", "800"))
+
+    # Response scoring configuration
+    # SCORING_MODE is one of: 'llm' (LLM with local fallback), 'local' (local scorer only),
+    # or 'hybrid' (local first, escalating low-confidence responses to the LLM)
+    SCORING_MODE: str = os.getenv("SCORING_MODE", "llm")
+    LOCAL_SCORER_MODEL_PATH: str = os.getenv("LOCAL_SCORER_MODEL_PATH", "./local_scorer.json")
+    LOCAL_SCORER_CONFIDENCE_THRESHOLD: float = float(os.getenv("LOCAL_SCORER_CONFIDENCE_THRESHOLD", "0.6"))
+
+    # Scoring runs once per assessment: the request that claims it sets status 'scoring', others
+    # wait for its result. A claim older than SCORING_CLAIM_TIMEOUT_SECONDS is considered abandoned.
+    SCORING_CLAIM_TIMEOUT_SECONDS: float = float(os.getenv("SCORING_CLAIM_TIMEOUT_SECONDS", "300"))
+    SCORING_POLL_SECONDS: float = float(os.getenv("SCORING_POLL_SECONDS", "1"))
+    # Idempotency-Key records of mutating assessment requests are kept this long
+    IDEMPOTENCY_TTL_HOURS: float = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+    # Bulk re-scoring (app.services.rescore_service): assessments scored at once and per minute
+    RESCORE_CONCURRENCY: int = int(os.getenv("RESCORE_CONCURRENCY", "4"))
+    RESCORE_MAX_PER_MINUTE: int = int(os.getenv("RESCORE_MAX_PER_MINUTE", "30"))
+    RESCORE_BATCH_SIZE: int = int(os.getenv("RESCORE_BATCH_SIZE", "50"))
+
+    # Question selection: 'adaptive' asks the most informative question next and ends the
+    # assessment once every trait's standard error is within ASSESSMENT_TARGET_STDERR (0-100 scale);
+    # 'fixed' ends it after ASSESSMENT_MIN_QUESTIONS responses
+    ASSESSMENT_SELECTION_MODE: str = os.getenv("ASSESSMENT_SELECTION_MODE", "adaptive")
+    ASSESSMENT_MIN_QUESTIONS: int = int(os.getenv("ASSESSMENT_MIN_QUESTIONS", "5"))
+    ASSESSMENT_MAX_QUESTIONS: int = int(os.getenv("ASSESSMENT_MAX_QUESTIONS", "15"))
+    ASSESSMENT_TARGET_STDERR: float = float(os.getenv("ASSESSMENT_TARGET_STDERR", "12"))
+    # Near-duplicate questions: minimum Jaccard similarity of two questions' word shingles (stemmed
+    # words and word pairs) for them to count as duplicates. Rewordings of one question score
+    # about 0.7-1.0, different questions about the same trait rarely above 0.3
+    QUESTION_DUPLICATE_MIN_JACCARD: float = float(os.getenv("QUESTION_DUPLICATE_MIN_JACCARD", "0.5"))
+    # Pre-generated question pool: kept at QUESTION_POOL_TARGET questions per trait and difficulty,
+    # refilled in the background once a bucket drops below QUESTION_POOL_LOW_WATERMARK
+    QUESTION_POOL_ENABLED: bool = os.getenv("QUESTION_POOL_ENABLED", "true").lower() == "true"
+    QUESTION_POOL_TARGET: int = int(os.getenv("QUESTION_POOL_TARGET", "5"))
+    QUESTION_POOL_LOW_WATERMARK: int = int(os.getenv("QUESTION_POOL_LOW_WATERMARK", "2"))
+    QUESTION_POOL_DIFFICULTIES: list = [int(d) for d in os.getenv("QUESTION_POOL_DIFFICULTIES", "1,2,3,4,5").split(",") if d.strip()]
+    QUESTION_POOL_CHECK_SECONDS: float = float(os.getenv("QUESTION_POOL_CHECK_SECONDS", "300"))
+    QUESTION_BANK_TTL_SECONDS: float = float(os.getenv("QUESTION_BANK_TTL_SECONDS", "300"))
+
+    # WebSocket assessment sessions buffer answers and persist them every WS_FLUSH_ANSWERS answers
+    # or WS_FLUSH_SECONDS after the oldest unsaved one, and on completion or disconnect
+    WS_FLUSH_ANSWERS: int = int(os.getenv("WS_FLUSH_ANSWERS", "5"))
+    WS_FLUSH_SECONDS: float = float(os.getenv("WS_FLUSH_SECONDS", "5"))
+    WS_AUTH_TIMEOUT_SECONDS: float = float(os.getenv("WS_AUTH_TIMEOUT_SECONDS", "10"))
+    WS_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "1800"))
+
+    # Full-text search ranks only the newest matches of very common terms
+    SEARCH_MAX_RANKED_MATCHES: int = int(os.getenv("SEARCH_MAX_RANKED_MATCHES", "5000"))
+
+    # HTTP caching and compression: completed results may be reused by the browser for
+    # HTTP_RESULT_MAX_AGE_SECONDS without revalidating (a re-scoring cutover can still replace
+    # them); responses of at least COMPRESSION_MINIMUM_SIZE bytes are compressed, with brotli
+    # when the client accepts it and the brotli package is installed, otherwise with gzip
+    HTTP_RESULT_MAX_AGE_SECONDS: int = int(os.getenv("HTTP_RESULT_MAX_AGE_SECONDS", "300"))
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # Load shedding: requests run at most this many at once per route class (reads, writes and
+    # LLM-backed scoring) in each worker. Up to LOAD_SHED_MAX_QUEUE more wait at most
+    # LOAD_SHED_MAX_WAIT_SECONDS; beyond that, and for scoring while more than
+    # LOAD_SHED_LLM_QUEUE_DEPTH LLM calls are queued, the API answers 503 with Retry-After
+    LOAD_SHED_ENABLED: bool = os.getenv("LOAD_SHED_ENABLED", "true").lower() == "true"
+    LOAD_SHED_READ_CONCURRENCY: int = int(os.getenv("LOAD_SHED_READ_CONCURRENCY", "64"))
+    LOAD_SHED_WRITE_CONCURRENCY: int = int(os.getenv("LOAD_SHED_WRITE_CONCURRENCY", "16"))
+    LOAD_SHED_SCORING_CONCURRENCY: int = int(os.getenv("LOAD_SHED_SCORING_CONCURRENCY", "8"))
+    LOAD_SHED_MAX_QUEUE: int = int(os.getenv("LOAD_SHED_MAX_QUEUE", "32"))
+    LOAD_SHED_MAX_WAIT_SECONDS: float = float(os.getenv("LOAD_SHED_MAX_WAIT_SECONDS", "2"))
+    LOAD_SHED_LLM_QUEUE_DEPTH: int = int(os.getenv("LOAD_SHED_LLM_QUEUE_DEPTH", "32"))
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = int(os.getenv("LOAD_SHED_RETRY_AFTER_SECONDS", "5"))
+
+    # Request tracing (app.tracing): TRACING_EXPORTER is 'none', 'file' (JSON lines at
+    # TRACING_FILE_PATH) or 'otlp' (OTLP/HTTP JSON to TRACING_OTLP_ENDPOINT). A fraction
+    # TRACING_SAMPLE_RATE of new traces is recorded; with TRACING_PROPAGATE an incoming W3C
+    # traceparent header continues the caller's trace and is forwarded to the LLM provider
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+    TRACING_PROPAGATE: bool = os.getenv("TRACING_PROPAGATE", "true").lower() == "true"
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "./traces.jsonl")
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "personality-assessment-api")
+
+    # On-demand profiling endpoints under /api/admin/profile (admin users only)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", "60"))
+
+    # Server configuration used by app.serve (production) and run.py
+    # WEB_CONCURRENCY defaults to the number of CPU cores when unset
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    SERVER_KEEP_ALIVE: int = int(os.getenv("SERVER_KEEP_ALIVE", "5"))
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    SERVER_WORKER_TIMEOUT: int = int(os.getenv("SERVER_WORKER_TIMEOUT", "120"))
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+    SERVER_LOOP: str = os.getenv("SERVER_LOOP", "auto")
+    SERVER_HTTP: str = os.getenv("SERVER_HTTP", "auto")
+
     # CORS configuration for frontend communication
     # Add additional origins as needed for different environments
     CORS_ORIGINS: list = ["http://localhost:3000"]  # Frontend URL
@@ -28,6 +188,8 @@ class Settings:
     # JWT authentication configuration
     # IMPORTANT: Change the secret key in production!
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
+    # Refresh tokens let clients get new access tokens at /api/auth/refresh without a password
+    REFRESH_TOKEN_EXPIRE_DAYS: float = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
 
 # Create a singleton instance of Settings
 settings = Settings()
\ No newline at end of file
@@ -1,22 +1,239 @@
 # Database configuration and session management
-# This file sets up SQLAlchemy engine, session factory, and database connection handling
+# This file sets up SQLAlchemy engine, session factory, and database connection handling.
+# The module-level engine is the only engine the application uses for the primary; init_db,
+# background jobs and the server workers all share it (and its connection pool).
+# Read-only endpoints use get_read_db, which may be routed to read replicas.
 
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi.requests import HTTPConnection
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMA statements applied to every new SQLite connection, in order."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: Optional[str] = None, **overrides) -> Engine:
+    """Create an engine with the configured pool and, for SQLite, production PRAGMAs
+
+    Args:
+        url: Database URL, defaults to settings.DATABASE_URL
+        **overrides: Extra keyword arguments passed to create_engine
+
+    Returns:
+        Engine: Configured SQLAlchemy engine
+    """
+    url = make_url(url or settings.DATABASE_URL)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE}
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    if is_sqlite:
+        # Connections are handed between the threadpool threads FastAPI runs sync routes on;
+        # the Python-level timeout matches busy_timeout for locks taken while opening
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not in_memory:
+        # In-memory SQLite keeps SQLAlchemy's single-connection pool, a queue pool would
+        # give each connection its own empty database
+        options.update(
+            poolclass=QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    options.update(overrides)
+
+    new_engine = create_engine(url, **options)
+    if is_sqlite:
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
 # Create SQLAlchemy engine instance using the configured database URL
-engine = create_engine(settings.DATABASE_URL)
+engine = build_engine()
 
 # Create session factory with autocommit and autoflush disabled for better control
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+
+class ReplicaRouter:
+    """Round-robin selection over read replica engines with health-based skipping
+
+    A replica whose connection fails or drops is marked down and skipped until
+    its cooldown expires. With no healthy replica, reads go to the primary.
+
+    Attributes:
+        primary (Engine): Engine used when no replica is available
+        replicas (List[Engine]): One engine per configured replica URL
+        retry_seconds (float): How long a failed replica is skipped
+    """
+    def __init__(self, primary: Engine, urls: List[str], retry_seconds: float):
+        self.primary = primary
+        self.replicas = [build_engine(url) for url in urls]
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(self.replicas)
+        self._counter = itertools.count()
+        for index, replica in enumerate(self.replicas):
+            event.listen(replica, "handle_error", self._error_handler(index))
+
+    def choose(self) -> Engine:
+        """Return the next healthy replica, or the primary if none is healthy."""
+        count = len(self.replicas)
+        if not count:
+            return self.primary
+        now = time.monotonic()
+        start = next(self._counter)
+        for offset in range(count):
+            index = (start + offset) % count
+            if self._down_until[index] <= now:
+                return self.replicas[index]
+        return self.primary
+
+    def mark_down(self, index: int) -> None:
+        if self._down_until[index] <= time.monotonic():
+            logger.warning("Read replica %s failed, skipping it for %.0fs",
+                           self.replicas[index].url.render_as_string(hide_password=True), self.retry_seconds)
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def _error_handler(self, index: int):
+        def handle_error(context) -> None:
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                self.mark_down(index)
+        return handle_error
+
+    def stats(self) -> List[Dict[str, object]]:
+        now = time.monotonic()
+        return [
+            {"url": replica.url.render_as_string(hide_password=True), "healthy": self._down_until[i] <= now}
+            for i, replica in enumerate(self.replicas)
+        ]
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            replica.dispose(close=close)
+
+
+class RecentWriters:
+    """Clients that committed recently and must read from the primary
+
+    Tracked per process; a client is identified by its bearer token or address.
+    """
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) > 10000:
+                self._until = {k: until for k, until in self._until.items() if until > now}
+            self._until[key] = now + self.window_seconds
+
+    def is_recent(self, key: str) -> bool:
+        return self._until.get(key, 0.0) > time.monotonic()
+
+
+def client_key(connection: HTTPConnection) -> str:
+    """Identify the client behind a request or WebSocket for read-your-writes stickiness."""
+    credentials = connection.headers.get("authorization")
+    if credentials:
+        return hashlib.sha256(credentials.encode()).hexdigest()
+    return connection.client.host if connection.client else ""
+
+
+class ReadSession(Session):
+    """Session for read-only endpoints, bound lazily to a replica or the primary
+
+    The bind is re-checked for every statement, so a commit made through
+    get_db earlier in the same request moves later reads to the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        state = self.info.get("request_state")
+        if state is not None and getattr(state, "db_committed", False):
+            return engine
+        return self.info.get("read_bind") or engine
+
+
+def _reject_flush(session, flush_context, instances) -> None:
+    raise exc.InvalidRequestError("Read-only session cannot flush changes, use get_db for writes")
+
+
+event.listen(ReadSession, "before_flush", _reject_flush)
+
+replica_router = ReplicaRouter(engine, settings.DATABASE_READ_URLS, settings.DB_REPLICA_RETRY_SECONDS)
+recent_writers = RecentWriters(settings.DB_READ_YOUR_WRITES_SECONDS)
+ReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
+
+
 # Dependency function to manage database sessions
-# This ensures proper session handling and cleanup for each request
-def get_db():
+# This ensures proper session handling and cleanup for each request or WebSocket
+def get_db(connection: HTTPConnection):
     db = SessionLocal()
+
+    def after_commit(session) -> None:
+        # Later reads in this request, and from this client for a short window, use the primary
+        connection.state.db_committed = True
+        recent_writers.mark(client_key(connection))
+
+    event.listen(db, "after_commit", after_commit)
     try:
         yield db  # Use as a context manager to handle session lifecycle
     finally:
-        db.close()  # Ensure session is closed even if an error occurs
\ No newline at end of file
+        db.close()  # Ensure session is closed even if an error occurs
+
+
+# Dependency function for read-only endpoints
+# Reads go to a read replica when configured, except for clients that just wrote
+def get_read_db(connection: HTTPConnection):
+    read_bind = engine
+    if replica_router.replicas and not recent_writers.is_recent(client_key(connection)):
+        read_bind = replica_router.choose()
+    db = ReadSessionLocal(info={"read_bind": read_bind, "request_state": connection.state})
+    while read_bind is not engine:
+        # Connect before the route runs so an unreachable replica fails over instead of
+        # failing the request; the failed replica is marked down by its error handler
+        try:
+            db.connection()
+            break
+        except exc.OperationalError:
+            db.close()
+            read_bind = replica_router.choose()
+            db.info["read_bind"] = read_bind
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+# HTTP Caching Module
+# This module implements conditional GETs for read endpoints whose content rarely changes.
+# A route derives a validator (ETag and Last-Modified) from a cheap query, such as a row's
+# updated_at, and answers 304 Not Modified before loading or serializing anything when the
+# client's copy is still current. Timestamps have one-second resolution, so an ETag must
+# also include something that changes with every write within the same second: a content
+# digest, a row count or ID, or a version counter.
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that determine a response body
+
+    The tag is weak because the body is byte-identical only per Content-Encoding,
+    which the compression middleware chooses per client.
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def content_digest(value: Any) -> str:
+    """Digest of a JSON-compatible value, independent of key order, for use in make_etag."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every stored time is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Whether the client's cached copy is current (RFC 9110 section 13.1)
+
+    If-None-Match takes precedence and uses weak comparison; If-Modified-Since
+    is only consulted when it is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tag = _strip_weak(etag)
+        return any(_strip_weak(candidate) == tag for candidate in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second precision
+        return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+    return False
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "private, no-cache"
+) -> None:
+    """Set the validator and Cache-Control headers on a response."""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_utc(last_modified).replace(microsecond=0), usegmt=True)
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "private, no-cache"
+) -> Response:
+    """Build a 304 Not Modified response carrying the same cache headers as a 200."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified, cache_control)
+    return response
@@ -1,12 +1,12 @@
-from sqlalchemy import create_engine
-from app.config import settings
+from app.database import engine
 from app.models.base import Base
 from app.models import Candidate, Question, Assessment
+from app.models.user import User
 
 def init_db():
-    engine = create_engine(settings.DATABASE_URL)
+    # Reuse the application engine so its SQLite PRAGMAs and pool settings apply here too
     Base.metadata.create_all(bind=engine)
     print("Database tables created.")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -1,14 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import questions, assessments, candidates, auth
+from app.middleware import CompressionMiddleware, LoadSheddingMiddleware, TracingMiddleware
+from app.tracing import instrument_sqlalchemy, tracer
+from app.routes import questions, assessments, candidates, auth, metrics, search, admin
+from app.services.llm_providers import llm_configured
+from app.services.question_pool_service import get_question_pool
 
 # Initialize FastAPI application with metadata
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version=settings.PROJECT_VERSION
+    version=settings.PROJECT_VERSION,
+    default_response_class=ORJSONResponse
 )
 
+# Shed load per route class before requests pile up behind a slow LLM provider
+# (added first so that it runs inside CORS, and 503 responses carry CORS headers)
+if settings.LOAD_SHED_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware)
+
 # Configure CORS middleware to allow cross-origin requests from the frontend
 app.add_middleware(
     CORSMiddleware,
@@ -18,11 +29,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli or gzip); SSE streams are passed through unbuffered
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Trace requests end to end (outermost, so the root span covers every other middleware)
+if tracer.enabled:
+    instrument_sqlalchemy()
+    app.add_middleware(TracingMiddleware)
+
 # routes
 app.include_router(questions, prefix="/api/questions", tags=["questions"])
 app.include_router(assessments, prefix="/api/assessments", tags=["assessments"])
 app.include_router(candidates, prefix="/api/candidates", tags=["candidates"])
 app.include_router(auth, prefix="/api/auth", tags=["auth"])
+app.include_router(metrics, prefix="/api/metrics", tags=["metrics"])
+app.include_router(search, prefix="/api/search", tags=["search"])
+if settings.PROFILING_ENABLED:
+    app.include_router(admin, prefix="/api/admin", tags=["admin"])
+
+# Background refill of the pre-generated question pool
+@app.on_event("startup")
+async def start_question_pool():
+    if settings.QUESTION_POOL_ENABLED and llm_configured():
+        get_question_pool().start()
+
+@app.on_event("shutdown")
+async def stop_question_pool():
+    await get_question_pool().stop()
 
 # Root endpoint to verify API is running
 @app.get("/")
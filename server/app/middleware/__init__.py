@@ -0,0 +1,8 @@
+# Middleware Package
+# This package contains the ASGI middleware installed by app.main
+
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware, get_load_shedder
+from app.middleware.tracing import TracingMiddleware
+
+__all__ = ["CompressionMiddleware", "LoadSheddingMiddleware", "TracingMiddleware", "get_load_shedder"]
@@ -0,0 +1,128 @@
+# Compression Middleware Module
+# This module compresses HTTP response bodies with brotli when the client accepts it and the
+# optional brotli package is installed, and with gzip otherwise. Bodies smaller than the
+# threshold, already-encoded responses and Server-Sent Events streams are sent unchanged.
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Streaming responses whose chunks must reach the client as soon as they are sent
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None
+
+    Codings with q=0 are treated as refused.
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor with a common interface for gzip and brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            # wbits 31 selects the gzip container
+            compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """Compress responses of at least `minimum_size` bytes
+
+    Args:
+        app: ASGI application
+        minimum_size: Smallest body, in bytes, worth compressing
+        gzip_level: zlib compression level (1-9)
+        brotli_quality: brotli quality (0-11); low values compress nearly as well as gzip -9 and faster
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+            if encoding is not None:
+                responder = _CompressionResponder(self, encoding, send)
+                await self.app(scope, receive, responder.send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    """Rewrites the messages of one response, deciding on the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message shows whether to compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or content_type.startswith(UNCOMPRESSED_CONTENT_TYPES)
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start, self.start_message = self.start_message, None
+        if start is not None:
+            if not self.passthrough and (more_body or len(body) >= self.middleware.minimum_size):
+                self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+            else:
+                self.passthrough = True
+
+        if not self.passthrough:
+            body = self.compressor.compress(body)
+            if not more_body:
+                body += self.compressor.finish()
+            if start is not None and not more_body:
+                # Whole body in one message: its compressed length is known
+                MutableHeaders(raw=start["headers"])["Content-Length"] = str(len(body))
+            message = {**message, "body": body}
+        if start is not None:
+            await self._send(start)
+        await self._send(message)
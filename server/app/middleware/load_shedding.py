@@ -0,0 +1,214 @@
+# Load Shedding Middleware Module
+# This module limits how many requests of each route class run at once, so a slow LLM
+# provider backs up only the scoring endpoints instead of every worker. Requests over a
+# class's limit wait in a short bounded queue; once the queue is full, the wait is too long,
+# or the LLM admission queue or database pool is saturated, they fail fast with 503 and a
+# Retry-After header. A response submit that would be shed for scoring is still accepted,
+# with its scoring deferred to the result stream endpoint.
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+READ, WRITE, SCORING = "read", "write", "scoring"
+
+# (method, path pattern, class, degradable); the first match wins, then GET/HEAD are reads
+# and everything else a write. A degradable scoring request is admitted as a write when
+# scoring is overloaded, with scope state 'defer_scoring' set for the route.
+ROUTE_CLASSES = (
+    ("POST", re.compile(r"^/api/assessments/\d+/submit/?$"), SCORING, True),
+    ("GET", re.compile(r"^/api/assessments/\d+/result/stream/?$"), SCORING, False),
+    ("POST", re.compile(r"^/api/questions/generate/?$"), SCORING, False),
+)
+
+
+def classify(method: str, path: str) -> Tuple[str, bool]:
+    """Return the route class of a request and whether its scoring can be deferred."""
+    for rule_method, pattern, route_class, degradable in ROUTE_CLASSES:
+        if method == rule_method and pattern.match(path):
+            return route_class, degradable
+    return (READ if method in ("GET", "HEAD") else WRITE), False
+
+
+class ConcurrencyLimit:
+    """Concurrency limit with a bounded, time-limited wait queue for one route class
+
+    Attributes:
+        max_in_flight (int): Requests of the class allowed to run at once
+        max_queue (int): Requests allowed to wait for a slot
+        max_wait (float): Seconds a request may wait before it is shed
+    """
+    def __init__(self, max_in_flight: int, max_queue: int, max_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.queued = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.admitted = 0
+        self.shed = 0
+        self.max_queued = 0
+
+    def saturated(self) -> bool:
+        """Whether a new request would have to wait."""
+        return self.in_flight >= self.max_in_flight
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; False if the request should be shed instead."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending, before any later arrival is checked
+            await self._semaphore.acquire()
+        elif self.queued >= self.max_queue or not await self._wait():
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    async def _wait(self) -> bool:
+        """Queue for a slot for at most max_wait seconds."""
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.queued -= 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class LoadShedder:
+    """Per-route-class admission decisions for this process
+
+    Scoring is also shed while the LLM admission queue is longer than
+    LOAD_SHED_LLM_QUEUE_DEPTH, and writes and scoring while every database
+    connection is checked out, since those requests would only add to the backlog.
+    """
+    def __init__(self):
+        wait = settings.LOAD_SHED_MAX_WAIT_SECONDS
+        self.limits = {
+            READ: ConcurrencyLimit(settings.LOAD_SHED_READ_CONCURRENCY, settings.LOAD_SHED_MAX_QUEUE, wait),
+            WRITE: ConcurrencyLimit(settings.LOAD_SHED_WRITE_CONCURRENCY, settings.LOAD_SHED_MAX_QUEUE, wait),
+            SCORING: ConcurrencyLimit(settings.LOAD_SHED_SCORING_CONCURRENCY, settings.LOAD_SHED_MAX_QUEUE, wait),
+        }
+        self.deferred = 0
+        self.shed_reasons: Dict[str, int] = {"queue": 0, "llm_backlog": 0, "db_pool": 0}
+
+    @staticmethod
+    def llm_backlogged() -> bool:
+        from app.services.llm_limiter import get_llm_limiter
+
+        return get_llm_limiter().queue_depth >= settings.LOAD_SHED_LLM_QUEUE_DEPTH
+
+    @staticmethod
+    def db_pool_exhausted() -> bool:
+        from app.database import engine
+
+        pool = engine.pool
+        if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+            return False
+        return pool.checkedout() >= pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+
+    def overload_reason(self, route_class: str) -> Optional[str]:
+        """Reason to shed a request of this class before queueing it, if any."""
+        if route_class == SCORING and self.llm_backlogged():
+            return "llm_backlog"
+        if route_class in (WRITE, SCORING) and self.db_pool_exhausted():
+            return "db_pool"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "classes": {name: limit.stats() for name, limit in self.limits.items()},
+            "deferred_scoring": self.deferred,
+            "shed_reasons": dict(self.shed_reasons),
+        }
+
+
+_shedder: Optional[LoadShedder] = None
+
+
+def get_load_shedder() -> LoadShedder:
+    """Return the process-wide load shedder, creating it on first use."""
+    global _shedder
+    if _shedder is None:
+        _shedder = LoadShedder()
+    return _shedder
+
+
+class LoadSheddingMiddleware:
+    """Admission control for HTTP requests by route class
+
+    WebSocket sessions and CORS preflight requests are not limited.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        shedder = get_load_shedder()
+        route_class, degradable = classify(scope["method"], scope["path"])
+        reason = shedder.overload_reason(route_class)
+        if degradable and (reason == "llm_backlog" or shedder.limits[SCORING].saturated()):
+            # Accept the answer now and let the client fetch the result once scoring catches up
+            scope.setdefault("state", {})["defer_scoring"] = True
+            shedder.deferred += 1
+            route_class = WRITE
+            reason = shedder.overload_reason(WRITE)
+
+        limit = shedder.limits[route_class]
+        if reason is not None:
+            await self._reject(send, limit, shedder, reason)
+            return
+        if not await limit.acquire():
+            await self._reject(send, limit, shedder, "queue")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    @staticmethod
+    async def _reject(send: Send, limit: ConcurrencyLimit, shedder: LoadShedder, reason: str) -> None:
+        limit.shed += 1
+        shedder.shed_reasons[reason] += 1
+        body = orjson.dumps({"detail": "Server is overloaded, please retry later"})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.LOAD_SHED_RETRY_AFTER_SECONDS).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
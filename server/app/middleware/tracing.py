@@ -0,0 +1,47 @@
+# Tracing Middleware Module
+# This module opens the root span of every HTTP request, continuing the trace of an incoming
+# W3C traceparent header, and returns the trace ID in an X-Trace-Id response header
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.tracing import tracer
+
+
+class TracingMiddleware:
+    """Trace HTTP requests; WebSocket sessions are long-lived and not traced"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        root = tracer.start_span(
+            f"{scope['method']} {scope['path']}", "server",
+            traceparent=Headers(scope=scope).get("traceparent"),
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+
+        async def send_with_trace_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "error"
+                MutableHeaders(scope=message)["X-Trace-Id"] = root.trace_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            root.record_exception(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and hasattr(route, "path_format"):
+                # Name by the route template so spans of one endpoint group together
+                root.name = f"{scope['method']} {route.path_format}"
+                root.set_attribute("http.route", route.path_format)
+            tracer.end_span(root)
@@ -2,5 +2,14 @@ from .base import Base, BaseModel
 from .candidate import Candidate
 from .question import Question
 from .assessment import Assessment
+from .rate_limit import LLMRateBucket
+from .question_fingerprint import QuestionFingerprint
+from .question_pool import PooledQuestion
+from .candidate_traits import CandidateTraits
+from .search_document import SearchDocument
+from .assessment_result import AssessmentResultVersion
+from .rescore_job import RescoreJob
+from .idempotency_key import IdempotencyKey
+from .refresh_token import RefreshToken
 
-__all__ = ["Base", "BaseModel", "Candidate", "Question", "Assessment"]
\ No newline at end of file
+__all__ = ["Base", "BaseModel", "Candidate", "Question", "Assessment", "LLMRateBucket", "QuestionFingerprint", "PooledQuestion", "CandidateTraits", "SearchDocument", "AssessmentResultVersion", "RescoreJob", "IdempotencyKey", "RefreshToken"]
\ No newline at end of file
@@ -14,7 +14,8 @@ class Assessment(BaseModel):
     
     Attributes:
         candidate_id (int): Foreign key linking to the candidate being assessed
-        status (str): Current status of the assessment ('in_progress' or 'completed')
+        status (str): Current status of the assessment: 'in_progress', 'submitted' (waiting to be
+            scored), 'scoring' (claimed by the request scoring it) or 'completed'
         responses (dict): JSON field storing question responses as {question_id: response_text}
         result (dict): JSON field storing the final assessment results and analysis
         resume_file_path (str): Path to the candidate's uploaded resume PDF
@@ -23,7 +24,7 @@ class Assessment(BaseModel):
     __tablename__ = "assessments"
     
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
-    status = Column(String, default="in_progress")  # in_progress, completed
+    status = Column(String, default="in_progress")  # in_progress, submitted, scoring, completed
     responses = Column(JSON, default={})  # Stores question_id: response pairs
     result = Column(JSON, nullable=True)  # Stores the assessment results
     resume_file_path = Column(String, nullable=True)  # Stores the path to the uploaded resume PDF
@@ -0,0 +1,26 @@
+# Assessment Result Model Module
+# This module defines versioned assessment results written by re-scoring jobs, so results
+# from a new model or prompt can sit next to the live ones until they are cut over
+
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, UniqueConstraint
+from .base import BaseModel
+
+class AssessmentResultVersion(BaseModel):
+    """Result of an assessment under one scoring version
+
+    The live result stays in Assessment.result; rows here are only copied over
+    it when their version is cut over.
+
+    Attributes:
+        assessment_id (int): Assessment that was re-scored
+        version (str): Scoring version label, e.g. 'v2-sonnet'
+        model (str): LLM model the result was produced with
+        result (dict): Profile and per-response analyses, shaped like Assessment.result
+    """
+    __tablename__ = "assessment_results"
+    __table_args__ = (UniqueConstraint("version", "assessment_id", name="uq_assessment_results_version"),)
+
+    assessment_id = Column(Integer, ForeignKey("assessments.id"), nullable=False, index=True)
+    version = Column(String, nullable=False)
+    model = Column(String, nullable=True)
+    result = Column(JSON, nullable=False)
@@ -0,0 +1,30 @@
+# Candidate Traits Model Module
+# This module projects the Big Five scores and MBTI type of a candidate's profile into typed,
+# indexed columns so recruiters can filter candidates without parsing JSON
+
+from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from .base import BaseModel
+
+class CandidateTraits(BaseModel):
+    """Typed copy of the scores in Candidate.personality_profile
+
+    Kept in sync whenever an assessment result is written to the candidate,
+    and rebuilt for existing candidates by the backfill job in
+    app.services.candidate_trait_service.
+
+    Attributes:
+        candidate_id (int): Candidate the scores belong to
+        assessment_id (int): Assessment that produced the profile, if known
+        openness .. neuroticism (float): Big Five scores on a 0-100 scale
+        mbti (str): MBTI type, upper-case
+    """
+    __tablename__ = "candidate_traits"
+
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), unique=True, index=True, nullable=False)
+    assessment_id = Column(Integer, nullable=True)
+    openness = Column(Float, index=True)
+    conscientiousness = Column(Float, index=True)
+    extraversion = Column(Float, index=True)
+    agreeableness = Column(Float, index=True)
+    neuroticism = Column(Float, index=True)
+    mbti = Column(String(4), index=True)
@@ -0,0 +1,28 @@
+# Idempotency Key Model Module
+# This module defines stored outcomes of mutating requests sent with an Idempotency-Key header
+
+from sqlalchemy import Column, Integer, String, JSON, DateTime, UniqueConstraint
+from .base import BaseModel
+
+class IdempotencyKey(BaseModel):
+    """Outcome of a request made with an Idempotency-Key, replayed to retries
+
+    A row without a status code belongs to a request that is still running.
+
+    Attributes:
+        scope (str): User, method and path the key was used for
+        key (str): Client-chosen Idempotency-Key header value
+        request_hash (str): SHA-256 of the request payload, to reject key reuse with a different body
+        status_code (int): Response status, set once the request has succeeded
+        response (dict): Response body
+        expires_at (datetime): When the record may be purged
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),)
+
+    scope = Column(String(255), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,24 @@
+# Question Fingerprint Model Module
+# This module stores the MinHash LSH band keys of question texts for near-duplicate detection
+
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, Index
+from .base import BaseModel
+
+class QuestionFingerprint(BaseModel):
+    """One LSH band key of a question's MinHash signature
+
+    Each question has one row per band. Questions sharing any (band, key) pair
+    are near-duplicate candidates, found with one indexed lookup; candidates
+    are then confirmed by the exact Jaccard similarity of their shingles.
+
+    Attributes:
+        question_id (int): Question the key belongs to
+        band (int): Band number, 0 to LSH_BANDS - 1
+        key (int): Hash of the band's MinHash values, as a signed 64-bit integer
+    """
+    __tablename__ = "question_fingerprint_bands"
+    __table_args__ = (Index("ix_question_fingerprint_bands_band_key", "band", "key"),)
+
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True, nullable=False)
+    band = Column(Integer, nullable=False)
+    key = Column(BigInteger, nullable=False)
@@ -0,0 +1,23 @@
+# Question Pool Model Module
+# This module defines generated questions waiting in the pool before they enter the question bank
+
+from sqlalchemy import Column, String, Text, Integer, Index
+from .base import BaseModel
+
+class PooledQuestion(BaseModel):
+    """Generated question held in the pool until it is drawn into the bank
+
+    The pool is refilled in the background so drawing questions never waits on
+    the LLM. Drawn rows are deleted and saved as Question rows.
+
+    Attributes:
+        text (str): Generated question text
+        trait_category (str): Trait the question assesses
+        difficulty (int): Question difficulty rating on a 1-5 scale
+    """
+    __tablename__ = "question_pool"
+    __table_args__ = (Index("ix_question_pool_trait_difficulty", "trait_category", "difficulty"),)
+
+    text = Column(Text, nullable=False)
+    trait_category = Column(String, nullable=False)
+    difficulty = Column(Integer, nullable=False)
@@ -0,0 +1,22 @@
+# Rate Limit Model Module
+# This module defines the shared token buckets used to rate limit LLM calls across workers
+
+from sqlalchemy import Column, String, Float
+from .base import BaseModel
+
+class LLMRateBucket(BaseModel):
+    """Token bucket state shared by all API workers
+
+    Only used when LLM_LIMITER_BACKEND is 'database'. Buckets are refilled lazily:
+    the stored token count is valid as of refilled_at and grows at the bucket's rate.
+
+    Attributes:
+        name (str): Bucket name ('requests' or 'tokens')
+        tokens (float): Tokens available at refilled_at
+        refilled_at (float): Unix timestamp of the last refill
+    """
+    __tablename__ = "llm_rate_buckets"
+
+    name = Column(String, unique=True, index=True, nullable=False)
+    tokens = Column(Float, nullable=False)
+    refilled_at = Column(Float, nullable=False)
@@ -0,0 +1,30 @@
+# Refresh Token Model Module
+# This module defines the long-lived refresh tokens exchanged for new access tokens
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from .base import BaseModel
+from .user import User  # noqa: F401 - registers the users table referenced below
+
+class RefreshToken(BaseModel):
+    """Refresh token issued to a user, stored only as a hash
+
+    Every refresh replaces the token with a new one of the same family. A
+    token presented again after it was replaced means it has leaked, and the
+    whole family is revoked.
+
+    Attributes:
+        user_id (int): Owner of the token
+        token_hash (str): SHA-256 of the opaque token sent to the client
+        family_id (str): Shared by a login's token and all of its replacements
+        expires_at (datetime): When the token stops being accepted
+        revoked_at (datetime): When the token was rotated, logged out or revoked
+        replaced_by_id (int): Token issued in exchange for this one
+    """
+    __tablename__ = "refresh_tokens"
+
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by_id = Column(Integer, nullable=True)
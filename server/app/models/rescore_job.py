@@ -0,0 +1,36 @@
+# Rescore Job Model Module
+# This module defines the checkpoint and progress record of a bulk re-scoring job
+
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from .base import BaseModel
+
+class RescoreJob(BaseModel):
+    """Progress of re-scoring completed assessments into one result version
+
+    Assessments are walked in ID order and last_assessment_id is committed after
+    every batch, so an interrupted job resumes where it stopped.
+
+    Attributes:
+        version (str): Result version the job writes
+        model (str): LLM model used for scoring
+        status (str): 'running', 'paused' (stopped at a limit), 'interrupted' or 'completed'
+        last_assessment_id (int): Checkpoint, every assessment up to this ID has been attempted
+        total (int): Assessments to re-score when the job (re)started
+        processed (int): Assessments re-scored so far
+        failed (int): Assessments whose scoring failed, retried by a run with retry_failed
+        rate_per_minute (float): Recent throughput
+        eta_at (datetime): Estimated completion time
+        heartbeat_at (datetime): Last checkpoint, used to detect a job that is still running
+    """
+    __tablename__ = "rescore_jobs"
+
+    version = Column(String, unique=True, nullable=False)
+    model = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="running")
+    last_assessment_id = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    rate_per_minute = Column(Float, nullable=True)
+    eta_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,53 @@
+# Search Document Model Module
+# This module defines the text documents (responses and resume text) indexed for full-text search
+
+from sqlalchemy import Column, Integer, String, Text, DDL, Index, event
+from .base import BaseModel
+
+class SearchDocument(BaseModel):
+    """A piece of candidate text indexed for full-text search
+
+    One row per assessment response and one per uploaded resume. The full-text
+    index itself is database specific and created alongside the table: an
+    external-content FTS5 table kept in sync by triggers on SQLite, and a
+    generated tsvector column with a GIN index on PostgreSQL.
+
+    Attributes:
+        assessment_id (int): Assessment the text belongs to
+        candidate_id (int): Candidate the text belongs to
+        kind (str): 'response' or 'resume'
+        question_id (int): Question answered, for responses
+        body (str): The indexed text
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (Index("ix_search_documents_source", "assessment_id", "kind", "question_id"),)
+
+    assessment_id = Column(Integer, nullable=False)
+    candidate_id = Column(Integer, index=True)
+    kind = Column(String, nullable=False)  # response, resume
+    question_id = Column(Integer, nullable=True)
+    body = Column(Text, nullable=False)
+
+
+_SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE OF body ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+]
+
+_POSTGRES_FTS = [
+    "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS body_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', body)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_body_tsv ON search_documents USING GIN (body_tsv)",
+]
+
+for statement in _SQLITE_FTS:
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in _POSTGRES_FTS:
+    event.listen(SearchDocument.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -1,4 +1,7 @@
 from app.routes.questions import router as questions
 from app.routes.auth import router as auth
 from app.routes.assessments import router as assessments
-from app.routes.candidate import router as candidates
\ No newline at end of file
+from app.routes.candidate import router as candidates
+from app.routes.metrics import router as metrics
+from app.routes.search import router as search
+from app.routes.admin import router as admin
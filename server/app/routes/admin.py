@@ -0,0 +1,109 @@
+# Administration Routes
+# This module exposes on-demand CPU and memory profiling of the worker that serves the request.
+# With several workers, repeat a request until the intended worker (see 'pid') answers.
+
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.routes.auth import get_current_admin
+from app.models.user import User
+from app.services.profiling_service import (
+    MemoryProfiler, ProfilerBusyError, ProfilerNotRunningError, SamplingProfiler
+)
+
+router = APIRouter()
+
+@router.post("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    current_user: User = Depends(get_current_admin)
+):
+    """Sample every thread's stack for a while and return folded stacks
+    
+    The output feeds flamegraph.pl or speedscope directly. Sampling runs in a
+    separate thread, so the event loop keeps serving requests (and is profiled).
+    
+    Args:
+        seconds: Profile duration, at most PROFILING_MAX_SECONDS
+        interval_ms: Time between samples
+        include_idle: Keep samples of threads waiting for work
+        current_user: Authenticated administrator
+        
+    Returns:
+        PlainTextResponse: 'thread;outer;...;inner count' lines, most frequent first
+        
+    Raises:
+        HTTPException: 409 if a profile is already running
+    """
+    profiler = SamplingProfiler(interval_ms / 1000, include_idle)
+    try:
+        await asyncio.to_thread(profiler.run, min(seconds, settings.PROFILING_MAX_SECONDS))
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        profiler.folded(),
+        headers={"X-Profile-Samples": str(profiler.sample_count), "X-Profile-Pid": str(os.getpid())}
+    )
+
+@router.post("/profile/memory/start")
+async def start_memory_profile(
+    frames: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_admin)
+):
+    """Start tracing allocations and take a baseline snapshot
+    
+    Args:
+        frames: Stack frames recorded per allocation
+        current_user: Authenticated administrator
+        
+    Returns:
+        dict: Tracing status
+    """
+    return {**MemoryProfiler.start(frames), "pid": os.getpid()}
+
+@router.get("/profile/memory/snapshot")
+async def memory_snapshot(
+    top: int = Query(20, ge=1, le=500),
+    diff: bool = True,
+    group_by: str = Query("lineno", pattern="^(lineno|traceback)$"),
+    reset: bool = False,
+    current_user: User = Depends(get_current_admin)
+):
+    """Return the top allocation sites, as growth since the baseline by default
+    
+    Args:
+        top: Number of allocation sites
+        diff: Compare with the baseline snapshot
+        group_by: Group by source line or by whole traceback
+        reset: Make this snapshot the new baseline
+        current_user: Authenticated administrator
+        
+    Returns:
+        dict: Tracing status and allocation sites
+        
+    Raises:
+        HTTPException: 409 if memory tracing has not been started
+    """
+    try:
+        snapshot = await asyncio.to_thread(MemoryProfiler.snapshot, top, diff, group_by, reset)
+    except ProfilerNotRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**snapshot, "pid": os.getpid()}
+
+@router.post("/profile/memory/stop")
+async def stop_memory_profile(current_user: User = Depends(get_current_admin)):
+    """Stop tracing allocations and free tracemalloc's memory
+    
+    Args:
+        current_user: Authenticated administrator
+        
+    Returns:
+        dict: Tracing status
+    """
+    return {**MemoryProfiler.stop(), "pid": os.getpid()}
@@ -1,22 +1,39 @@
 # Assessment Management Routes
 # This module handles assessment creation, response submission, and result retrieval
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, Form, Header, HTTPException, Request, Response, status, UploadFile, File, WebSocket
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Awaitable, Callable, List, Optional, Type
+import asyncio
+import json
 import os
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.assessment import (
     AssessmentCreate, 
     AssessmentResponse, 
     ResponseSubmit,
-    AssessmentResult
+    AssessmentResult,
+    NextQuestion
 )
-from app.services.assessment_service import AssessmentService
+from app.services.assessment_service import AssessmentConflictError, AssessmentService
+from app.services.assessment_session import AssessmentSession
+from app.services.adaptive_question_service import AdaptiveQuestionService
+from app.serialization import serialize_rows
+from app.http_cache import content_digest, is_not_modified, make_etag, not_modified, set_cache_headers
 from app.services.openrouter_service import OpenRouterService
+from app.services.llm_providers import llm_configured
+from app.services.structured_output import StructuredOutputError
+from app.services.search_service import SearchService, extract_pdf_text
+from app.services.idempotency_service import (
+    IdempotencyInProgressError,
+    IdempotencyMismatchError,
+    IdempotencyService
+)
 from app.config import settings
-from app.routes.auth import get_current_user
+from app.routes.auth import authenticate_token, get_current_user
 from app.models.user import User
 
 router = APIRouter()
@@ -26,16 +43,79 @@ def get_openrouter_service():
     """Create and return a new OpenRouter service instance for AI analysis"""
     return OpenRouterService()
 
+async def run_idempotent(
+    request: Request,
+    db: Session,
+    current_user: User,
+    idempotency_key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response_model: Type[BaseModel],
+    status_code: int = 200
+) -> Any:
+    """Run a mutating request at most once per Idempotency-Key
+    
+    Without a key the handler simply runs. With one, the first request runs the
+    handler and stores its response; retries with the same key and payload get
+    the stored response back (marked with an Idempotent-Replayed header) without
+    running it again. Failed requests are not stored, so they can be retried.
+    
+    Args:
+        request: Incoming request, whose method and path scope the key
+        db: Database session
+        current_user: Authenticated user, keys are scoped per user
+        idempotency_key: Idempotency-Key header value
+        payload: Request payload, hashed to detect key reuse for a different request
+        handler: Coroutine function performing the request
+        response_model: Schema the handler's result is serialized with
+        status_code: Status code of a successful response
+        
+    Returns:
+        The handler's result, or a JSON response when a key was given
+        
+    Raises:
+        HTTPException: 409 while the first request with the key is still running,
+            422 if the key was used for a different payload
+    """
+    if not idempotency_key:
+        return await handler()
+    
+    scope = f"{current_user.id}:{request.method}:{request.url.path}"
+    try:
+        record, replay = IdempotencyService.begin(
+            db, scope, idempotency_key, IdempotencyService.request_hash(payload)
+        )
+    except IdempotencyMismatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    if replay:
+        return ORJSONResponse(record.response, status_code=record.status_code, headers={"Idempotent-Replayed": "true"})
+    
+    try:
+        body = response_model.model_validate(await handler()).model_dump(mode="json")
+    except BaseException:
+        IdempotencyService.release(db, record)
+        raise
+    IdempotencyService.complete(db, record, status_code, body)
+    return ORJSONResponse(body, status_code=status_code)
+
 @router.post("/upload-resume")
 async def upload_resume(
     resume: UploadFile = File(...),
+    assessment_id: Optional[int] = Form(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Handle resume file upload for assessment
     
+    The resume is attached to `assessment_id` when given, otherwise to the latest
+    assessment of the candidate with the user's email address. Its text is
+    indexed for full-text search.
+    
     Args:
         resume: PDF file to be uploaded
+        assessment_id: Assessment to attach the resume to
         db: Database session
         current_user: Authenticated user making the request
         
@@ -43,7 +123,7 @@ async def upload_resume(
         dict: Contains uploaded filename, file path, and associated assessment ID
         
     Raises:
-        HTTPException: If file is missing, not PDF, or upload fails
+        HTTPException: If file is missing, not PDF, the assessment is not found, or upload fails
     """
     if not resume:
         raise HTTPException(status_code=400, detail="No file uploaded")
@@ -51,6 +131,13 @@ async def upload_resume(
     if not resume.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="File must be a PDF")
     
+    if assessment_id is not None:
+        assessment = AssessmentService.get_assessment(db, assessment_id)
+        if not assessment:
+            raise HTTPException(status_code=404, detail=f"Assessment with ID {assessment_id} not found")
+    else:
+        assessment = AssessmentService.get_latest_assessment_by_user(db, current_user.id)
+    
     try:
         # Create uploads directory if it doesn't exist
         upload_dir = os.path.join("uploads", "resumes")
@@ -63,9 +150,10 @@ async def upload_resume(
             buffer.write(content)
         
         # Update assessment record with resume path
-        assessment = AssessmentService.get_latest_assessment_by_user(db, current_user.id)
         if assessment:
             assessment.resume_file_path = file_path
+            resume_text = await asyncio.to_thread(extract_pdf_text, file_path)
+            SearchService.index_resume(db, assessment, resume_text)
             db.commit()
             db.refresh(assessment)
         
@@ -76,15 +164,20 @@ async def upload_resume(
 @router.post("/", response_model=AssessmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_assessment(
     assessment: AssessmentCreate, 
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """Create a new assessment for a candidate
     
     Args:
         assessment: Assessment creation data
+        request: Incoming request
         db: Database session
         current_user: Authenticated user making the request
+        idempotency_key: Optional Idempotency-Key header; retries with the same key
+            return the assessment created by the first request
         
     Returns:
         AssessmentResponse: Created assessment instance
@@ -92,14 +185,20 @@ async def create_assessment(
     Raises:
         HTTPException: If validation fails or candidate not found
     """
-    try:
-        return AssessmentService.create_assessment(db, assessment)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    async def create():
+        try:
+            return AssessmentService.create_assessment(db, assessment)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return await run_idempotent(
+        request, db, current_user, idempotency_key, assessment.model_dump(),
+        create, AssessmentResponse, status_code=status.HTTP_201_CREATED
+    )
 
 @router.get("/current", response_model=AssessmentResponse)
 async def get_current_assessment(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get the most recent assessment for the current user
@@ -128,7 +227,7 @@ async def get_current_assessment(
 @router.get("/{assessment_id}", response_model=AssessmentResponse)
 async def read_assessment(
     assessment_id: int, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve a specific assessment by ID
@@ -152,7 +251,7 @@ async def read_assessment(
 @router.get("/candidate/{candidate_id}", response_model=List[AssessmentResponse])
 async def read_candidate_assessments(
     candidate_id: int, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all assessments for a specific candidate
@@ -166,57 +265,129 @@ async def read_candidate_assessments(
         List[AssessmentResponse]: List of all assessments for the candidate
     """
     assessments = AssessmentService.get_assessments_by_candidate(db, candidate_id)
-    return assessments
+    return serialize_rows(assessments, AssessmentResponse)
+
+@router.get("/{assessment_id}/next-question", response_model=NextQuestion)
+async def get_next_question(
+    assessment_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the next question to ask in an assessment
+    
+    In adaptive mode this is the question expected to reduce the uncertainty of
+    the trait estimates the most; 'complete' is true once no more are needed.
+    
+    Args:
+        assessment_id: ID of the assessment
+        db: Database session
+        current_user: Authenticated user making the request
+        
+    Returns:
+        NextQuestion: Next question and the current per-trait estimates
+        
+    Raises:
+        HTTPException: If assessment not found
+    """
+    assessment = AssessmentService.get_assessment(db, assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return AdaptiveQuestionService.next_question(db, assessment)
 
 @router.post("/{assessment_id}/submit", response_model=AssessmentResponse)
 async def submit_response(
     assessment_id: int,
     response_data: ResponseSubmit,
+    request: Request,
+    defer_result: bool = False,
     db: Session = Depends(get_db),
     openrouter_service: OpenRouterService = Depends(get_openrouter_service),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """Submit a response for an assessment question
     
+    The final response is scored exactly once: concurrent or retried submits
+    of it return the assessment without starting a second analysis. While
+    scoring is overloaded the final response is saved with scoring deferred,
+    as with defer_result, and the result is produced by the stream endpoint.
+    
+    A final response returns the assessment 'completed', or 'submitted' when
+    scoring was deferred (by defer_result or by load shedding). Clients follow
+    its result_url either way: the result stream for a submitted assessment,
+    the result endpoint for a completed one.
+    
     Args:
         assessment_id: ID of the assessment
         response_data: Response submission data
+        request: Incoming request
+        defer_result: Leave scoring of the final response to the result stream endpoint
         db: Database session
         openrouter_service: Service for AI analysis
         current_user: Authenticated user making the request
+        idempotency_key: Optional Idempotency-Key header; retries with the same key
+            replay the first response
         
     Returns:
         AssessmentResponse: Updated assessment with submitted response
         
     Raises:
-        HTTPException: If OpenRouter API not configured or validation fails
+        HTTPException: If no LLM provider is configured, validation fails,
+            the assessment no longer accepts responses, or the AI profile
+            could not be parsed
     """
-    if not settings.OPENROUTER_API_KEY:
+    if not llm_configured():
         raise HTTPException(
             status_code=500, 
-            detail="OpenRouter API key not configured"
+            detail="LLM provider not configured"
         )
     
-    try:
-        return await AssessmentService.submit_response(
-            db, 
-            assessment_id, 
-            response_data,
-            openrouter_service
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # Set by the load shedding middleware when scoring is overloaded
+    defer_scoring = defer_result or getattr(request.state, "defer_scoring", False)
+    
+    async def submit():
+        try:
+            return await AssessmentService.submit_response(
+                db, 
+                assessment_id, 
+                response_data,
+                openrouter_service,
+                defer_result=defer_scoring
+            )
+        except StructuredOutputError as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"AI analysis returned an invalid result: {e.reason}"
+            )
+        except AssessmentConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return await run_idempotent(
+        request, db, current_user, idempotency_key,
+        {**response_data.model_dump(), "defer_result": defer_result},
+        submit, AssessmentResponse
+    )
 
 @router.get("/{assessment_id}/result", response_model=AssessmentResult)
 async def get_assessment_result(
     assessment_id: int, 
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve the final results of a completed assessment
     
+    The ETag and Last-Modified validators come from the assessment's status and
+    modification time, so a conditional request for an unchanged result gets
+    304 Not Modified before the result is loaded.
+    
     Args:
         assessment_id: ID of the assessment
+        request: Incoming request, for its conditional headers
+        response: Response whose cache headers are set
         db: Database session
         current_user: Authenticated user making the request
         
@@ -224,16 +395,110 @@ async def get_assessment_result(
         AssessmentResult: Final assessment results and personality profile
         
     Raises:
-        HTTPException: If assessment not found or not complete
+        HTTPException: If assessment not found or not complete; 409 with a Location
+            header naming the result stream while it is submitted or being scored
     """
+    version = AssessmentService.get_result_version(db, assessment_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    assessment_status, modified, result = version
+    cache_control = f"private, max-age={settings.HTTP_RESULT_MAX_AGE_SECONDS}"
+    if assessment_status == "completed":
+        # From the result itself, as a rescore can change it within updated_at's second
+        etag = make_etag("assessment-result", assessment_id, content_digest(result))
+        if is_not_modified(request, etag, modified):
+            return not_modified(etag, modified, cache_control)
+
     assessment = AssessmentService.get_assessment(db, assessment_id)
     if assessment is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
+    if assessment.status in ("submitted", "scoring"):
+        # Scoring has not finished, or was deferred, or its worker crashed: the result stream
+        # scores the assessment (taking over a stale claim) and delivers the result
+        raise HTTPException(
+            status_code=409,
+            detail=f"Assessment is {assessment.status}; get the result from its result stream",
+            headers={"Location": f"/api/assessments/{assessment_id}/result/stream"}
+        )
     if assessment.status != "completed" or not assessment.result:
         raise HTTPException(
             status_code=400, 
             detail="Assessment is not complete or results are not available"
         )
     
-    return assessment.result
\ No newline at end of file
+    # Validators from the loaded row, in case scoring finished since the first query
+    modified = assessment.updated_at or assessment.created_at
+    etag = make_etag("assessment-result", assessment_id, content_digest(assessment.result))
+    set_cache_headers(response, etag, modified, cache_control)
+    return assessment.result
+
+@router.get("/{assessment_id}/result/stream")
+async def stream_assessment_result(
+    assessment_id: int,
+    db: Session = Depends(get_db),
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the results of an assessment as server-sent events
+    
+    Completed assessments replay their stored result. Assessments submitted with
+    defer_result are scored while the client is connected, and each profile field
+    is sent as soon as the model has produced it.
+    
+    Args:
+        assessment_id: ID of the assessment
+        db: Database session
+        openrouter_service: Service for AI analysis
+        current_user: Authenticated user making the request
+        
+    Returns:
+        StreamingResponse: 'progress', 'field', 'result' and 'error' events
+        
+    Raises:
+        HTTPException: If assessment not found or not ready to be scored
+    """
+    assessment = AssessmentService.get_assessment(db, assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    if assessment.status not in ("completed", "submitted", "scoring") or (
+        assessment.status == "completed" and not assessment.result
+    ):
+        raise HTTPException(
+            status_code=400, 
+            detail="Assessment is not complete or results are not available"
+        )
+    
+    async def event_stream():
+        try:
+            async for event, data in AssessmentService.stream_result(db, assessment_id, openrouter_service):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{assessment_id}/session")
+async def assessment_session(
+    websocket: WebSocket,
+    assessment_id: int,
+    openrouter_service: OpenRouterService = Depends(get_openrouter_service)
+):
+    """Take an assessment over a single WebSocket
+    
+    Authenticates once (Authorization header or an 'auth' message), then accepts
+    answers as messages and pushes the next question after each one. Once the
+    assessment is complete, scoring progress and the result are sent on the same
+    socket. See app.services.assessment_session for the message protocol.
+    
+    Args:
+        websocket: Client connection
+        assessment_id: ID of the assessment
+        openrouter_service: Service for AI analysis
+    """
+    await AssessmentSession(websocket, assessment_id, authenticate_token, openrouter_service).run()
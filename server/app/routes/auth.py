@@ -8,9 +8,10 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
 
-from app.database import get_db
+from app.database import SessionLocal, engine, get_db, get_read_db
 from app.models.user import User
-from app.schemas.auth import UserCreate, UserResponse, Token
+from app.schemas.auth import UserCreate, UserResponse, Token, RefreshRequest
+from app.services.refresh_token_service import RefreshTokenError, RefreshTokenService
 from app.config import settings
 
 router = APIRouter()
@@ -87,41 +88,107 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Generate access token with configured expiration
+    # Generate access token with configured expiration, and a refresh token for later renewals
+    _, refresh_token = RefreshTokenService.issue(db, user)
+    db.commit()
+    return token_response(user, refresh_token)
+
+def token_response(user: User, refresh_token: str) -> dict:
+    """Build the token endpoint response with a fresh access token for a user"""
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token,
+    }
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    No password is checked, so renewing a session costs a hash lookup instead of
+    a bcrypt verification. The refresh token is rotated: the one sent becomes
+    invalid, and sending it again revokes every token issued from the same login.
+    """
+    try:
+        user, refresh_token = RefreshTokenService.rotate(db, body.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_response(user, refresh_token)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Dependency to get current authenticated user from JWT token
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke a refresh token and every token issued from the same login
     
-    Validates token and returns user object for protected routes
+    Access tokens already issued stay valid until they expire.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    RefreshTokenService.revoke(db, body.refresh_token)
+
+def authenticate_token(token: str, db: Session) -> Optional[User]:
+    """Return the user a JWT access token belongs to, or None if it is invalid
+    
+    Args:
+        token: Encoded JWT access token
+        db: Database session (a replica session falls back to the primary)
     
+    Returns:
+        Optional[User]: Authenticated user
+    """
     try:
         # Decode and validate JWT token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            return None
     except JWTError:
-        raise credentials_exception
+        return None
     
     # Get user from database
     user = db.query(User).filter(User.username == username).first()
+    if user is None and db.get_bind() is not engine:
+        # A replica may not have caught up with a user who just registered
+        primary = SessionLocal()
+        try:
+            user = primary.query(User).filter(User.username == username).first()
+        finally:
+            primary.close()
+    return user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    """Dependency to get current authenticated user from JWT token
+    
+    Validates token and returns user object for protected routes
+    """
+    user = authenticate_token(token, db)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    """Dependency restricting a route to users with the 'admin' role
+    
+    Returns the authenticated user, or fails with 403 for other roles
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required"
+        )
+    return current_user
+
 @router.get("/users/me", response_model=UserResponse)
 async def get_current_user_details(current_user: User = Depends(get_current_user)):
     """Get details of currently authenticated user
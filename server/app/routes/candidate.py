@@ -1,13 +1,15 @@
 # Candidate Management Routes
 # This module handles candidate profile creation and retrieval operations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.candidate import CandidateCreate, CandidateResponse
 from app.services.candidate_service import CandidateService
+from app.services.candidate_trait_service import CandidateTraitService
+from app.serialization import serialize_rows
 from app.routes.auth import get_current_user
 from app.models.user import User
 
@@ -41,7 +43,7 @@ async def create_candidate(
 async def read_candidates(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve a paginated list of all candidates
@@ -56,12 +58,55 @@ async def read_candidates(
         List[CandidateResponse]: List of candidate profiles
     """
     candidates = CandidateService.get_candidates(db, skip=skip, limit=limit)
-    return candidates
+    return serialize_rows(candidates, CandidateResponse)
+
+@router.get("/search", response_model=List[CandidateResponse])
+async def search_candidates(
+    openness_min: Optional[float] = Query(None, ge=0, le=100),
+    openness_max: Optional[float] = Query(None, ge=0, le=100),
+    conscientiousness_min: Optional[float] = Query(None, ge=0, le=100),
+    conscientiousness_max: Optional[float] = Query(None, ge=0, le=100),
+    extraversion_min: Optional[float] = Query(None, ge=0, le=100),
+    extraversion_max: Optional[float] = Query(None, ge=0, le=100),
+    agreeableness_min: Optional[float] = Query(None, ge=0, le=100),
+    agreeableness_max: Optional[float] = Query(None, ge=0, le=100),
+    neuroticism_min: Optional[float] = Query(None, ge=0, le=100),
+    neuroticism_max: Optional[float] = Query(None, ge=0, le=100),
+    mbti: Optional[List[str]] = Query(None, description="Allowed MBTI types, repeat for several"),
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Filter assessed candidates by Big Five score ranges and MBTI type
+    
+    Bounds are inclusive, e.g. ?openness_min=70&neuroticism_max=40&mbti=INTJ&mbti=ENTJ
+    
+    Args:
+        *_min, *_max: Optional bounds for each Big Five trait on a 0-100 scale
+        mbti: Allowed MBTI types
+        skip: Number of records to skip for pagination
+        limit: Maximum number of records to return
+        db: Database session
+        current_user: Authenticated user making the request
+        
+    Returns:
+        List[CandidateResponse]: Matching candidate profiles ordered by ID
+    """
+    ranges = {
+        "openness": (openness_min, openness_max),
+        "conscientiousness": (conscientiousness_min, conscientiousness_max),
+        "extraversion": (extraversion_min, extraversion_max),
+        "agreeableness": (agreeableness_min, agreeableness_max),
+        "neuroticism": (neuroticism_min, neuroticism_max),
+    }
+    candidates = CandidateTraitService.search(db, ranges, mbti=mbti, skip=skip, limit=limit)
+    return serialize_rows(candidates, CandidateResponse)
 
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 async def read_candidate(
     candidate_id: int, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve a specific candidate by ID
@@ -85,7 +130,7 @@ async def read_candidate(
 @router.get("/email/{email}", response_model=CandidateResponse)
 async def read_candidate_by_email(
     email: str, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve a candidate by their email address
@@ -0,0 +1,38 @@
+# Metrics Routes
+# This module exposes runtime metrics of the API process for monitoring
+
+from fastapi import APIRouter, Depends
+
+from app.database import replica_router
+from app.middleware import get_load_shedder
+from app.routes.auth import get_current_user
+from app.models.user import User
+from app.services.assessment_session import AssessmentSession
+from app.services.llm_limiter import get_llm_limiter
+from app.services.llm_providers import model_metrics
+from app.services.openrouter_service import OpenRouterService
+from app.services.question_pool_service import get_question_pool
+from app.services.token_budget import token_metrics
+
+router = APIRouter()
+
+@router.get("/")
+async def read_metrics(current_user: User = Depends(get_current_user)):
+    """Return runtime metrics for this API process
+    
+    Args:
+        current_user: Authenticated user making the request
+        
+    Returns:
+        dict: Metrics grouped by component
+    """
+    return {
+        "llm_admission": get_llm_limiter().stats(),
+        "llm_coalescing": OpenRouterService.coalescing_stats(),
+        "llm_tokens": token_metrics.stats(),
+        "llm_models": model_metrics.stats(),
+        "read_replicas": replica_router.stats(),
+        "question_pool": get_question_pool().stats(),
+        "assessment_sessions": AssessmentSession.stats(),
+        "load_shedding": get_load_shedder().stats(),
+    }
@@ -1,15 +1,17 @@
 # Question Management Routes
 # This module handles personality assessment question creation and retrieval
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.question import QuestionCreate, QuestionResponse
 from app.services.question_service import QuestionService
+from app.serialization import serialize_rows
+from app.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
 from app.services.openrouter_service import OpenRouterService
-from app.config import settings
+from app.services.llm_providers import llm_configured
 from app.routes.auth import get_current_user
 from app.models.user import User
 
@@ -22,31 +24,44 @@ def get_openrouter_service():
 @router.post("/", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def create_question(
     question: QuestionCreate, 
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new personality assessment question
     
+    A near-duplicate of an existing question for the same trait is not
+    inserted: the existing question is returned with status 200 instead of 201.
+    
     Args:
         question: Question creation data
+        response: Outgoing response, whose status is set for merged duplicates
         db: Database session
         current_user: Authenticated user making the request
         
     Returns:
-        QuestionResponse: Created question
+        QuestionResponse: Created question, or the existing near-duplicate
     """
-    return await QuestionService.create_question(db, question)
+    db_question, created = await QuestionService.create_question(db, question)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return db_question
 
 @router.get("/", response_model=List[QuestionResponse])
 async def read_questions(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve a paginated list of all questions
     
+    Supports conditional GETs: a request whose If-None-Match or If-Modified-Since
+    matches the current question bank gets 304 Not Modified.
+    
     Args:
+        request: Incoming request, for its conditional headers
         skip: Number of records to skip for pagination
         limit: Maximum number of records to return
         db: Database session
@@ -55,27 +70,43 @@ async def read_questions(
     Returns:
         List[QuestionResponse]: List of questions
     """
+    count, max_id, text_length, modified = QuestionService.get_bank_version(db)
+    etag = make_etag("questions", count, max_id, text_length, modified, skip, limit)
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified)
     questions = QuestionService.get_questions(db, skip=skip, limit=limit)
-    return questions
+    response = serialize_rows(questions, QuestionResponse)
+    set_cache_headers(response, etag, modified)
+    return response
 
 @router.get("/trait/{trait_category}", response_model=List[QuestionResponse])
 async def read_questions_by_trait(
     trait_category: str, 
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Retrieve questions filtered by personality trait category
     
+    Supports conditional GETs like read_questions.
+    
     Args:
         trait_category: Category of personality trait to filter by
+        request: Incoming request, for its conditional headers
         db: Database session
         current_user: Authenticated user making the request
         
     Returns:
         List[QuestionResponse]: List of questions for the specified trait
     """
+    count, max_id, text_length, modified = QuestionService.get_bank_version(db)
+    etag = make_etag("questions-by-trait", count, max_id, text_length, modified, trait_category)
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified)
     questions = QuestionService.get_questions_by_trait(db, trait_category)
-    return questions
+    response = serialize_rows(questions, QuestionResponse)
+    set_cache_headers(response, etag, modified)
+    return response
 
 @router.post("/generate", response_model=List[QuestionResponse], status_code=status.HTTP_201_CREATED)
 async def generate_questions(
@@ -94,12 +125,12 @@ async def generate_questions(
         List[QuestionResponse]: List of generated questions
         
     Raises:
-        HTTPException: If OpenRouter API is not configured
+        HTTPException: If no LLM provider is configured
     """
-    if not settings.OPENROUTER_API_KEY:
+    if not llm_configured():
         raise HTTPException(
             status_code=500, 
-            detail="OpenRouter API key not configured"
+            detail="LLM provider not configured"
         )
     
     questions = await QuestionService.generate_and_save_questions(db, openrouter_service)
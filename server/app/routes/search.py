@@ -0,0 +1,38 @@
+# Search Routes
+# This module exposes ranked full-text search over candidate responses and resume text
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_read_db
+from app.schemas.search import SearchHit
+from app.services.search_service import SearchService
+from app.routes.auth import get_current_user
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchHit])
+async def search_documents(
+    q: str = Query(..., min_length=2, max_length=200, description='Words and "quoted phrases" that must all match'),
+    kind: Optional[str] = Query(None, pattern="^(response|resume)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search candidate responses and resumes, best matches first
+    
+    Args:
+        q: Search text, e.g. kubernetes "team lead"
+        kind: Restrict to 'response' or 'resume'
+        skip: Number of hits to skip for pagination
+        limit: Maximum number of hits to return
+        db: Database session
+        current_user: Authenticated user making the request
+        
+    Returns:
+        List[SearchHit]: Ranked hits with snippets
+    """
+    return SearchService.search(db, q, kind=kind, skip=skip, limit=limit)
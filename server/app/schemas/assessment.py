@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+# About ten pages of text; longer responses are rejected, long ones are compacted before LLM analysis
+MAX_RESPONSE_CHARS = 20000
+
 # Base schema for assessment data validation
 class AssessmentBase(BaseModel):
     """Base assessment model containing common attributes shared across assessment schemas.
@@ -29,6 +32,9 @@ class AssessmentResponse(AssessmentBase):
         result (Optional[Dict[str, Any]]): Assessment results after evaluation
         resume_file_path (Optional[str]): Path to the uploaded resume file
         created_at (datetime): Timestamp when the assessment was created
+        result_url (Optional[str]): Where to get the result once all responses are in: the
+            result stream while the assessment is 'submitted' (scoring deferred) or 'scoring',
+            the result endpoint once 'completed'
     """
     id: int
     status: str
@@ -37,31 +43,98 @@ class AssessmentResponse(AssessmentBase):
     resume_file_path: Optional[str] = None
     created_at: datetime
     
+    @computed_field
+    @property
+    def result_url(self) -> Optional[str]:
+        if self.status in ("submitted", "scoring"):
+            return f"/api/assessments/{self.id}/result/stream"
+        if self.status == "completed":
+            return f"/api/assessments/{self.id}/result"
+        return None
+    
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class ResponseSubmit(BaseModel):
     """Schema for submitting a response to a single assessment question.
     
     Attributes:
         question_id (int): ID of the question being answered
-        response_text (str): Candidate's response to the question
+        response_text (str): Candidate's response to the question, at most MAX_RESPONSE_CHARS characters
     """
     question_id: int
-    response_text: str
+    response_text: str = Field(..., max_length=MAX_RESPONSE_CHARS)
 
 class AssessmentResult(BaseModel):
     """Schema for the final assessment results after evaluation.
     
     Attributes:
         big_five (Dict[str, float]): Numerical scores for each of the Big Five personality traits
+        big_five_intervals (Optional[Dict[str, List[float]]]): 95% confidence interval [low, high] of each score
         mbti (str): The determined Myers-Briggs Type Indicator personality type
         strengths (List[str]): List of identified candidate strengths
         weaknesses (List[str]): List of identified candidate weaknesses
         career_recommendations (List[str]): List of career paths that match the candidate's profile
     """
     big_five: Dict[str, float]  # Scores for each Big Five trait
+    big_five_intervals: Optional[Dict[str, List[float]]] = None  # Absent on profiles scored by the LLM
     mbti: str  # MBTI personality type
     strengths: List[str]
     weaknesses: List[str]
-    career_recommendations: List[str]
\ No newline at end of file
+    career_recommendations: List[str]
+
+class ProfileNarrative(BaseModel):
+    """Schema for the narrative part of a profile, written by the LLM from the computed scores.
+    
+    Attributes:
+        strengths (List[str]): List of identified candidate strengths
+        weaknesses (List[str]): List of identified candidate weaknesses
+        career_recommendations (List[str]): List of career paths that match the candidate's profile
+    """
+    strengths: List[str]
+    weaknesses: List[str]
+    career_recommendations: List[str]
+
+class ResponseAnalysis(BaseModel):
+    """Schema for the analysis of a single response to a behavioral question.
+    
+    Attributes:
+        score (float): How strongly the response indicates the assessed trait, on a 0-100 scale
+        explanation (str): Brief explanation of the score
+        indicators (List[str]): Key behavioral indicators detected in the response
+    """
+    score: float = Field(ge=0, le=100)
+    explanation: str
+    indicators: List[str] = []
+
+class TraitEstimate(BaseModel):
+    """Schema for the running estimate of one trait during an adaptive assessment.
+    
+    Attributes:
+        mean (float): Estimated trait score on a 0-100 scale
+        stderr (float): Standard error of the estimate
+        responses (int): Number of responses that informed the estimate
+    """
+    mean: float
+    stderr: float
+    responses: int
+
+class NextQuestion(BaseModel):
+    """Schema for the adaptive "next question" of an assessment.
+    
+    Attributes:
+        question_id (Optional[int]): ID of the question to ask next, None when the assessment can be completed
+        text (Optional[str]): Question text
+        trait_category (Optional[str]): Trait the question assesses
+        difficulty (Optional[int]): Question difficulty on a 1-5 scale
+        complete (bool): True when no further questions are needed
+        answered (int): Number of responses submitted so far
+        estimates (Dict[str, TraitEstimate]): Current per-trait estimates
+    """
+    question_id: Optional[int] = None
+    text: Optional[str] = None
+    trait_category: Optional[str] = None
+    difficulty: Optional[int] = None
+    complete: bool
+    answered: int
+    estimates: Dict[str, TraitEstimate]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
 # Base schema for user authentication and authorization
@@ -45,6 +45,18 @@ class Token(BaseModel):
     Attributes:
         access_token (str): The JWT access token string
         token_type (str): Type of the token (e.g., 'bearer')
+        expires_in (int): Lifetime of the access token in seconds
+        refresh_token (str): Opaque token to exchange at /api/auth/refresh for new tokens
     """
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token.
+    
+    Attributes:
+        refresh_token (str): Refresh token previously issued with an access token
+    """
+    refresh_token: str = Field(..., min_length=1, max_length=255)
\ No newline at end of file
@@ -32,4 +32,4 @@ class QuestionResponse(QuestionBase):
     created_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
\ No newline at end of file
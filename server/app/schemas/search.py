@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class SearchHit(BaseModel):
+    """Schema for one full-text search hit over candidate responses and resumes.
+    
+    Attributes:
+        document_id (int): ID of the indexed document
+        assessment_id (int): Assessment the matching text belongs to
+        candidate_id (Optional[int]): Candidate the matching text belongs to
+        kind (str): 'response' or 'resume'
+        question_id (Optional[int]): Question answered, for responses
+        snippet (str): Matching excerpt with matched terms wrapped in [ and ]
+        score (float): Relevance, higher is better; only comparable within one search
+    """
+    document_id: int
+    assessment_id: int
+    candidate_id: Optional[int] = None
+    kind: str
+    question_id: Optional[int] = None
+    snippet: str
+    score: float
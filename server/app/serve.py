@@ -0,0 +1,159 @@
+# Production Server Module
+# This module runs the API under gunicorn with uvicorn workers.
+# Database schema initialization and app import happen once in the master process
+# before workers are forked.
+#
+# Usage (from the server directory):
+#   python -m app.serve [--workers N] [--port 8000] ...
+#   python -m app.serve --reload   # single-process development server
+
+import argparse
+import multiprocessing
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+try:
+    from uvicorn.workers import UvicornWorker
+
+    class ProductionUvicornWorker(UvicornWorker):
+        """Uvicorn worker whose event loop and HTTP parser are chosen by app.serve"""
+        CONFIG_KWARGS = {"loop": settings.SERVER_LOOP, "http": settings.SERVER_HTTP}
+except ImportError:
+    # uvicorn.workers needs gunicorn, which is not available on Windows
+    ProductionUvicornWorker = None
+
+
+def default_workers() -> int:
+    """Default worker count: one async worker per CPU core."""
+    return max(multiprocessing.cpu_count(), 1)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the AI Personality Assessment API")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY or default_workers(),
+                        help="Number of worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG,
+                        help="Maximum number of pending connections on the listen socket")
+    parser.add_argument("--keep-alive", type=int, default=settings.SERVER_KEEP_ALIVE,
+                        help="Seconds to hold idle keep-alive connections open")
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds workers get to finish in-flight requests on shutdown or reload")
+    parser.add_argument("--timeout", type=int, default=settings.SERVER_WORKER_TIMEOUT,
+                        help="Seconds before a silent worker is killed and restarted")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--loop", default=settings.SERVER_LOOP, choices=["auto", "uvloop", "asyncio"])
+    parser.add_argument("--http", default=settings.SERVER_HTTP, choices=["auto", "httptools", "h11"])
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Import the app in each worker instead of once in the master")
+    parser.add_argument("--skip-init-db", action="store_true",
+                        help="Do not create database tables before starting")
+    parser.add_argument("--reload", action="store_true",
+                        help="Development mode: single process with auto-reload")
+    return parser.parse_args(argv)
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Translate command line arguments into gunicorn settings."""
+    # Uvicorn reads its loop and HTTP implementation from the worker class. Configure the
+    # class gunicorn will import, which is a different object when run as `python -m app.serve`
+    from app.serve import ProductionUvicornWorker as worker_class
+
+    worker_class.CONFIG_KWARGS = {"loop": args.loop, "http": args.http}
+    return {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "app.serve.ProductionUvicornWorker",
+        "backlog": args.backlog,
+        "keepalive": args.keep_alive,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": args.timeout,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "preload_app": not args.no_preload,
+        "post_fork": _post_fork,
+        "accesslog": "-",
+    }
+
+
+def _post_fork(server, worker) -> None:
+    """Drop database connections inherited from the master so workers never share sockets."""
+    from app.database import engine, replica_router
+
+    engine.dispose(close=False)
+    replica_router.dispose(close=False)
+
+
+def _warm_up() -> None:
+    """Shared startup work done once in the master, inherited by forked workers."""
+    from app.services.local_scoring_service import get_local_scorer
+
+    get_local_scorer()
+
+
+def run_gunicorn(args: argparse.Namespace) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    options = gunicorn_options(args)
+    if options["preload_app"]:
+        _warm_up()
+    ProductionApplication(options).run()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    # Create tables exactly once, before any worker starts serving
+    if not args.skip_init_db:
+        from app.init_db import init_db
+
+        init_db()
+
+    if args.reload:
+        import uvicorn
+
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    if ProductionUvicornWorker is None:
+        # Fall back to uvicorn's own process manager
+        import uvicorn
+
+        print("gunicorn not available, starting uvicorn workers without preloading", file=sys.stderr)
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            backlog=args.backlog,
+            timeout_keep_alive=args.keep_alive,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            loop=args.loop,
+            http=args.http,
+        )
+        return
+
+    run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
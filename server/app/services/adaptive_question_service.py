@@ -0,0 +1,283 @@
+# Adaptive Question Service Module
+# This module selects the next assessment question from the question bank and decides
+# when an assessment has collected enough evidence to stop.
+#
+# Each Big Five trait keeps a Gaussian estimate (mean and variance on the 0-100 scale).
+# Every answered question is scored by the local scorer and folded into its trait's
+# estimate with a Kalman-style update. A question's difficulty places it on the trait
+# scale, and it is most informative for candidates whose estimate is close to it.
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.question import Question
+from app.services.local_scoring_service import get_local_scorer
+
+TRAITS = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+
+# Prior for every trait before any response: population mean and spread on the 0-100 scale
+PRIOR_MEAN = 50.0
+PRIOR_VARIANCE = 20.0 ** 2
+
+# Variance of a single response score when the question matches the candidate's level
+# and the local scorer is fully confident
+RESPONSE_VARIANCE = 12.0 ** 2
+
+# Spread of the logistic item curve around a question's location, in score points
+ITEM_SLOPE = 15.0
+
+# Confidence assumed for a response that has not been given yet, used when ranking questions
+EXPECTED_CONFIDENCE = 0.7
+
+
+def question_location(difficulty: Optional[int]) -> float:
+    """Position of a difficulty 1-5 question on the 0-100 trait scale (1 -> 10, 3 -> 50, 5 -> 90)."""
+    difficulty = min(5, max(1, difficulty or 1))
+    return 20.0 * difficulty - 10.0
+
+
+def item_information(mean: float, difficulty: Optional[int]) -> float:
+    """Relative information (0-1] a question provides for a candidate at `mean`
+
+    Uses the logistic item curve p(1 - p), scaled so a question located exactly
+    at the candidate's level provides 1.
+    """
+    p = 1.0 / (1.0 + math.exp(-(mean - question_location(difficulty)) / ITEM_SLOPE))
+    return 4.0 * p * (1.0 - p)
+
+
+class TraitEstimate:
+    """Running Gaussian estimate of one trait
+
+    Attributes:
+        mean (float): Estimated trait score on the 0-100 scale
+        variance (float): Uncertainty of the estimate
+        count (int): Number of responses folded in
+    """
+    def __init__(self, mean: float = PRIOR_MEAN, variance: float = PRIOR_VARIANCE):
+        self.mean = mean
+        self.variance = variance
+        self.count = 0
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.variance)
+
+    def observation_variance(self, difficulty: Optional[int], confidence: float) -> float:
+        information = item_information(self.mean, difficulty) * max(confidence, 0.05)
+        return RESPONSE_VARIANCE / max(information, 1e-3)
+
+    def update(self, score: float, difficulty: Optional[int], confidence: float) -> None:
+        noise = self.observation_variance(difficulty, confidence)
+        gain = self.variance / (self.variance + noise)
+        self.mean += gain * (score - self.mean)
+        self.variance *= 1.0 - gain
+        self.count += 1
+
+    def expected_reduction(self, difficulty: Optional[int]) -> float:
+        """Expected drop in variance from asking a question of this difficulty."""
+        noise = self.observation_variance(difficulty, EXPECTED_CONFIDENCE)
+        return self.variance * self.variance / (self.variance + noise)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"mean": round(self.mean, 1), "stderr": round(self.stderr, 2), "responses": self.count}
+
+
+class QuestionBank:
+    """In-memory index of the question bank, grouped by trait and difficulty
+
+    Loaded from the database on first use and refreshed after
+    QUESTION_BANK_TTL_SECONDS or when invalidate() is called.
+
+    Attributes:
+        buckets (dict): trait -> difficulty -> list of question IDs
+        questions (dict): question ID -> (trait, difficulty)
+    """
+    def __init__(self):
+        self.buckets: Dict[str, Dict[int, List[int]]] = {}
+        self.questions: Dict[int, Tuple[str, int]] = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self.loaded_at = 0.0
+
+    def ensure_loaded(self, db: Session) -> "QuestionBank":
+        if time.monotonic() - self.loaded_at < settings.QUESTION_BANK_TTL_SECONDS:
+            return self
+        with self._lock:
+            if time.monotonic() - self.loaded_at >= settings.QUESTION_BANK_TTL_SECONDS:
+                buckets: Dict[str, Dict[int, List[int]]] = {}
+                questions: Dict[int, Tuple[str, int]] = {}
+                rows = db.query(Question.id, Question.trait_category, Question.difficulty).order_by(Question.id)
+                for question_id, trait, difficulty in rows:
+                    trait = (trait or "").lower()
+                    difficulty = min(5, max(1, difficulty or 1))
+                    buckets.setdefault(trait, {}).setdefault(difficulty, []).append(question_id)
+                    questions[question_id] = (trait, difficulty)
+                self.buckets, self.questions = buckets, questions
+                self.loaded_at = time.monotonic()
+        return self
+
+    def lookup(self, db: Session, question_ids: List[int]) -> Dict[int, Tuple[str, int]]:
+        """Trait and difficulty of the given questions, reading any not yet cached from the database."""
+        found = {qid: self.questions[qid] for qid in question_ids if qid in self.questions}
+        missing = [qid for qid in question_ids if qid not in found]
+        if missing:
+            for question_id, trait, difficulty in db.query(
+                Question.id, Question.trait_category, Question.difficulty
+            ).filter(Question.id.in_(missing)):
+                found[question_id] = ((trait or "").lower(), min(5, max(1, difficulty or 1)))
+        return found
+
+
+question_bank = QuestionBank()
+
+
+class AdaptiveQuestionService:
+    """Service for adaptive question selection and early stopping
+
+    All methods are implemented as static methods for stateless operation;
+    the only shared state is the cached question bank.
+    """
+    @staticmethod
+    def estimate_traits(db: Session, responses: Dict[str, str]) -> Dict[str, TraitEstimate]:
+        """Fold the responses given so far into per-trait estimates
+
+        Args:
+            db: Database session
+            responses: Assessment responses as {question_id: response_text}
+
+        Returns:
+            dict: TraitEstimate per Big Five trait
+        """
+        estimates = {trait: TraitEstimate() for trait in TRAITS}
+        bank = question_bank.ensure_loaded(db)
+        meta = bank.lookup(db, [int(question_id) for question_id in responses])
+        items = [
+            (meta[int(question_id)], text) for question_id, text in responses.items()
+            if int(question_id) in meta and meta[int(question_id)][0] in estimates
+        ]
+        scores = get_local_scorer().score_batch((text, trait) for (trait, _), text in items)
+        for ((trait, difficulty), _), analysis in zip(items, scores):
+            estimates[trait].update(analysis["score"], difficulty, analysis["confidence"])
+        return estimates
+
+    @staticmethod
+    def is_converged(estimates: Dict[str, TraitEstimate]) -> bool:
+        """True when every trait estimate is within the configured standard error."""
+        return all(
+            estimate.count > 0 and estimate.stderr <= settings.ASSESSMENT_TARGET_STDERR
+            for estimate in estimates.values()
+        )
+
+    @staticmethod
+    def select_next(
+        db: Session,
+        responses: Dict[str, str],
+        estimates: Optional[Dict[str, TraitEstimate]] = None
+    ) -> Optional[int]:
+        """Pick the unanswered question expected to reduce uncertainty the most
+
+        Only one (trait, difficulty) bucket per combination is ranked, so a step
+        costs at most 25 comparisons regardless of the size of the bank.
+
+        Returns:
+            Optional[int]: Question ID to ask next, or None if the assessment should stop
+        """
+        if estimates is None:
+            estimates = AdaptiveQuestionService.estimate_traits(db, responses)
+        if len(responses) >= settings.ASSESSMENT_MAX_QUESTIONS:
+            return None
+        if len(responses) >= settings.ASSESSMENT_MIN_QUESTIONS and AdaptiveQuestionService.is_converged(estimates):
+            return None
+
+        answered = {int(question_id) for question_id in responses}
+        bank = question_bank.ensure_loaded(db)
+        best: Optional[Tuple[Tuple[int, float], int]] = None
+        for trait, estimate in estimates.items():
+            # Unseen traits come first so every trait is covered before refining any of them
+            converged = estimate.count > 0 and estimate.stderr <= settings.ASSESSMENT_TARGET_STDERR
+            if converged and len(responses) >= settings.ASSESSMENT_MIN_QUESTIONS:
+                continue
+            for difficulty, question_ids in bank.buckets.get(trait, {}).items():
+                question_id = next((qid for qid in question_ids if qid not in answered), None)
+                if question_id is None:
+                    continue
+                rank = (1 if estimate.count == 0 else 0, estimate.expected_reduction(difficulty))
+                if best is None or rank > best[0]:
+                    best = (rank, question_id)
+        return best[1] if best else None
+
+    @staticmethod
+    def should_complete(db: Session, responses: Dict[str, str]) -> bool:
+        """Whether an assessment with these responses has enough evidence to be scored."""
+        if settings.ASSESSMENT_SELECTION_MODE != "adaptive":
+            return len(responses) >= settings.ASSESSMENT_MIN_QUESTIONS
+        if len(responses) < settings.ASSESSMENT_MIN_QUESTIONS:
+            return False
+        # Stop once confident, or when the bank has nothing left worth asking
+        return AdaptiveQuestionService.select_next(db, responses) is None
+
+    @staticmethod
+    def next_question(
+        db: Session,
+        assessment: Assessment,
+        questions: Optional[Dict[int, Question]] = None
+    ) -> Dict[str, object]:
+        """Describe the next question to ask for an assessment
+
+        Args:
+            db: Database session
+            assessment: Assessment being taken
+            questions: Cache of loaded questions by ID, consulted before the database
+                and filled with any question loaded from it
+
+        Returns:
+            dict: Next question details, completion flag and current trait estimates
+        """
+        responses = assessment.responses or {}
+        estimates = AdaptiveQuestionService.estimate_traits(db, responses)
+        question = None
+        if assessment.status == "in_progress":
+            if settings.ASSESSMENT_SELECTION_MODE == "adaptive":
+                question_id = AdaptiveQuestionService.select_next(db, responses, estimates)
+            else:
+                question_id = AdaptiveQuestionService._next_fixed(db, responses)
+            if question_id is not None:
+                question = questions.get(question_id) if questions is not None else None
+                if question is None:
+                    question = db.query(Question).filter(Question.id == question_id).first()
+                    if questions is not None and question is not None:
+                        questions[question_id] = question
+
+        return {
+            "question_id": question.id if question else None,
+            "text": question.text if question else None,
+            "trait_category": question.trait_category if question else None,
+            "difficulty": question.difficulty if question else None,
+            "complete": question is None,
+            "answered": len(responses),
+            "estimates": {trait: estimate.to_dict() for trait, estimate in estimates.items()},
+        }
+
+    @staticmethod
+    def _next_fixed(db: Session, responses: Dict[str, str]) -> Optional[int]:
+        """Fixed mode: rotate through the traits in bank order until the minimum is reached."""
+        if len(responses) >= settings.ASSESSMENT_MIN_QUESTIONS:
+            return None
+        answered = {int(question_id) for question_id in responses}
+        bank = question_bank.ensure_loaded(db)
+        start = len(responses) % len(TRAITS)
+        for trait in TRAITS[start:] + TRAITS[:start]:
+            for difficulty in sorted(bank.buckets.get(trait, {})):
+                for question_id in bank.buckets[trait][difficulty]:
+                    if question_id not in answered:
+                        return question_id
+        return None
@@ -1,12 +1,28 @@
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from app.models.assessment import Assessment
 from app.models.question import Question
 from app.models.candidate import Candidate
-from app.schemas.assessment import AssessmentCreate, ResponseSubmit, AssessmentResult
+from app.models.user import User
+from app.schemas.assessment import AssessmentCreate, ResponseSubmit, AssessmentResult, ProfileNarrative
 from app.services.openrouter_service import OpenRouterService
-from typing import Dict, Any, List, Optional
+from app.services.local_scoring_service import get_local_scorer
+from app.services.adaptive_question_service import AdaptiveQuestionService
+from app.services.profile_aggregation_service import ProfileAggregationService
+from app.services.candidate_trait_service import CandidateTraitService
+from app.services.search_service import SearchService
+from app.config import settings
+from app.tracing import trace_methods
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from pydantic import ValidationError
+from datetime import datetime, timedelta, timezone
+import asyncio
 import json
 
+class AssessmentConflictError(ValueError):
+    """Raised when an assessment's status does not allow the requested change"""
+
+@trace_methods
 class AssessmentService:
     @staticmethod
     def create_assessment(db: Session, assessment: AssessmentCreate) -> Assessment:
@@ -52,10 +68,33 @@ class AssessmentService:
         """
         return db.query(Assessment).filter(Assessment.id == assessment_id).first()
 
+    @staticmethod
+    def get_result_version(
+        db: Session, assessment_id: int
+    ) -> Optional[Tuple[str, Optional[datetime], Optional[Dict[str, Any]]]]:
+        """Read an assessment's status, last modification time and result without loading the row
+        
+        Args:
+            db: Database session
+            assessment_id: ID of the assessment
+            
+        Returns:
+            Optional[Tuple]: Status, modification time and result, None if not found
+        """
+        row = db.query(Assessment.status, Assessment.updated_at, Assessment.created_at, Assessment.result).filter(
+            Assessment.id == assessment_id
+        ).first()
+        if row is None:
+            return None
+        return row.status, row.updated_at or row.created_at, row.result
+
     @staticmethod
     def get_latest_assessment_by_user(db: Session, user_id: int) -> Optional[Assessment]:
         """Get the most recent assessment for a user
         
+        Users and candidates are not linked by a key; a user is the candidate
+        registered with the same email address.
+        
         Args:
             db: Database session
             user_id: User ID to find assessment for
@@ -64,7 +103,7 @@ class AssessmentService:
             Optional[Assessment]: Most recent assessment if found, None otherwise
         """
         # Get the candidate associated with the user
-        candidate = db.query(Candidate).filter(Candidate.user_id == user_id).first()
+        candidate = db.query(Candidate).join(User, User.email == Candidate.email).filter(User.id == user_id).first()
         if not candidate:
             return None
         
@@ -95,7 +134,8 @@ class AssessmentService:
         db: Session, 
         assessment_id: int, 
         response_data: ResponseSubmit,
-        openrouter_service: OpenRouterService
+        openrouter_service: OpenRouterService,
+        defer_result: bool = False
     ) -> Assessment:
         """Submit and process a response for an assessment question
         
@@ -107,12 +147,15 @@ class AssessmentService:
             assessment_id: Assessment ID to submit response for
             response_data: Response submission data
             openrouter_service: Service for AI analysis
+            defer_result: If True, the final response only marks the assessment as
+                'submitted' and scoring happens when the result stream is opened
             
         Returns:
             Assessment: Updated assessment instance
             
         Raises:
             ValueError: If assessment or question not found
+            AssessmentConflictError: If the assessment no longer accepts responses
         """
         # Get the assessment
         assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
@@ -124,36 +167,338 @@ class AssessmentService:
         if not question:
             raise ValueError(f"Question with ID {response_data.question_id} not found")
         
-        # Update responses in the assessment
-        responses = assessment.responses or {}
-        responses[str(response_data.question_id)] = response_data.response_text
+        if assessment.status != "in_progress":
+            # A retry of the answer that completed the assessment gets the current state
+            if (assessment.responses or {}).get(str(response_data.question_id)) == response_data.response_text:
+                # unless the worker scoring it crashed: then the retry takes over its stale claim
+                if assessment.status == "scoring" and not defer_result \
+                        and AssessmentService.take_over_stale_claim(db, assessment_id):
+                    db.commit()
+                    await AssessmentService._score_claimed(db, assessment, openrouter_service)
+                    db.commit()
+                    db.refresh(assessment)
+                return assessment
+            raise AssessmentConflictError(
+                f"Assessment with ID {assessment_id} is {assessment.status} and no longer accepts responses"
+            )
+        
+        responses = AssessmentService.record_responses(
+            db, assessment, {response_data.question_id: response_data.response_text}
+        )
+        
+        # If we have enough evidence for every trait, analyze the responses
+        if AdaptiveQuestionService.should_complete(db, responses):
+            # Only the request that moves the assessment out of 'in_progress' scores it
+            if not AssessmentService.transition_status(
+                db, assessment_id, "in_progress", "submitted" if defer_result else "scoring"
+            ):
+                db.rollback()
+                db.refresh(assessment)
+                return assessment
+            db.commit()
+            if not defer_result:
+                await AssessmentService._score_claimed(db, assessment, openrouter_service)
+
+        db.commit()
+        db.refresh(assessment)
+        return assessment
+
+    @staticmethod
+    async def _score_claimed(db: Session, assessment: Assessment, openrouter_service: OpenRouterService) -> None:
+        """Score an assessment this request has claimed with status 'scoring' (without committing)
+        
+        On failure the claim is released back to 'in_progress', so that a retry
+        of the final answer can score the assessment.
+        """
+        try:
+            response_analyses, analyses = await AssessmentService._analyze_assessment(
+                db, assessment, openrouter_service
+            )
+            profile = await AssessmentService.build_profile(analyses, openrouter_service)
+        except BaseException:
+            db.rollback()
+            AssessmentService.transition_status(db, assessment.id, "scoring", "in_progress")
+            db.commit()
+            raise
+        AssessmentService._complete_assessment(db, assessment, profile, response_analyses)
+
+    @staticmethod
+    def transition_status(db: Session, assessment_id: int, from_status: str, to_status: str) -> bool:
+        """Atomically move an assessment from one status to another (without committing)
+        
+        A single conditional UPDATE is issued, so of several concurrent callers
+        exactly one succeeds. A 'scoring' claim older than
+        SCORING_CLAIM_TIMEOUT_SECONDS is treated as abandoned by a crashed
+        worker and can be claimed again.
+        
+        Args:
+            db: Database session
+            assessment_id: Assessment to update
+            from_status: Status the assessment must currently have
+            to_status: New status
+            
+        Returns:
+            bool: True if this call changed the status
+        """
+        now = datetime.now(timezone.utc)
+        condition = Assessment.status == from_status
+        if to_status == "scoring":
+            condition = or_(condition, AssessmentService._stale_claim(now))
+        db.flush()
+        updated = db.query(Assessment).filter(Assessment.id == assessment_id, condition).update(
+            {"status": to_status, "updated_at": now}, synchronize_session=False
+        )
+        return updated == 1
+
+    @staticmethod
+    def take_over_stale_claim(db: Session, assessment_id: int) -> bool:
+        """Atomically renew a 'scoring' claim abandoned by a crashed worker (without committing)
+        
+        Returns:
+            bool: True if the claim was stale and now belongs to this caller
+        """
+        now = datetime.now(timezone.utc)
+        db.flush()
+        updated = db.query(Assessment).filter(
+            Assessment.id == assessment_id, AssessmentService._stale_claim(now)
+        ).update({"updated_at": now}, synchronize_session=False)
+        return updated == 1
+
+    @staticmethod
+    def _stale_claim(now: datetime):
+        stale = now - timedelta(seconds=settings.SCORING_CLAIM_TIMEOUT_SECONDS)
+        return and_(Assessment.status == "scoring", Assessment.updated_at < stale)
+
+    @staticmethod
+    def record_responses(db: Session, assessment: Assessment, answers: Dict[int, str]) -> Dict[str, str]:
+        """Merge answers into an assessment's responses and index them (without committing)
+        
+        Args:
+            db: Database session
+            assessment: Assessment to update
+            answers: Response text per question ID
+            
+        Returns:
+            Dict[str, str]: All responses of the assessment
+        """
+        # Copy so SQLAlchemy detects the JSON change
+        responses = dict(assessment.responses or {})
+        for question_id, response_text in answers.items():
+            responses[str(question_id)] = response_text
+            SearchService.index_response(db, assessment, question_id, response_text)
         assessment.responses = responses
+        return responses
+
+    @staticmethod
+    async def stream_result(
+        db: Session,
+        assessment_id: int,
+        openrouter_service: OpenRouterService
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Stream an assessment result as (event, data) pairs
+        
+        Completed assessments replay their stored result immediately. Submitted
+        assessments are scored here: the computed scores are yielded first, then
+        the narrative is generated with a streaming completion and each field is
+        yielded as soon as it has been received, followed by the validated result
+        once it has been saved. If another
+        request is already scoring the assessment, its result is awaited and
+        replayed instead of scoring twice.
+        
+        Args:
+            db: Database session
+            assessment_id: Assessment ID to stream the result for
+            openrouter_service: Service for AI analysis
+            
+        Yields:
+            Tuple[str, dict]: 'progress', 'field' and finally 'result' events
+            
+        Raises:
+            ValueError: If the assessment is not found or has not been submitted
+        """
+        assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+        if not assessment:
+            raise ValueError(f"Assessment with ID {assessment_id} not found")
+
+        waiting = False
+        while True:
+            if assessment.status == "completed" and assessment.result:
+                result = AssessmentResult.model_validate(assessment.result).model_dump()
+                for field, value in result.items():
+                    yield "field", {"field": field, "value": value}
+                yield "result", result
+                return
+
+            if assessment.status not in ("submitted", "scoring"):
+                raise ValueError("Assessment is not complete or results are not available")
+
+            # Also takes over a 'scoring' claim abandoned by a crashed worker
+            claimed = AssessmentService.transition_status(db, assessment_id, "submitted", "scoring")
+            db.commit()
+            if claimed:
+                break
+            if not waiting:
+                waiting = True
+                yield "progress", {"stage": "waiting"}
+            await asyncio.sleep(settings.SCORING_POLL_SECONDS)
+            db.refresh(assessment)
+
+        try:
+            yield "progress", {"stage": "analyzing", "responses": len(assessment.responses or {})}
+            response_analyses, analyses = await AssessmentService._analyze_assessment(
+                db, assessment, openrouter_service
+            )
+            yield "progress", {"stage": "profiling"}
+
+            scores = ProfileAggregationService.score_profile(analyses)
+            for field, value in scores.items():
+                yield "field", {"field": field, "value": value}
+
+            fields = {}
+            summary = ProfileAggregationService.narrative_summary(scores, analyses)
+            async for field, value in openrouter_service.stream_profile_narrative(summary):
+                fields[field] = value
+                yield "field", {"field": field, "value": value}
+
+            try:
+                narrative = ProfileNarrative.model_validate(fields).model_dump()
+            except ValidationError:
+                # The streamed object was incomplete or malformed, fall back to a validated call
+                narrative = await openrouter_service.generate_profile_narrative(summary)
+            profile = {**scores, **narrative}
+        except BaseException:
+            # Release the claim so that the next request can score the assessment
+            db.rollback()
+            AssessmentService.transition_status(db, assessment_id, "scoring", "submitted")
+            db.commit()
+            raise
+
+        AssessmentService._complete_assessment(db, assessment, profile, response_analyses)
+        db.commit()
+        yield "result", profile
+
+    @staticmethod
+    async def _analyze_assessment(
+        db: Session,
+        assessment: Assessment,
+        openrouter_service: OpenRouterService
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Analyze every response of an assessment
+        
+        Returns:
+            Tuple: Analyses keyed by question ID, and the analyses of each trait for profile generation
+        """
+        responses = assessment.responses or {}
+        question_ids = [int(question_id) for question_id in responses]
+        questions = {
+            q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids)).all()
+        }
+        items = [
+            (question_id, questions[int(question_id)], response_text)
+            for question_id, response_text in responses.items()
+            if int(question_id) in questions
+        ]
+        response_analyses = await AssessmentService.analyze_responses(items, openrouter_service)
+        return response_analyses, AssessmentService.analyses_by_trait(items, response_analyses)
+
+    @staticmethod
+    def analyses_by_trait(
+        items: List[Tuple[str, Question, str]],
+        response_analyses: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Group per-question analyses by trait, with each question's difficulty, for profile generation."""
+        analyses: Dict[str, List[Dict[str, Any]]] = {}
+        for question_id, question_obj, _ in items:
+            analyses.setdefault((question_obj.trait_category or "").lower(), []).append(
+                {**response_analyses[question_id], "difficulty": question_obj.difficulty}
+            )
+        return analyses
+
+    @staticmethod
+    async def build_profile(
+        analyses: Dict[str, List[Dict[str, Any]]],
+        openrouter_service: OpenRouterService
+    ) -> Dict[str, Any]:
+        """Build a personality profile from the analyses of each trait
+        
+        Scores and the MBTI type are computed locally; only the narrative
+        fields are generated by the LLM.
         
-        # If we have enough responses, analyze them
-        if len(responses) >= 5:  # Minimum number of questions to provide a meaningful assessment
-            assessment.status = "completed"
+        Args:
+            analyses: Trait -> analyses, as returned by analyses_by_trait
+            openrouter_service: Service for the narrative
             
-            # Analyze all responses
-            analyses = {}
-            for question_id, response_text in responses.items():
-                question_obj = db.query(Question).filter(Question.id == int(question_id)).first()
-                if question_obj:
-                    analysis = await openrouter_service.analyze_response(
+        Returns:
+            Dict[str, Any]: Profile matching the AssessmentResult schema
+        """
+        scores = ProfileAggregationService.score_profile(analyses)
+        narrative = await openrouter_service.generate_profile_narrative(
+            ProfileAggregationService.narrative_summary(scores, analyses)
+        )
+        return {**scores, **narrative}
+
+    @staticmethod
+    def _complete_assessment(
+        db: Session,
+        assessment: Assessment,
+        profile: Dict[str, Any],
+        response_analyses: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Store the final profile on the assessment and its candidate (without committing)."""
+        assessment.status = "completed"
+        # Keep per-response analyses alongside the profile so the local scorer can be trained on them
+        assessment.result = {**profile, "response_analyses": response_analyses}
+
+        # Update candidate's personality profile
+        candidate = db.query(Candidate).filter(Candidate.id == assessment.candidate_id).first()
+        if candidate:
+            candidate.personality_profile = profile
+            CandidateTraitService.sync(db, candidate.id, profile, assessment.id)
+
+    @staticmethod
+    async def analyze_responses(
+        items: List[Tuple[str, Question, str]],
+        openrouter_service: OpenRouterService,
+        mode: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Score a set of responses according to the configured scoring mode
+
+        - 'local': every response is scored by the local scorer
+        - 'llm': every response goes to the LLM, falling back to the local score on failure
+        - 'hybrid': responses are scored locally and only low-confidence ones are escalated
+
+        Args:
+            items: List of (question_id, question, response_text) triples
+            openrouter_service: Service for AI analysis
+            mode: Scoring mode override, defaults to settings.SCORING_MODE
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Analysis per question ID
+        """
+        mode = mode or settings.SCORING_MODE
+        local = get_local_scorer().score_batch(
+            (response_text, question_obj.trait_category) for _, question_obj, response_text in items
+        )
+        analyses = {}
+        for (question_id, question_obj, response_text), local_analysis in zip(items, local):
+            escalate = mode == "llm" or (
+                mode == "hybrid"
+                and local_analysis["confidence"] < settings.LOCAL_SCORER_CONFIDENCE_THRESHOLD
+            )
+            analysis = local_analysis
+            if escalate:
+                try:
+                    llm_analysis = await openrouter_service.analyze_response(
                         question_obj.text,
                         response_text,
                         question_obj.trait_category
                     )
-                    analyses[question_obj.trait_category] = analysis
-            
-            # Generate personality profile
-            profile = await openrouter_service.generate_personality_profile(analyses)
-            assessment.result = profile
-            
-            # Update candidate's personality profile
-            candidate = db.query(Candidate).filter(Candidate.id == assessment.candidate_id).first()
-            if candidate:
-                candidate.personality_profile = profile
-        
-        db.commit()
-        db.refresh(assessment)
-        return assessment
\ No newline at end of file
+                except Exception:
+                    llm_analysis = None
+                if llm_analysis and "score" in llm_analysis:
+                    analysis = {**llm_analysis, "source": "llm"}
+                else:
+                    # LLM unavailable or unparseable, keep the local score
+                    analysis = {**local_analysis, "fallback": True}
+            analyses[question_id] = analysis
+        return analyses
\ No newline at end of file
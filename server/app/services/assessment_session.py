@@ -0,0 +1,237 @@
+# Assessment Session Module
+# This module runs an assessment over a single WebSocket: the client authenticates once,
+# answers arrive as messages, and the next question, scoring progress and the final result
+# are pushed back on the same socket. The assessment and the questions asked are kept in
+# memory for the session and answers are persisted in batches.
+#
+# Protocol (JSON text messages):
+#   client: {"type": "auth", "token": "<JWT>"}      first message, unless an Authorization header was sent
+#           {"type": "answer", "question_id": 1, "response_text": "..."}
+#   server: {"type": "question", ...}                next question (see NextQuestion) after connecting
+#                                                    and after every answer, with a 'saved' count
+#           {"type": "progress" | "field" | "result", "data": ...}   scoring, once the assessment is complete
+#           {"type": "error", "detail": "..."}       invalid message, the session stays open
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.question import Question
+from app.models.user import User
+from app.schemas.assessment import ResponseSubmit
+from app.services.adaptive_question_service import AdaptiveQuestionService, question_bank
+from app.services.assessment_service import AssessmentService
+from app.services.openrouter_service import OpenRouterService
+
+logger = logging.getLogger(__name__)
+
+# Application close codes (4000-4999) mirroring the HTTP status
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_TIMEOUT = 4408
+
+
+class AssessmentSession:
+    """One test-taker's WebSocket session for an assessment
+
+    Attributes:
+        assessment_id (int): Assessment being taken
+        user (User): Authenticated user, set once the session is authenticated
+        assessment (Assessment): Detached copy of the assessment, responses include unsaved answers
+        pending (dict): Answers not yet persisted, question ID -> response text
+        questions (dict): Questions asked in this session by ID
+    """
+    # Process-wide counters reported by /api/metrics
+    _stats: Dict[str, int] = {"active": 0, "sessions": 0, "answers": 0, "flushes": 0}
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        assessment_id: int,
+        authenticate: Callable[[str, Session], Optional[User]],
+        openrouter_service: OpenRouterService,
+        session_factory=None
+    ):
+        from app.database import SessionLocal
+
+        self.websocket = websocket
+        self.assessment_id = assessment_id
+        self.authenticate = authenticate
+        self.session_factory = session_factory or SessionLocal
+        self.openrouter_service = openrouter_service
+        self.user: Optional[User] = None
+        self.assessment: Optional[Assessment] = None
+        self.pending: Dict[int, str] = {}
+        self.pending_since = 0.0
+        self.questions: Dict[int, Question] = {}
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return dict(cls._stats)
+
+    async def send(self, message_type: str, **payload: Any) -> None:
+        await self.websocket.send_json({"type": message_type, **payload})
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """Serve the session until the assessment has been scored or the client leaves."""
+        await self.websocket.accept()
+        AssessmentSession._stats["active"] += 1
+        AssessmentSession._stats["sessions"] += 1
+        try:
+            if not await self._authenticate():
+                await self.websocket.close(code=CLOSE_UNAUTHORIZED)
+                return
+            with self.session_factory() as db:
+                self.assessment = db.get(Assessment, self.assessment_id)
+            if self.assessment is None:
+                await self.websocket.close(code=CLOSE_NOT_FOUND)
+                return
+            self.assessment.responses = dict(self.assessment.responses or {})
+
+            if self.assessment.status == "in_progress":
+                await self._send_next_question()
+                if not await self._answer_loop():
+                    return
+            await self._stream_result()
+            await self.websocket.close()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            AssessmentSession._stats["active"] -= 1
+            if self.pending:
+                # Keep answers given before the client disconnected
+                self._flush()
+
+    async def _authenticate(self) -> bool:
+        """Authenticate from the Authorization header, or else from the first message."""
+        header = self.websocket.headers.get("authorization", "")
+        token = header[len("bearer "):] if header.lower().startswith("bearer ") else None
+        if token is None:
+            try:
+                message = await asyncio.wait_for(self.websocket.receive_json(), settings.WS_AUTH_TIMEOUT_SECONDS)
+            except (asyncio.TimeoutError, KeyError, ValueError):
+                return False
+            if not isinstance(message, dict) or message.get("type") != "auth":
+                return False
+            token = str(message.get("token") or "")
+        with self.session_factory() as db:
+            self.user = self.authenticate(token, db)
+        return self.user is not None
+
+    async def _answer_loop(self) -> bool:
+        """Receive answers until the assessment is complete
+
+        Returns:
+            bool: True when the assessment is ready to be scored, False if the session timed out
+        """
+        idle_deadline = time.monotonic() + settings.WS_IDLE_TIMEOUT_SECONDS
+        while True:
+            now = time.monotonic()
+            deadline = idle_deadline
+            if self.pending:
+                deadline = min(deadline, self.pending_since + settings.WS_FLUSH_SECONDS)
+            try:
+                message = await asyncio.wait_for(self.websocket.receive_json(), max(deadline - now, 0.0))
+            except asyncio.TimeoutError:
+                if time.monotonic() >= idle_deadline:
+                    await self.websocket.close(code=CLOSE_TIMEOUT)
+                    return False
+                self._flush()
+                continue
+            except (KeyError, ValueError):
+                # receive_json raises KeyError for a binary frame, ValueError for invalid JSON
+                await self.send("error", detail="Messages must be JSON text")
+                continue
+            idle_deadline = time.monotonic() + settings.WS_IDLE_TIMEOUT_SECONDS
+
+            if not isinstance(message, dict) or message.get("type") != "answer":
+                await self.send("error", detail="Expected a message of type 'answer'")
+                continue
+            if await self._answer(message):
+                return True
+
+    # ------------------------------------------------------------------
+    # Answers
+    # ------------------------------------------------------------------
+    async def _answer(self, message: Dict[str, Any]) -> bool:
+        """Record one answer and reply with the next question
+
+        Returns:
+            bool: True if the assessment now has enough responses to be scored
+        """
+        try:
+            answer = ResponseSubmit.model_validate(message)
+        except ValidationError as e:
+            await self.send("error", detail=e.errors(include_url=False))
+            return False
+
+        with self.session_factory() as db:
+            if answer.question_id not in question_bank.ensure_loaded(db).lookup(db, [answer.question_id]):
+                await self.send("error", detail=f"Question with ID {answer.question_id} not found")
+                return False
+
+            responses = self.assessment.responses
+            responses[str(answer.question_id)] = answer.response_text
+            if not self.pending:
+                self.pending_since = time.monotonic()
+            self.pending[answer.question_id] = answer.response_text
+            AssessmentSession._stats["answers"] += 1
+
+            if AdaptiveQuestionService.should_complete(db, responses):
+                self._flush(status="submitted")
+                return True
+            if len(self.pending) >= settings.WS_FLUSH_ANSWERS:
+                self._flush()
+            next_question = AdaptiveQuestionService.next_question(db, self.assessment, self.questions)
+        await self.send("question", saved=len(responses) - len(self.pending), **next_question)
+        return False
+
+    async def _send_next_question(self) -> None:
+        with self.session_factory() as db:
+            next_question = AdaptiveQuestionService.next_question(db, self.assessment, self.questions)
+        await self.send("question", saved=len(self.assessment.responses), **next_question)
+
+    def _flush(self, status: Optional[str] = None) -> None:
+        """Persist buffered answers, and optionally a new status, in one transaction."""
+        with self.session_factory() as db:
+            assessment = db.get(Assessment, self.assessment_id)
+            if assessment is None:
+                return
+            # Answers for an assessment submitted elsewhere meanwhile are dropped
+            if assessment.status == "in_progress":
+                if self.pending:
+                    AssessmentService.record_responses(db, assessment, self.pending)
+                if status is not None:
+                    AssessmentService.transition_status(db, self.assessment_id, "in_progress", status)
+            db.commit()
+            if status is not None:
+                self.assessment.status = status
+        self.pending = {}
+        AssessmentSession._stats["flushes"] += 1
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    async def _stream_result(self) -> None:
+        """Score the submitted assessment, or replay a stored result, on the socket."""
+        with self.session_factory() as db:
+            try:
+                async for event, data in AssessmentService.stream_result(
+                    db, self.assessment_id, self.openrouter_service
+                ):
+                    await self.send(event, data=data)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.exception("Scoring failed for assessment %s", self.assessment_id)
+                await self.send("error", detail=str(e))
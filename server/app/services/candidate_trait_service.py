@@ -0,0 +1,185 @@
+# Candidate Trait Service Module
+# This module keeps the candidate_traits projection in sync with candidate profiles
+# and runs trait-range searches against its indexed columns.
+#
+# Backfill existing candidates (from the server directory):
+#   python -m app.services.candidate_trait_service
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.candidate import Candidate
+from app.models.candidate_traits import CandidateTraits
+
+BIG_FIVE = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+
+# How many rows walked in candidate_id order cost about as much as one sorted index match
+ID_WALK_COST_RATIO = 8
+
+
+def _score(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def project_profile(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Extract typed trait columns from a personality profile dict."""
+    profile = profile or {}
+    big_five = {str(key).lower(): value for key, value in (profile.get("big_five") or {}).items()}
+    values = {trait: _score(big_five.get(trait)) for trait in BIG_FIVE}
+    mbti = profile.get("mbti")
+    values["mbti"] = mbti.strip().upper()[:4] if isinstance(mbti, str) and mbti.strip() else None
+    return values
+
+
+class CandidateTraitService:
+    """Service class for the typed Big Five projection of candidate profiles
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def sync(
+        db: Session,
+        candidate_id: int,
+        profile: Optional[Dict[str, Any]],
+        assessment_id: Optional[int] = None
+    ) -> Optional[CandidateTraits]:
+        """Create or update a candidate's trait row from its profile (without committing)
+
+        Args:
+            db: Database session
+            candidate_id: Candidate whose profile was written
+            profile: The profile as stored in Candidate.personality_profile
+            assessment_id: Assessment the profile came from
+
+        Returns:
+            Optional[CandidateTraits]: The trait row, or None if the profile was cleared
+        """
+        row = db.query(CandidateTraits).filter(CandidateTraits.candidate_id == candidate_id).first()
+        if not profile:
+            if row is not None:
+                db.delete(row)
+            return None
+        if row is None:
+            row = CandidateTraits(candidate_id=candidate_id)
+            db.add(row)
+        for column, value in project_profile(profile).items():
+            setattr(row, column, value)
+        if assessment_id is not None:
+            row.assessment_id = assessment_id
+        return row
+
+    @staticmethod
+    def search(
+        db: Session,
+        ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+        mbti: Optional[Sequence[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Candidate]:
+        """Find candidates whose scores fall in the given ranges
+
+        Args:
+            db: Database session
+            ranges: Trait name -> (minimum, maximum), either bound may be None; bounds are inclusive
+            mbti: Allowed MBTI types, any if empty
+            skip: Number of records to skip for pagination
+            limit: Maximum number of records to return
+
+        Returns:
+            List[Candidate]: Matching candidates ordered by ID
+        """
+        # (column, bounds, estimated fraction of rows matching); scores are treated as uniform on 0-100
+        predicates = []
+        for trait, (minimum, maximum) in ranges.items():
+            if minimum is None and maximum is None:
+                continue
+            low, high = max(minimum or 0.0, 0.0), min(100.0 if maximum is None else maximum, 100.0)
+            predicates.append((getattr(CandidateTraits, trait), (minimum, maximum), max(high - low, 0.1) / 100.0))
+        mbti_values = [value.strip().upper() for value in mbti or []]
+        if mbti_values:
+            predicates.append((CandidateTraits.mbti, mbti_values, min(len(mbti_values) / 16.0, 1.0)))
+
+        # Walking candidate_id order finds the first matches quickly unless the filter is very
+        # selective; then start from the index of the most selective predicate and sort its matches.
+        # Only the chosen index stays usable: the other columns, and candidate_id when sorting,
+        # are wrapped ('+ 0', "|| ''"), which databases cannot match against an index.
+        selectivity = 1.0
+        for _, _, fraction in predicates:
+            selectivity *= fraction
+        driver = None
+        if predicates:
+            most_selective = min(predicates, key=lambda predicate: predicate[2])
+            total = db.query(func.max(CandidateTraits.id)).scalar() or 0
+            # Sorting index matches costs far more per row than a sequential id walk
+            if (skip + limit) / selectivity > ID_WALK_COST_RATIO * total * most_selective[2]:
+                driver = most_selective[0]
+
+        query = db.query(CandidateTraits.candidate_id)
+        for column, bounds, _ in predicates:
+            if column is not driver:
+                column = column + "" if column is CandidateTraits.mbti else column + 0
+            if isinstance(bounds, list):
+                query = query.filter(column.in_(bounds))
+                continue
+            minimum, maximum = bounds
+            if minimum is not None:
+                query = query.filter(column >= minimum)
+            if maximum is not None:
+                query = query.filter(column <= maximum)
+        order = CandidateTraits.candidate_id if driver is None else CandidateTraits.candidate_id + 0
+        ids = [candidate_id for (candidate_id,) in query.order_by(order).offset(skip).limit(limit)]
+        if not ids:
+            return []
+        candidates = {c.id: c for c in db.query(Candidate).filter(Candidate.id.in_(ids))}
+        return [candidates[candidate_id] for candidate_id in ids if candidate_id in candidates]
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> int:
+        """Rebuild trait rows for every candidate that has a profile
+
+        Walks candidates by primary key in batches, so memory stays flat on
+        large tables and the job can be re-run at any time.
+
+        Returns:
+            int: Number of candidates synced
+        """
+        synced = 0
+        last_id = 0
+        while True:
+            batch = db.query(Candidate.id, Candidate.personality_profile).filter(
+                Candidate.id > last_id, Candidate.personality_profile.isnot(None)
+            ).order_by(Candidate.id).limit(batch_size).all()
+            if not batch:
+                return synced
+            existing = {
+                row.candidate_id: row for row in db.query(CandidateTraits).filter(
+                    CandidateTraits.candidate_id.in_([candidate_id for candidate_id, _ in batch])
+                )
+            }
+            for candidate_id, profile in batch:
+                if not profile:
+                    continue  # JSON null
+                row = existing.get(candidate_id)
+                if row is None:
+                    row = CandidateTraits(candidate_id=candidate_id)
+                    db.add(row)
+                for column, value in project_profile(profile).items():
+                    setattr(row, column, value)
+            db.commit()
+            synced += sum(1 for _, profile in batch if profile)
+            last_id = batch[-1][0]
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Synced candidate traits: {CandidateTraitService.backfill(session)}")
+    finally:
+        session.close()
@@ -0,0 +1,117 @@
+# Idempotency Service Module
+# This module stores the outcome of mutating requests sent with an Idempotency-Key header,
+# so a client retrying a slow or dropped request gets the original response back instead
+# of repeating the work.
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+# Expired records deleted whenever a new key is stored
+PURGE_BATCH_SIZE = 100
+
+
+class IdempotencyInProgressError(Exception):
+    """Raised when a request with the same key is still being processed"""
+
+
+class IdempotencyMismatchError(Exception):
+    """Raised when a key is reused with a different request payload"""
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every stored time is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class IdempotencyService:
+    """Service class for Idempotency-Key records
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def request_hash(payload: Any) -> str:
+        """Stable SHA-256 of a JSON-compatible request payload."""
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def begin(db: Session, scope: str, key: str, request_hash: str) -> Tuple[IdempotencyKey, bool]:
+        """Reserve a key for a request, or find the stored outcome of an earlier one
+
+        Args:
+            db: Database session, committed when a new key is reserved
+            scope: User, method and path of the request
+            key: Idempotency-Key header value
+            request_hash: Hash of the request payload
+
+        Returns:
+            Tuple[IdempotencyKey, bool]: The record, and whether it holds a response to replay
+
+        Raises:
+            IdempotencyInProgressError: If the first request with this key has not finished
+            IdempotencyMismatchError: If the key was used for a different payload
+        """
+        now = datetime.now(timezone.utc)
+        record = db.query(IdempotencyKey).filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key).first()
+        if record is not None and _aware(record.expires_at) <= now:
+            db.delete(record)
+            db.flush()
+            record = None
+
+        if record is None:
+            record = IdempotencyKey(
+                scope=scope, key=key, request_hash=request_hash,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+            )
+            db.add(record)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent request reserved the key first
+                db.rollback()
+                record = db.query(IdempotencyKey).filter(
+                    IdempotencyKey.scope == scope, IdempotencyKey.key == key
+                ).one()
+            else:
+                IdempotencyService.purge_expired(db)
+                return record, False
+
+        if record.request_hash != request_hash:
+            raise IdempotencyMismatchError("Idempotency-Key was already used for a different request")
+        if record.status_code is None:
+            raise IdempotencyInProgressError("A request with this Idempotency-Key is still being processed")
+        return record, True
+
+    @staticmethod
+    def complete(db: Session, record: IdempotencyKey, status_code: int, response: Any) -> None:
+        """Store the response of a successful request for replay."""
+        record.status_code = status_code
+        record.response = response
+        db.commit()
+
+    @staticmethod
+    def release(db: Session, record: IdempotencyKey) -> None:
+        """Forget a key whose request failed, so that a retry runs it again."""
+        db.rollback()
+        db.query(IdempotencyKey).filter(IdempotencyKey.id == record.id).delete(synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session, limit: int = PURGE_BATCH_SIZE) -> int:
+        """Delete up to `limit` expired records."""
+        ids = [
+            record_id for (record_id,) in db.query(IdempotencyKey.id).filter(
+                IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+            ).limit(limit)
+        ]
+        if ids:
+            db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+        return len(ids)
@@ -0,0 +1,336 @@
+# LLM Admission Control Module
+# This module limits concurrency and request/token rates of outgoing LLM calls.
+# Calls wait in a priority queue so interactive scoring is admitted before batch work.
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Admission priority for LLM calls, lower values are admitted first"""
+    INTERACTIVE = 0  # a candidate or recruiter is waiting on the result
+    BATCH = 10       # background work such as question generation or re-scoring
+
+
+class TokenBucket:
+    """In-memory token bucket refilled continuously at a fixed rate
+
+    Attributes:
+        capacity (float): Maximum number of tokens held
+        rate (float): Tokens added per second
+        tokens (float): Tokens currently available, may go negative after usage corrections
+    """
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class MemoryRateBackend:
+    """Process-local request-per-minute and token-per-minute buckets"""
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+
+    async def take(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens, or return how long to wait before retrying."""
+        now = time.monotonic()
+        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        self.tokens.take(min(tokens, self.tokens.capacity))
+        return 0.0
+
+    async def adjust(self, tokens: int) -> None:
+        """Correct the token bucket once the actual usage of a call is known."""
+        self.tokens.take(tokens)
+
+
+class DatabaseRateBackend:
+    """Request and token buckets shared by all workers through the application database
+
+    Each bucket is a row in llm_rate_buckets. Tokens are taken with a single
+    conditional UPDATE per bucket inside one transaction, so concurrent workers
+    on SQLite or Postgres can never over-admit.
+    """
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, session_factory=None):
+        from app.database import SessionLocal
+
+        self.session_factory = session_factory or SessionLocal
+        self.limits = {
+            "requests": (float(requests_per_minute), requests_per_minute / 60.0),
+            "tokens": (float(tokens_per_minute), tokens_per_minute / 60.0),
+        }
+
+    async def take(self, tokens: int) -> float:
+        return await asyncio.to_thread(self._take, tokens)
+
+    async def adjust(self, tokens: int) -> None:
+        await asyncio.to_thread(self._adjust, tokens)
+
+    def _refilled(self, name: str, now: float):
+        """SQL expression for a bucket's token count refilled up to `now`."""
+        from app.models.rate_limit import LLMRateBucket
+
+        capacity, rate = self.limits[name]
+        refilled = LLMRateBucket.tokens + (now - LLMRateBucket.refilled_at) * rate
+        return case((refilled > capacity, capacity), else_=refilled)
+
+    def _take(self, tokens: int) -> float:
+        from app.models.rate_limit import LLMRateBucket
+
+        amounts = {"requests": 1.0, "tokens": float(min(tokens, self.limits["tokens"][0]))}
+        db = self.session_factory()
+        try:
+            self._ensure_buckets(db)
+            now = time.time()
+            for name, amount in amounts.items():
+                refilled = self._refilled(name, now)
+                taken = db.execute(
+                    update(LLMRateBucket)
+                    .where(LLMRateBucket.name == name, refilled >= amount)
+                    .values(tokens=refilled - amount, refilled_at=now)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not taken:
+                    db.rollback()
+                    return self._wait_time(db, amounts, now)
+            db.commit()
+            return 0.0
+        finally:
+            db.close()
+
+    def _wait_time(self, db, amounts: Dict[str, float], now: float) -> float:
+        from app.models.rate_limit import LLMRateBucket
+
+        wait = 0.0
+        for bucket in db.query(LLMRateBucket).filter(LLMRateBucket.name.in_(amounts)).all():
+            capacity, rate = self.limits[bucket.name]
+            available = min(capacity, bucket.tokens + (now - bucket.refilled_at) * rate)
+            wait = max(wait, (amounts[bucket.name] - available) / rate)
+        return max(wait, 0.01)
+
+    def _adjust(self, tokens: int) -> None:
+        from app.models.rate_limit import LLMRateBucket
+
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(LLMRateBucket)
+                .where(LLMRateBucket.name == "tokens")
+                .values(tokens=LLMRateBucket.tokens - tokens)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _ensure_buckets(self, db) -> None:
+        from app.models.rate_limit import LLMRateBucket
+
+        existing = {name for (name,) in db.query(LLMRateBucket.name).all()}
+        for name, (capacity, _) in self.limits.items():
+            if name in existing:
+                continue
+            try:
+                db.add(LLMRateBucket(name=name, tokens=capacity, refilled_at=time.time()))
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # another worker created it first
+
+
+class LLMAdmissionController:
+    """Admission controller for outgoing LLM calls
+
+    Callers wait in a priority queue and are admitted in priority order (FIFO
+    within a priority) once there is a free in-flight slot and both the
+    request and token buckets allow the call.
+
+    Attributes:
+        max_in_flight (int): Maximum number of concurrent calls in this process
+        backend: Rate bucket backend (MemoryRateBackend or DatabaseRateBackend)
+    """
+    def __init__(self, max_in_flight: int, backend):
+        self.max_in_flight = max_in_flight
+        self.backend = backend
+        self.in_flight = 0
+        self._queue: List[list] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.admitted: Dict[str, int] = {p.name.lower(): 0 for p in Priority}
+        self.max_queue_depth = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self._total_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for admission."""
+        return len(self._queue)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE, estimated_tokens: int = 0):
+        """Hold an admission slot for the duration of an LLM call
+
+        Yields a dict the caller may set 'tokens' on with the actual usage, used
+        to correct the token bucket when the slot is released.
+        """
+        await self.acquire(priority, estimated_tokens)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        finally:
+            self.release()
+            actual = usage.get("tokens")
+            if actual is not None and actual != estimated_tokens:
+                await self.backend.adjust(actual - estimated_tokens)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE, estimated_tokens: int = 0) -> float:
+        """Wait until the call is admitted and return the time spent queued."""
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        entry = [int(priority), next(self._seq), future, estimated_tokens]
+        heapq.heappush(self._queue, entry)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done() or future.cancelled():
+                self._remove(entry)
+            else:
+                self.release()  # admitted just before the caller gave up
+            raise
+
+        waited = time.monotonic() - start
+        self._waits.append(waited)
+        self._total_wait += waited
+        self.admitted[Priority(priority).name.lower()] += 1
+        return waited
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _remove(self, entry: list) -> None:
+        if self._queue and self._queue[0] is entry:
+            heapq.heappop(self._queue)
+            return
+        try:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+        except ValueError:
+            pass
+
+    def _wake(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        """Admit queued calls while slots and rate budget are available."""
+        while self._queue:
+            self._wakeup.clear()
+            if self.in_flight >= self.max_in_flight:
+                await self._wakeup.wait()
+                continue
+
+            entry = self._queue[0]
+            _, _, future, tokens = entry
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+
+            try:
+                wait = await self.backend.take(tokens)
+            except Exception:
+                # Never strand queued callers because the shared rate store is unavailable
+                logger.exception("LLM rate backend failed, admitting call without rate check")
+                wait = 0.0
+            if wait > 0:
+                # Sleep until the buckets refill, but re-check early if a new call arrives
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # A higher priority call may have been queued while the budget was being taken
+            self._remove(entry)
+            if future.done():
+                continue  # cancelled while the rate budget was being taken
+            self.in_flight += 1
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, in-flight and wait-time metrics."""
+        waits = sorted(self._waits)
+        total = sum(self.admitted.values())
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else 0.0
+
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": dict(self.admitted),
+            "wait_seconds": {
+                "mean": round(self._total_wait / total, 4) if total else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(waits[-1], 4) if waits else 0.0,
+            },
+            "backend": type(self.backend).__name__,
+        }
+
+
+_limiter: Optional[LLMAdmissionController] = None
+
+
+def get_llm_limiter() -> LLMAdmissionController:
+    """Return the process-wide admission controller, creating it on first use."""
+    global _limiter
+    if _limiter is None:
+        backend_cls = DatabaseRateBackend if settings.LLM_LIMITER_BACKEND == "database" else MemoryRateBackend
+        _limiter = LLMAdmissionController(
+            settings.LLM_MAX_IN_FLIGHT,
+            backend_cls(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
+        )
+    return _limiter
@@ -0,0 +1,307 @@
+# LLM Providers Module
+# This module abstracts the chat completion backends behind one interface: OpenRouter, any
+# OpenAI-compatible server (a local vLLM, llama.cpp or Ollama endpoint) and an in-process mock.
+# Each LLM operation is routed to a provider and model by settings, so cheap, fast models can
+# serve per-response analysis and question generation while a stronger model writes profiles.
+# Latency, token usage and estimated cost are recorded per provider and model.
+
+import asyncio
+import hashlib
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.services.token_budget import estimate_tokens
+
+
+class LLMProviderError(Exception):
+    """Raised when a provider returns an error response"""
+
+
+class LLMProvider:
+    """Interface of a chat completions backend
+
+    Attributes:
+        name (str): Provider name used in routes such as 'openrouter:model'
+    """
+    name = "base"
+
+    @property
+    def configured(self) -> bool:
+        """Whether the provider has what it needs (e.g. an API key) to serve calls."""
+        return True
+
+    async def complete(self, body: Dict[str, Any], operation: str, headers: Optional[Dict[str, str]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Run a chat completion request
+
+        Args:
+            body: OpenAI-style request body, including 'model'
+            operation: 'questions', 'analysis', 'profile' or 'other'
+            headers: Extra request headers such as traceparent
+
+        Returns:
+            Tuple[str, dict]: Completion text, and the usage report (may be empty)
+        """
+        raise NotImplementedError
+
+    def stream(self, body: Dict[str, Any], operation: str, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[str]:
+        """Run a streaming chat completion request, yielding content deltas."""
+        raise NotImplementedError
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Provider for servers implementing the OpenAI chat completions API
+
+    Attributes:
+        api_url (str): Base URL, e.g. http://localhost:11434/v1
+        api_key (str): Bearer token, optional for local servers
+        timeout (float): Request timeout in seconds
+    """
+    name = "openai"
+
+    def __init__(self, api_url: str, api_key: Optional[str] = None, timeout: float = 60.0):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_url)
+
+    def _headers(self, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        return {**self.headers, **extra} if extra else self.headers
+
+    async def complete(self, body, operation, headers=None):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.api_url}/chat/completions",
+                headers=self._headers(headers),
+                json=body,
+                timeout=self.timeout
+            )
+        if response.status_code != 200:
+            raise LLMProviderError(f"{self.name} API error {response.status_code}: {response.text}")
+        result = response.json()
+        return result["choices"][0]["message"]["content"], result.get("usage") or {}
+
+    async def stream(self, body, operation, headers=None):
+        async with httpx.AsyncClient() as client:
+            async with client.stream(
+                "POST",
+                f"{self.api_url}/chat/completions",
+                headers=self._headers(headers),
+                json={**body, "stream": True},
+                timeout=self.timeout
+            ) as response:
+                if response.status_code != 200:
+                    error = await response.aread()
+                    raise LLMProviderError(f"{self.name} API error {response.status_code}: {error.decode(errors='replace')}")
+
+                async for line in response.aiter_lines():
+                    # Server-sent events: skip keep-alive comments and blank separators
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+
+
+class OpenRouterProvider(OpenAICompatibleProvider):
+    """OpenRouter, an OpenAI-compatible gateway to hosted models"""
+    name = "openrouter"
+
+    def __init__(self):
+        super().__init__(settings.OPENROUTER_API_URL, settings.OPENROUTER_API_KEY)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+
+class MockProvider(LLMProvider):
+    """In-process provider returning fixed, schema-valid completions
+
+    For development, demos and load tests without a model server: no network
+    calls are made and responses take LLM_MOCK_LATENCY_SECONDS.
+    """
+    name = "mock"
+
+    PROFILE = {
+        "strengths": ["Planning", "Collaboration", "Curiosity"],
+        "weaknesses": ["Delegation", "Patience", "Saying no"],
+        "career_recommendations": ["Project management", "Consulting", "Product design"],
+    }
+
+    QUESTIONS = (
+        "Describe a time you had to adapt quickly when a project's plans changed.",
+        "Tell me about a disagreement with a colleague and how you resolved it.",
+        "How do you organize your work when several deadlines fall in the same week?",
+        "What is something new you taught yourself recently, and why did you pick it?",
+        "Walk me through how you handled the most stressful day of your last job.",
+        "When did you last speak up in a large meeting, and what happened?",
+        "Give an example of helping a teammate at the expense of your own tasks.",
+        "How do you react when feedback on your work is harsher than expected?",
+        "Tell me about an unconventional idea you proposed and how it was received.",
+        "Describe how you prepare before meeting a group of people you do not know.",
+        "What do you do when a task you committed to turns out to be much larger?",
+        "Tell me about a time you noticed a risk others had missed.",
+    )
+
+    def _content(self, body: Dict[str, Any], operation: str) -> str:
+        if operation == "questions":
+            # Rotate through the pool by prompt, so different traits get different questions
+            prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+            start = int(hashlib.sha1(prompt.encode()).hexdigest(), 16) % len(self.QUESTIONS)
+            picked = [self.QUESTIONS[(start + i) % len(self.QUESTIONS)] for i in range(5)]
+            return "\n".join(f"{i}. {question}" for i, question in enumerate(picked, 1))
+        if operation == "analysis":
+            return json.dumps({"score": 50, "explanation": "Mock analysis.", "indicators": ["mock"]})
+        if operation == "profile":
+            return json.dumps(self.PROFILE)
+        return "OK"
+
+    @staticmethod
+    def _usage(body: Dict[str, Any], content: str) -> Dict[str, Any]:
+        prompt_tokens = sum(estimate_tokens(message.get("content", "")) for message in body.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def complete(self, body, operation, headers=None):
+        await asyncio.sleep(settings.LLM_MOCK_LATENCY_SECONDS)
+        content = self._content(body, operation)
+        return content, self._usage(body, content)
+
+    async def stream(self, body, operation, headers=None):
+        content = self._content(body, operation)
+        chunks = [content[i:i + 16] for i in range(0, len(content), 16)]
+        for chunk in chunks:
+            await asyncio.sleep(settings.LLM_MOCK_LATENCY_SECONDS / max(len(chunks), 1))
+            yield chunk
+
+
+_providers: Dict[str, LLMProvider] = {}
+
+
+def get_provider(name: str) -> LLMProvider:
+    """Return the process-wide provider with this name, creating it on first use
+
+    Raises:
+        ValueError: If no provider has this name
+    """
+    provider = _providers.get(name)
+    if provider is None:
+        if name == "openrouter":
+            provider = OpenRouterProvider()
+        elif name == "openai":
+            provider = OpenAICompatibleProvider(settings.LLM_OPENAI_API_URL, settings.LLM_OPENAI_API_KEY)
+        elif name == "mock":
+            provider = MockProvider()
+        else:
+            raise ValueError(f"Unknown LLM provider: {name}")
+        _providers[name] = provider
+    return provider
+
+
+PROVIDER_NAMES = ("openrouter", "openai", "mock")
+
+
+def parse_route(route: str) -> Tuple[str, str]:
+    """Split 'provider:model' into its parts; a bare model uses LLM_PROVIDER
+
+    Model names may contain colons themselves (e.g. 'meta-llama/llama-3-8b:free'),
+    so only a known provider name is treated as a prefix.
+    """
+    prefix, sep, model = route.partition(":")
+    if sep and prefix in PROVIDER_NAMES:
+        return prefix, model
+    return settings.LLM_PROVIDER, route
+
+
+def route_for(operation: str) -> Tuple[str, str]:
+    """Provider and model that serve an LLM operation."""
+    route = {
+        "questions": settings.LLM_MODEL_QUESTIONS,
+        "analysis": settings.LLM_MODEL_ANALYSIS,
+        "profile": settings.LLM_MODEL_PROFILE,
+    }.get(operation) or settings.OPENROUTER_MODEL
+    return parse_route(route)
+
+
+def llm_configured() -> bool:
+    """Whether every routed operation has a usable provider."""
+    try:
+        return all(
+            get_provider(route_for(operation)[0]).configured
+            for operation in ("questions", "analysis", "profile")
+        )
+    except ValueError:
+        return False
+
+
+class ModelMetrics:
+    """Per provider and model call counts, latency, tokens and estimated cost
+
+    Costs use LLM_MODEL_PRICES, USD per million prompt and completion tokens;
+    models without a price report a cost of 0.
+    """
+    def __init__(self):
+        self.models: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, provider: str, model: str) -> Dict[str, Any]:
+        key = f"{provider}:{model}"
+        entry = self.models.get(key)
+        if entry is None:
+            entry = self.models[key] = {
+                "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cost_usd": 0.0, "total_seconds": 0.0, "latencies": deque(maxlen=1000),
+            }
+        return entry
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        seconds: float,
+        prompt_tokens: Optional[int] = 0,
+        completion_tokens: Optional[int] = 0,
+        error: bool = False
+    ) -> None:
+        entry = self._entry(provider, model)
+        entry["calls"] += 1
+        entry["errors"] += int(error)
+        entry["total_seconds"] += seconds
+        entry["latencies"].append(seconds)
+        entry["prompt_tokens"] += prompt_tokens or 0
+        entry["completion_tokens"] += completion_tokens or 0
+        prompt_price, completion_price = settings.LLM_MODEL_PRICES.get(model, (0.0, 0.0))
+        entry["cost_usd"] += ((prompt_tokens or 0) * prompt_price + (completion_tokens or 0) * completion_price) / 1e6
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for key, entry in self.models.items():
+            latencies: Deque[float] = entry["latencies"]
+            ordered = sorted(latencies)
+            result[key] = {
+                **{k: v for k, v in entry.items() if k not in ("latencies", "total_seconds", "cost_usd")},
+                "cost_usd": round(entry["cost_usd"], 6),
+                "avg_seconds": round(entry["total_seconds"] / entry["calls"], 4) if entry["calls"] else 0.0,
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4) if ordered else 0.0,
+            }
+        return result
+
+
+model_metrics = ModelMetrics()
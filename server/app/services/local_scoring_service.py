@@ -0,0 +1,355 @@
+# Local Scoring Service Module
+# This module provides a deterministic, CPU-only scorer for candidate responses.
+# It is used as a fast path in front of the LLM and as a fallback when OpenRouter is unavailable.
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+from app.config import settings
+
+# Trait lexicon: terms that support (positive) or contradict (negative) each Big Five trait.
+# Terms are matched against lower-cased word tokens of the response text.
+TRAIT_LEXICON: Dict[str, Dict[str, List[str]]] = {
+    "openness": {
+        "positive": [
+            "curious", "curiosity", "creative", "creativity", "imagine", "imagination", "explore",
+            "explored", "exploring", "novel", "new", "idea", "ideas", "experiment", "experimented",
+            "learn", "learned", "learning", "art", "artistic", "innovate", "innovative", "innovation",
+            "different", "perspective", "perspectives", "unconventional", "open", "adapt", "adapted",
+            "travel", "culture", "cultures", "research", "discover", "discovered", "abstract",
+        ],
+        "negative": [
+            "routine", "traditional", "tradition", "conventional", "familiar", "usual", "avoid",
+            "stick", "prefer", "practical", "same", "uncomfortable", "resist", "resisted",
+        ],
+    },
+    "conscientiousness": {
+        "positive": [
+            "plan", "planned", "planning", "organize", "organized", "organised", "schedule",
+            "scheduled", "deadline", "deadlines", "detail", "details", "thorough", "careful",
+            "prepared", "prepare", "checklist", "responsible", "responsibility", "reliable",
+            "discipline", "disciplined", "goal", "goals", "priority", "prioritize", "prioritized",
+            "track", "tracked", "systematic", "diligent", "completed", "finish", "finished", "on-time",
+        ],
+        "negative": [
+            "procrastinate", "procrastinated", "late", "forgot", "forget", "messy", "disorganized",
+            "last-minute", "rushed", "careless", "missed", "impulsive", "spontaneous", "postpone",
+        ],
+    },
+    "extraversion": {
+        "positive": [
+            "people", "team", "social", "party", "parties", "talk", "talked", "talking", "meet",
+            "meeting", "friends", "energized", "energy", "outgoing", "lead", "led", "leader",
+            "present", "presented", "presentation", "network", "networking", "group", "crowd",
+            "conversation", "conversations", "excited", "enthusiastic", "speak", "spoke",
+        ],
+        "negative": [
+            "alone", "quiet", "introvert", "introverted", "solitude", "recharge", "reserved", "shy",
+            "myself", "privately", "independently", "listen", "observe", "drained", "small",
+        ],
+    },
+    "agreeableness": {
+        "positive": [
+            "help", "helped", "helping", "support", "supported", "empathy", "empathize", "understand",
+            "understanding", "compromise", "cooperate", "cooperation", "collaborate", "collaborated",
+            "kind", "kindness", "trust", "listen", "listened", "respect", "respected", "care",
+            "cared", "together", "consensus", "forgive", "patient", "feelings", "mediate", "mediated",
+        ],
+        "negative": [
+            "argue", "argued", "conflict", "insisted", "insist", "blame", "blamed", "criticize",
+            "criticized", "stubborn", "competitive", "compete", "win", "refused", "confront",
+            "confronted", "annoyed", "ignore", "ignored",
+        ],
+    },
+    "neuroticism": {
+        "positive": [
+            "stress", "stressed", "stressful", "anxious", "anxiety", "worry", "worried", "worrying",
+            "nervous", "overwhelmed", "panic", "panicked", "upset", "frustrated", "frustration",
+            "afraid", "fear", "angry", "sad", "tense", "insecure", "doubt", "overthink", "pressure",
+        ],
+        "negative": [
+            "calm", "calmly", "relaxed", "composed", "steady", "stable", "confident", "resilient",
+            "resilience", "patient", "balanced", "mindful", "breathe", "positive", "optimistic",
+        ],
+    },
+}
+
+# Number of features produced per (response, trait) pair: bias, positive, negative, elaboration
+FEATURE_NAMES = ["bias", "positive", "negative", "elaboration"]
+
+# Hand-tuned default weights used until a model is fitted on LLM-scored responses
+DEFAULT_WEIGHTS = [45.0, 15.0, -15.0, 8.0]
+
+_TOKEN_RE = re.compile(r"[a-z][a-z'\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case and split text into word tokens."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class LocalScoringService:
+    """Deterministic response scorer based on a trait lexicon and a linear model
+
+    Each response is turned into a small TF-IDF weighted feature vector per trait
+    (supporting evidence, contradicting evidence and elaboration), and a per-trait
+    linear model maps those features to a 0-100 score. Weights default to a
+    hand-tuned prior and can be fitted on responses that the LLM has already scored.
+
+    Attributes:
+        weights (dict): Per-trait linear model weights, aligned with FEATURE_NAMES
+        idf (dict): Inverse document frequency per lexicon term
+        lexicon (dict): Trait lexicon with 'positive' and 'negative' term sets
+    """
+    def __init__(
+        self,
+        weights: Optional[Dict[str, List[float]]] = None,
+        idf: Optional[Dict[str, float]] = None,
+        lexicon: Optional[Dict[str, Dict[str, List[str]]]] = None
+    ):
+        self.lexicon = {
+            trait: {polarity: set(terms) for polarity, terms in sides.items()}
+            for trait, sides in (lexicon or TRAIT_LEXICON).items()
+        }
+        self.weights = {trait: list(DEFAULT_WEIGHTS) for trait in self.lexicon}
+        if weights:
+            self.weights.update(weights)
+        self.idf = idf or {}
+
+    # ------------------------------------------------------------------
+    # Feature extraction
+    # ------------------------------------------------------------------
+    def _features(self, tokens: List[str], counts: Counter, trait: str) -> Tuple[List[float], List[Tuple[str, float]]]:
+        """Compute the feature vector and matched lexicon terms for one trait."""
+        sides = self.lexicon.get(trait)
+        if sides is None:
+            return [1.0, 0.0, 0.0, 0.0], []
+
+        norm = math.sqrt(len(tokens) + 1)
+        positive = 0.0
+        negative = 0.0
+        matches = []
+        for term, tf in counts.items():
+            if term in sides["positive"]:
+                weight = (1.0 + math.log(tf)) * self.idf.get(term, 1.0)
+                positive += weight
+                matches.append((term, weight))
+            elif term in sides["negative"]:
+                weight = (1.0 + math.log(tf)) * self.idf.get(term, 1.0)
+                negative += weight
+                matches.append((term, -weight))
+
+        elaboration = min(math.log1p(len(tokens)) / math.log(200), 1.0)
+        return [1.0, positive / norm, negative / norm, elaboration], matches
+
+    @staticmethod
+    def _predict(weights: List[float], features: List[float]) -> float:
+        """Apply a linear model and clamp to the 0-100 score range."""
+        raw = sum(w * x for w, x in zip(weights, features))
+        return max(0.0, min(100.0, raw))
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+    def score(self, response: str, trait_category: str) -> Dict[str, Any]:
+        """Score a single response for a trait
+
+        Args:
+            response: Candidate response text
+            trait_category: Trait the question is designed to assess
+
+        Returns:
+            dict: Analysis with 'score', 'explanation', 'indicators', 'confidence' and 'source'
+        """
+        return self.score_batch([(response, trait_category)])[0]
+
+    def score_batch(self, items: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Score many (response, trait_category) pairs in one pass
+
+        Tokenization and term counting are done once per response, and the
+        per-trait weight vectors are looked up once for the whole batch.
+
+        Args:
+            items: Iterable of (response_text, trait_category) pairs
+
+        Returns:
+            List[dict]: One analysis per input pair, in input order
+        """
+        results = []
+        weights = self.weights
+        for response, trait_category in items:
+            trait = (trait_category or "").lower()
+            tokens = tokenize(response)
+            features, matches = self._features(tokens, Counter(tokens), trait)
+            score = self._predict(weights.get(trait, DEFAULT_WEIGHTS), features)
+
+            # Confidence grows with the amount of lexicon evidence and response length
+            evidence = len(matches)
+            confidence = (1.0 - math.exp(-evidence / 2.0)) * min(1.0, len(tokens) / 25.0)
+
+            matches.sort(key=lambda m: abs(m[1]), reverse=True)
+            indicators = [
+                f"{term} ({'supports' if weight > 0 else 'contradicts'} {trait})"
+                for term, weight in matches[:5]
+            ]
+            supporting = sum(1 for _, weight in matches if weight > 0)
+            results.append({
+                "score": round(score, 1),
+                "explanation": (
+                    f"Local lexicon model found {supporting} supporting and "
+                    f"{evidence - supporting} contradicting indicators for {trait} "
+                    f"in {len(tokens)} words."
+                ),
+                "indicators": indicators,
+                "confidence": round(confidence, 3),
+                "source": "local",
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Training and persistence
+    # ------------------------------------------------------------------
+    def fit(self, samples: List[Tuple[str, str, float]], l2: float = 1.0) -> Dict[str, int]:
+        """Fit IDF weights and per-trait linear models on LLM-scored responses
+
+        Uses closed-form ridge regression; traits with fewer than
+        len(FEATURE_NAMES) samples keep their current weights.
+
+        Args:
+            samples: List of (response_text, trait_category, score) triples
+            l2: Ridge regularization strength (the bias term is not penalized)
+
+        Returns:
+            dict: Number of samples used per trait
+        """
+        tokenized = [(tokenize(text), trait.lower(), float(score)) for text, trait, score in samples]
+
+        # Document frequencies over lexicon terms only
+        vocabulary = set()
+        for sides in self.lexicon.values():
+            vocabulary |= sides["positive"] | sides["negative"]
+        df = Counter()
+        for tokens, _, _ in tokenized:
+            df.update(set(tokens) & vocabulary)
+        n_docs = max(len(tokenized), 1)
+        self.idf = {term: math.log((1 + n_docs) / (1 + count)) + 1.0 for term, count in df.items()}
+
+        by_trait: Dict[str, List[Tuple[List[float], float]]] = {}
+        for tokens, trait, score in tokenized:
+            features, _ = self._features(tokens, Counter(tokens), trait)
+            by_trait.setdefault(trait, []).append((features, score))
+
+        used = {}
+        for trait, rows in by_trait.items():
+            if trait not in self.lexicon or len(rows) < len(FEATURE_NAMES):
+                continue
+            self.weights[trait] = _ridge(rows, l2)
+            used[trait] = len(rows)
+        return used
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"weights": self.weights, "idf": self.idf}
+
+    def save(self, path: str) -> None:
+        """Persist fitted weights and IDF values as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "LocalScoringService":
+        """Load a fitted model from disk, falling back to the default weights."""
+        path = path or settings.LOCAL_SCORER_MODEL_PATH
+        if path and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            return cls(weights=data.get("weights"), idf=data.get("idf"))
+        return cls()
+
+
+def _ridge(rows: List[Tuple[List[float], float]], l2: float) -> List[float]:
+    """Solve (X^T X + l2*I) w = X^T y for a small dense system by Gaussian elimination."""
+    n = len(rows[0][0])
+    a = [[0.0] * n for _ in range(n)]
+    b = [0.0] * n
+    for x, y in rows:
+        for i in range(n):
+            b[i] += x[i] * y
+            for j in range(n):
+                a[i][j] += x[i] * x[j]
+    for i in range(1, n):  # leave the bias unregularized
+        a[i][i] += l2
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        if abs(a[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n):
+                a[r][c] -= factor * a[col][c]
+            b[r] -= factor * b[col]
+    w = [0.0] * n
+    for i in reversed(range(n)):
+        if abs(a[i][i]) < 1e-12:
+            continue
+        w[i] = (b[i] - sum(a[i][j] * w[j] for j in range(i + 1, n))) / a[i][i]
+    return w
+
+
+_local_scorer: Optional[LocalScoringService] = None
+
+
+def get_local_scorer() -> LocalScoringService:
+    """Return the process-wide local scorer, loading it on first use."""
+    global _local_scorer
+    if _local_scorer is None:
+        _local_scorer = LocalScoringService.load()
+    return _local_scorer
+
+
+def train_from_assessments(db, path: Optional[str] = None) -> Dict[str, int]:
+    """Fit the local scorer on LLM analyses stored with completed assessments
+
+    Args:
+        db: Database session
+        path: Where to write the fitted model, defaults to LOCAL_SCORER_MODEL_PATH
+
+    Returns:
+        dict: Number of samples used per trait
+    """
+    from app.models.assessment import Assessment
+    from app.models.question import Question
+
+    traits = dict(db.query(Question.id, Question.trait_category).all())
+    samples = []
+    for assessment in db.query(Assessment).filter(Assessment.status == "completed").yield_per(500):
+        analyses = (assessment.result or {}).get("response_analyses") or {}
+        for question_id, analysis in analyses.items():
+            text = (assessment.responses or {}).get(question_id)
+            trait = traits.get(int(question_id))
+            if text and trait and analysis.get("source") == "llm" and "score" in analysis:
+                samples.append((text, trait, float(analysis["score"])))
+
+    scorer = LocalScoringService()
+    used = scorer.fit(samples)
+    scorer.save(path or settings.LOCAL_SCORER_MODEL_PATH)
+
+    global _local_scorer
+    _local_scorer = scorer
+    return used
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Fitted local scorer: {train_from_assessments(session)}")
+    finally:
+        session.close()
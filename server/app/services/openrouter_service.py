@@ -1,9 +1,26 @@
 # OpenRouter Service Module
-# This module provides an interface to the OpenRouter AI API for personality assessment
+# This module provides the LLM operations of the personality assessment. Calls are routed per
+# operation to a provider and model (see app.services.llm_providers); OpenRouter is the default.
 
-import httpx
+import asyncio
+import hashlib
+import json
+import time
+from pydantic import BaseModel
 from app.config import settings
-from typing import Dict, List, Any, Optional
+from app.schemas.assessment import ProfileNarrative, ResponseAnalysis
+from app.services.llm_limiter import Priority, get_llm_limiter
+from app.services.llm_providers import get_provider, model_metrics, parse_route, route_for
+from app.services.local_scoring_service import TRAIT_LEXICON
+from app.services.token_budget import compact, completion_budget, estimate_tokens, token_metrics
+from app.tracing import Span, current_span, span, tracer
+from app.services.structured_output import (
+    StructuredOutputError,
+    JSONFieldStreamer,
+    extract_json,
+    build_reask_prompt
+)
+from typing import Dict, List, Any, Optional, Type, AsyncIterator, Tuple
 
 class OpenRouterService:
     """Service class for interacting with OpenRouter AI API
@@ -11,44 +28,74 @@ class OpenRouterService:
     This class handles all AI-powered operations including:
     - Generating behavioral interview questions
     - Analyzing candidate responses
-    - Creating comprehensive personality profiles
+    - Writing the narrative of personality profiles
     
-    The service uses OpenRouter's API to access advanced language models
-    for natural language processing and analysis tasks.
+    Each operation is sent to the provider and model configured for it
+    (LLM_MODEL_QUESTIONS, LLM_MODEL_ANALYSIS, LLM_MODEL_PROFILE), through
+    OpenRouter unless a route names another provider.
     
     Attributes:
-        api_key (str): Authentication key for OpenRouter API
-        api_url (str): Base URL for OpenRouter API endpoints
-        headers (dict): HTTP headers for API requests
+        model (str): Optional 'provider:model' or model used for every operation
+            instead of the per-operation routes, e.g. to pin a re-scoring run
+        priority (Priority): Admission priority of calls that do not set their own
     """
-    def __init__(self):
-        self.api_key = settings.OPENROUTER_API_KEY
-        self.api_url = settings.OPENROUTER_API_URL
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+    # Identical requests currently in flight, shared by all instances in this process
+    _inflight: Dict[str, asyncio.Future] = {}
+    _coalescing: Dict[str, int] = {"calls": 0, "coalesced": 0}
+    
+    def __init__(self, model: Optional[str] = None, priority: Priority = Priority.INTERACTIVE):
+        self.model = model
+        self.priority = priority
+
+    def route(self, operation: str) -> Tuple[str, str]:
+        """Provider name and model that serve an operation for this instance."""
+        return parse_route(self.model) if self.model else route_for(operation)
     
-    async def generate_questions(self, trait_category: str, count: int = 3) -> List[str]:
-        """Generate behavioral questions for a specific personality trait."""
+    async def generate_questions(self, trait_category: str, count: int = 3, difficulty: Optional[int] = None) -> List[str]:
+        """Generate behavioral questions for a specific personality trait.
+        
+        A difficulty (1-5) targets the questions at a level of the trait, from
+        questions that separate candidates low on it (1) to those that separate
+        candidates high on it (5).
+        """
+        level = ""
+        if difficulty is not None:
+            level = (
+                f"Target difficulty {difficulty} on a 1-5 scale: 1 distinguishes people who are very low "
+                f"in {trait_category}, 5 distinguishes people who are very high in it.\n        "
+            )
         prompt = f"""
         Generate {count} behavioral interview questions that assess a person's {trait_category}.
         These questions should help evaluate their personality traits related to {trait_category}.
-        Return only the questions in a numbered list without any additional text.
+        {level}Return only the questions in a numbered list without any additional text.
         """
         
-        response = await self._call_openrouter(prompt)
+        response = await self._call_openrouter(prompt, priority=Priority.BATCH, operation="questions")
         # Parse the response to extract questions
         questions = self._parse_questions(response)
         return questions[:count]
     
     async def analyze_response(self, question: str, response: str, trait_category: str) -> Dict[str, Any]:
-        """Analyze a candidate's response to a behavioral question."""
+        """Analyze a candidate's response to a behavioral question.
+        
+        Responses over LLM_RESPONSE_TOKEN_BUDGET are compacted first, keeping
+        sentences with the trait's lexicon terms, and the prompt says so, so one
+        very long answer cannot make the call unbounded.
+        """
+        lexicon = TRAIT_LEXICON.get(trait_category.lower(), {})
+        response, compacted = compact(
+            response, settings.LLM_RESPONSE_TOKEN_BUDGET,
+            keywords=lexicon.get("positive", []) + lexicon.get("negative", [])
+        )
+        note = ""
+        if compacted:
+            token_metrics.record_compaction("analysis")
+            note = "(The response was very long; these are its key sentences.)\n        "
         prompt = f"""
         Analyze the following response to this behavioral question:
         
         Question: {question}
-        Response: {response}
+        {note}Response: {response}
         
         This question is designed to assess the personality trait: {trait_category}
         
@@ -60,55 +107,184 @@ class OpenRouterService:
         Format the response as a JSON with keys: 'score', 'explanation', and 'indicators'.
         """
         
-        result = await self._call_openrouter(prompt)
-        # Parse JSON from the text response
-        return self._extract_json(result)
+        return await self._call_structured(prompt, ResponseAnalysis, operation="analysis")
     
-    async def generate_personality_profile(self, all_analyses: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate a comprehensive personality profile based on all question responses."""
-        # Prepare a summary of all the analyses to send to OpenRouter
-        analyses_summary = "\n".join([
-            f"Trait: {trait}, Score: {analysis['score']}, Explanation: {analysis['explanation']}"
-            for trait, analysis in all_analyses.items()
-        ])
+    async def generate_profile_narrative(self, trait_summary: str) -> Dict[str, Any]:
+        """Write the narrative part of a personality profile from its computed scores
         
-        prompt = f"""
-        Based on the following personality trait analyses:
+        The Big Five scores and MBTI type are computed locally (see
+        ProfileAggregationService); the model only writes strengths, weaknesses
+        and career recommendations.
+        """
+        return await self._call_structured(self._narrative_prompt(trait_summary), ProfileNarrative, operation="profile")
+    
+    async def stream_profile_narrative(self, trait_summary: str) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a profile narrative, yielding (field, value) pairs as each field completes
+        
+        The caller is responsible for validating the assembled narrative, since
+        fields are forwarded before the whole object has been received.
+        """
+        streamer = JSONFieldStreamer()
+        async for chunk in self._stream_openrouter(self._narrative_prompt(trait_summary), operation="profile"):
+            for field in streamer.feed(chunk):
+                yield field
+            if streamer.done:
+                break
+    
+    def _narrative_prompt(self, trait_summary: str) -> str:
+        """Build the profile narrative prompt from the summary of computed trait scores."""
+        return f"""
+        A candidate's personality assessment produced these scores:
+        
+        {trait_summary}
         
-        {analyses_summary}
+        Based on them, list:
+        1. Top 3 strengths
+        2. Top 3 areas for improvement
+        3. 3 career fields that might be a good fit
         
-        Generate a comprehensive personality profile with:
-        1. Big Five personality trait scores (0-100 for each: Openness, Conscientiousness, Extraversion, Agreeableness, Neuroticism)
-        2. Equivalent MBTI personality type
-        3. Top 3 strengths
-        4. Top 3 areas for improvement
-        5. 3 career fields that might be a good fit
+        Format the response as a JSON with keys: 'strengths', 'weaknesses', and 'career_recommendations'.
+        """
+    
+    def _request_body(self, prompt: str, model: str, operation: str = "other") -> Dict[str, Any]:
+        """Build the chat completions request body, capping completion tokens for the operation."""
+        return {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": completion_budget(operation)
+        }
+    
+    async def _call_openrouter(
+        self,
+        prompt: str,
+        priority: Optional[Priority] = None,
+        operation: str = "other"
+    ) -> str:
+        """Make a completion call to the provider routed for the operation.
         
-        Format the response as a JSON with keys: 'big_five', 'mbti', 'strengths', 'weaknesses', and 'career_recommendations'.
+        Concurrent calls with an identical request body share a single upstream
+        request: the first caller starts it and later callers await the same
+        task until it finishes. A caller that is cancelled does not cancel the
+        shared request for the others.
         """
+        priority = self.priority if priority is None else priority
+        provider_name, model = self.route(operation)
+        body = self._request_body(prompt, model, operation)
+        key = hashlib.sha256(
+            json.dumps([provider_name, body], sort_keys=True).encode()
+        ).hexdigest()
         
-        result = await self._call_openrouter(prompt)
-        return self._extract_json(result)
-    
-    async def _call_openrouter(self, prompt: str) -> str:
-        """Make a call to the OpenRouter API."""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/chat/completions",
-                headers=self.headers,
-                json={
-                    "model": "anthropic/claude-3-opus-20240229",  # Or your preferred model
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7
-                },
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"OpenRouter API error: {response.text}")
-            
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+        with span("llm.call", **{"llm.operation": operation, "llm.provider": provider_name, "llm.model": model}) as active:
+            OpenRouterService._coalescing["calls"] += 1
+            task = OpenRouterService._inflight.get(key)
+            coalesced = task is not None
+            if task is None:
+                task = asyncio.ensure_future(self._send_openrouter(provider_name, body, prompt, priority, operation))
+                OpenRouterService._inflight[key] = task
+                task.add_done_callback(lambda t: OpenRouterService._finish_inflight(key, t))
+            else:
+                OpenRouterService._coalescing["coalesced"] += 1
+            if active is not None:
+                active.set_attribute("llm.coalesced", coalesced)
+            return await asyncio.shield(task)
+    
+    @staticmethod
+    def _finish_inflight(key: str, task: asyncio.Future) -> None:
+        OpenRouterService._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter has gone away
+    
+    @classmethod
+    def coalescing_stats(cls) -> Dict[str, int]:
+        """Return counts of LLM calls made, coalesced into an in-flight call, and currently in flight."""
+        return {**cls._coalescing, "in_flight": len(cls._inflight)}
+    
+    async def _send_openrouter(
+        self,
+        provider_name: str,
+        body: Dict[str, Any],
+        prompt: str,
+        priority: Priority,
+        operation: str
+    ) -> str:
+        """Send a chat completions request once admitted by the process-wide LLM limiter."""
+        provider = get_provider(provider_name)
+        prompt_tokens = estimate_tokens(prompt)
+        token_metrics.record_call(operation, prompt_tokens)
+        with span("llm.request", "client", **{"llm.operation": operation, "llm.estimated_prompt_tokens": prompt_tokens}) as active:
+            queued_at = time.monotonic()
+            async with get_llm_limiter().slot(priority, prompt_tokens + body["max_tokens"]) as usage:
+                if active is not None:
+                    active.set_attribute("llm.admission_wait_ms", round((time.monotonic() - queued_at) * 1000, 1))
+                started = time.monotonic()
+                try:
+                    text, reported = await provider.complete(body, operation, self._trace_headers(active))
+                except Exception:
+                    model_metrics.record(provider_name, body["model"], time.monotonic() - started, error=True)
+                    raise
+                model_metrics.record(
+                    provider_name, body["model"], time.monotonic() - started,
+                    reported.get("prompt_tokens"), reported.get("completion_tokens")
+                )
+                usage["tokens"] = reported.get("total_tokens")
+                token_metrics.record_usage(operation, reported.get("prompt_tokens"), reported.get("completion_tokens"))
+                if active is not None:
+                    active.set_attribute("llm.prompt_tokens", reported.get("prompt_tokens") or 0)
+                    active.set_attribute("llm.completion_tokens", reported.get("completion_tokens") or 0)
+                return text
+
+    @staticmethod
+    def _trace_headers(active: Optional[Span]) -> Optional[Dict[str, str]]:
+        """A traceparent header naming the current span, when tracing propagates."""
+        if active is None or not settings.TRACING_PROPAGATE:
+            return None
+        return {"traceparent": active.traceparent}
+    
+    async def _stream_openrouter(
+        self,
+        prompt: str,
+        priority: Optional[Priority] = None,
+        operation: str = "other"
+    ) -> AsyncIterator[str]:
+        """Make a streaming call to the provider routed for the operation, yielding content deltas.
+        
+        Streams carry no usage report, so completion tokens are estimated from the content.
+        """
+        priority = self.priority if priority is None else priority
+        provider_name, model = self.route(operation)
+        provider = get_provider(provider_name)
+        body = self._request_body(prompt, model, operation)
+        prompt_tokens = estimate_tokens(prompt)
+        token_metrics.record_call(operation, prompt_tokens)
+        completion_tokens = 0
+        started = None
+        failed = False
+        active = tracer.start_span("llm.stream", "client", attributes={
+            "llm.operation": operation, "llm.provider": provider_name, "llm.model": model,
+            "llm.estimated_prompt_tokens": prompt_tokens
+        }) if current_span() is not None else None
+        try:
+            async with get_llm_limiter().slot(priority, prompt_tokens + body["max_tokens"]):
+                started = time.monotonic()
+                async for content in provider.stream(body, operation, self._trace_headers(active)):
+                    completion_tokens += estimate_tokens(content)
+                    yield content
+        except Exception as e:
+            failed = True
+            if active is not None:
+                active.record_exception(e)
+            raise
+        finally:
+            # Also runs when the consumer stops reading early
+            token_metrics.record_estimated_completion(operation, completion_tokens)
+            if started is not None:
+                model_metrics.record(
+                    provider_name, model, time.monotonic() - started, prompt_tokens, completion_tokens, error=failed
+                )
+            if active is not None:
+                active.set_attribute("llm.completion_tokens", completion_tokens)
+                tracer.end_span(active)
     
     def _parse_questions(self, text: str) -> List[str]:
         """Parse generated questions from the API response."""
@@ -125,24 +301,19 @@ class OpenRouterService:
         
         return questions
     
-    def _extract_json(self, text: str) -> Dict[str, Any]:
-        """Extract JSON data from the API response."""
-        import json
-        import re
+    async def _call_structured(self, prompt: str, schema: Type[BaseModel], operation: str = "other") -> Dict[str, Any]:
+        """Call the API and parse the completion against a schema
+        
+        If the completion cannot be parsed or validated, the model is re-asked
+        once with a short prompt describing the problem instead of repeating
+        the whole request.
         
-        # Try to find JSON in the text
+        Raises:
+            StructuredOutputError: If the re-asked completion is still invalid
+        """
+        text = await self._call_openrouter(prompt, operation=operation)
         try:
-            # Look for text that appears to be JSON
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-            
-            # If no JSON format detected, try parsing the entire text
-            return json.loads(text)
-        except (json.JSONDecodeError, AttributeError):
-            # Fallback with a basic structure if JSON parsing fails
-            return {
-                "error": "Failed to parse JSON response",
-                "raw_text": text
-            }
\ No newline at end of file
+            return extract_json(text, schema)
+        except StructuredOutputError as e:
+            retry_text = await self._call_openrouter(build_reask_prompt(text, e, schema), operation=operation)
+            return extract_json(retry_text, schema)
@@ -0,0 +1,156 @@
+# Profile Aggregation Service Module
+# This module turns the per-response analyses of an assessment into its numeric profile:
+# a Big Five score with a 95% confidence interval per trait, and the MBTI type derived
+# from them. Scores are computed locally, so they are instant and reproducible; only the
+# narrative parts of a profile (strengths, weaknesses, careers) are left to the LLM.
+#
+# Each trait's score is a weighted mean of its response scores: a response weighs more the more
+# informative its question is for the candidate's level (see
+# adaptive_question_service.item_information) and the more confident its scorer was. The
+# interval comes from the weighted spread of the scores and the effective number of responses.
+# A trait without responses gets the population prior.
+
+import math
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.services.adaptive_question_service import (
+    PRIOR_MEAN,
+    PRIOR_VARIANCE,
+    RESPONSE_VARIANCE,
+    TRAITS,
+    item_information,
+)
+
+# Two-sided 95% normal quantile
+Z_95 = 1.96
+
+# Confidence assumed for analyses that do not report one (LLM analyses)
+DEFAULT_CONFIDENCE = 1.0
+
+# Floor on a question's relative information, so a question far from the candidate's level
+# still counts a little instead of being ignored
+MIN_INFORMATION = 0.1
+
+# Cap on the small-sample correction n / (n - 1) of the weighted spread, reached at an effective
+# number of responses of 2. Below that the correction diverges as one response dominates the weights
+SMALL_SAMPLE_CORRECTION_CAP = 2.0
+
+PRIOR_STDERR = round(math.sqrt(PRIOR_VARIANCE), 2)
+
+# Fixed Big Five -> MBTI mapping, after the correlations reported by McCrae & Costa (1989):
+# (trait, letter when the score is at least 50, letter otherwise), in MBTI letter order
+MBTI_MAPPING = (
+    ("extraversion", "E", "I"),
+    ("openness", "N", "S"),
+    ("agreeableness", "F", "T"),
+    ("conscientiousness", "J", "P"),
+)
+
+# Behavioral indicators per trait included in the narrative prompt
+NARRATIVE_INDICATORS = 4
+
+
+class ProfileAggregationService:
+    """Service for deterministic scoring of assessment profiles
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def trait_scores(analyses_by_trait: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, float]]:
+        """Aggregate the analyses of each trait into a score and 95% confidence interval
+
+        Args:
+            analyses_by_trait: Trait -> analyses of its responses, each with 'score',
+                optionally 'confidence', and the question's 'difficulty'
+
+        Returns:
+            Dict[str, Dict[str, float]]: Trait -> 'score', 'ci_low', 'ci_high', 'stderr'
+                and 'responses'. Traits without responses get the prior.
+        """
+        results = {}
+        for trait in TRAITS:
+            analyses = [a for a in analyses_by_trait.get(trait, []) if a.get("score") is not None]
+            if not analyses:
+                results[trait] = {
+                    "score": PRIOR_MEAN,
+                    "ci_low": round(max(0.0, PRIOR_MEAN - Z_95 * PRIOR_STDERR), 1),
+                    "ci_high": round(min(100.0, PRIOR_MEAN + Z_95 * PRIOR_STDERR), 1),
+                    "stderr": PRIOR_STDERR,
+                    "responses": 0,
+                }
+                continue
+
+            scores = [float(a["score"]) for a in analyses]
+            confidences = [max(float(a.get("confidence", DEFAULT_CONFIDENCE)), 0.05) for a in analyses]
+
+            # Question information depends on the candidate's level, which is taken from a
+            # confidence-weighted first pass so the result does not depend on response order
+            level = sum(s * c for s, c in zip(scores, confidences)) / sum(confidences)
+            weights = [
+                max(item_information(level, a.get("difficulty")), MIN_INFORMATION) * c
+                for a, c in zip(analyses, confidences)
+            ]
+            total = sum(weights)
+            mean = sum(w * s for w, s in zip(weights, scores)) / total
+
+            # Standard error of a weighted mean: the weighted spread of the scores, never below
+            # the noise of a single response, over the effective number of responses
+            effective_n = total * total / sum(w * w for w in weights)
+            spread = sum(w * (s - mean) ** 2 for w, s in zip(weights, scores)) / total
+            if len(scores) > 1:
+                spread *= effective_n / (effective_n - 1) if effective_n > 2 else SMALL_SAMPLE_CORRECTION_CAP
+            stderr = math.sqrt(max(spread, RESPONSE_VARIANCE) / effective_n)
+
+            results[trait] = {
+                "score": round(mean, 1),
+                "ci_low": round(max(0.0, mean - Z_95 * stderr), 1),
+                "ci_high": round(min(100.0, mean + Z_95 * stderr), 1),
+                "stderr": round(stderr, 2),
+                "responses": len(analyses),
+            }
+        return results
+
+    @staticmethod
+    def mbti(big_five: Dict[str, float]) -> str:
+        """Derive the MBTI type from Big Five scores with the fixed MBTI_MAPPING."""
+        return "".join(
+            high if big_five.get(trait, PRIOR_MEAN) >= 50 else low
+            for trait, high, low in MBTI_MAPPING
+        )
+
+    @staticmethod
+    def score_profile(analyses_by_trait: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Numeric part of a profile: 'big_five', 'big_five_intervals' and 'mbti'."""
+        traits = ProfileAggregationService.trait_scores(analyses_by_trait)
+        big_five = {trait: result["score"] for trait, result in traits.items()}
+        return {
+            "big_five": big_five,
+            "big_five_intervals": {
+                trait: [result["ci_low"], result["ci_high"]] for trait, result in traits.items()
+            },
+            "mbti": ProfileAggregationService.mbti(big_five),
+        }
+
+    @staticmethod
+    def narrative_summary(
+        scores: Dict[str, Any],
+        analyses_by_trait: Dict[str, List[Dict[str, Any]]],
+        indicators: Optional[int] = None
+    ) -> str:
+        """One line per trait with its score and most frequent indicators, for the narrative prompt."""
+        indicators = NARRATIVE_INDICATORS if indicators is None else indicators
+        lines = []
+        for trait in TRAITS:
+            counts = Counter(
+                indicator
+                for analysis in analyses_by_trait.get(trait, [])
+                for indicator in analysis.get("indicators") or []
+            )
+            low, high = scores["big_five_intervals"][trait]
+            line = f"{trait.capitalize()}: {scores['big_five'][trait]:.0f}/100 (95% CI {low:.0f}-{high:.0f})"
+            if counts:
+                line += "; indicators: " + ", ".join(indicator for indicator, _ in counts.most_common(indicators))
+            lines.append(line)
+        lines.append(f"MBTI: {scores['mbti']}")
+        return "\n".join(lines)
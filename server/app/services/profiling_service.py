@@ -0,0 +1,184 @@
+# Profiling Service Module
+# This module inspects a live API worker on demand: a sampling CPU profiler that records the
+# stack of every thread at a fixed interval and reports them in folded format (the input of
+# flamegraph.pl, speedscope and similar tools), and tracemalloc snapshots that are compared
+# against a baseline to show where memory is being allocated. Nothing runs until a profile is
+# requested, so leaving this compiled in costs nothing while idle.
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Frames of the profiler's own modules are left out of reported stacks
+_OWN_FILES = (os.path.abspath(__file__), threading.__file__)
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+
+class ProfilerNotRunningError(Exception):
+    """Raised when memory snapshots are requested before tracing was started"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Statistical CPU profiler sampling every thread's stack from a background thread
+
+    Sampling looks at the stacks from outside, so the profiled code runs
+    unmodified; the cost is one stack walk per thread per interval, and only
+    while a profile is being taken. One profile runs at a time per process.
+
+    Attributes:
+        samples (Counter): Folded stack -> number of samples
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.01, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+    def _sample(self, own_thread: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                if frame.f_code.co_filename not in _OWN_FILES:
+                    stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if not stack:
+                continue
+            if not self.include_idle and self._is_idle(stack[0]):
+                continue
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.samples[";".join(reversed(stack))] += 1
+        self.sample_count += 1
+
+    @staticmethod
+    def _is_idle(leaf: str) -> bool:
+        # Threads blocked waiting for work: the event loop's selector and idle pool workers
+        return leaf.startswith(("select (", "poll (", "wait (", "_worker (", "get (", "_wait_for_tstate_lock ("))
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample for `seconds`, blocking the calling thread (run it off the event loop)
+
+        Raises:
+            ProfilerBusyError: If another profile is running in this process
+        """
+        if not SamplingProfiler._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A CPU profile is already being taken")
+        try:
+            own_thread = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            next_sample = time.monotonic()
+            while next_sample < deadline:
+                self._sample(own_thread)
+                next_sample += self.interval
+                time.sleep(max(next_sample - time.monotonic(), 0))
+        finally:
+            SamplingProfiler._lock.release()
+        return self
+
+    def folded(self) -> str:
+        """Stacks in folded format, 'root;caller;callee count' per line, most frequent first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class MemoryProfiler:
+    """tracemalloc controls with a baseline snapshot for diffs
+
+    tracemalloc slows allocations noticeably while it traces, so it is only
+    started on request and should be stopped once the investigation is done.
+    """
+    _baseline: Optional[tracemalloc.Snapshot] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    @classmethod
+    def start(cls, frames: int = 10) -> Dict[str, Any]:
+        """Start tracing allocations and take the baseline snapshot."""
+        with cls._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            cls._baseline = cls._filtered(tracemalloc.take_snapshot())
+        return cls.status()
+
+    @classmethod
+    def stop(cls) -> Dict[str, Any]:
+        """Stop tracing and drop the baseline, releasing tracemalloc's memory."""
+        with cls._lock:
+            cls._baseline = None
+            tracemalloc.stop()
+        return cls.status()
+
+    @staticmethod
+    def status() -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+        }
+
+    @classmethod
+    def snapshot(cls, top: int = 20, diff: bool = True, group_by: str = "lineno", reset: bool = False) -> Dict[str, Any]:
+        """Report the top allocation sites now, or their growth since the baseline
+
+        Args:
+            top: Number of allocation sites to report
+            diff: Compare with the baseline instead of reporting absolute sizes
+            group_by: 'lineno' or 'traceback'
+            reset: Make this snapshot the new baseline
+
+        Returns:
+            dict: Tracing status and the allocation sites, largest first
+
+        Raises:
+            ProfilerNotRunningError: If tracing has not been started
+        """
+        with cls._lock:
+            if not tracemalloc.is_tracing():
+                raise ProfilerNotRunningError("Memory tracing is not running, start it first")
+            snapshot = cls._filtered(tracemalloc.take_snapshot())
+            baseline = cls._baseline
+            if reset or baseline is None:
+                cls._baseline = snapshot
+
+        if diff and baseline is not None:
+            stats = snapshot.compare_to(baseline, group_by)[:top]
+            sites = [{
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+                "traceback": stat.traceback.format(),
+            } for stat in stats]
+        else:
+            stats = snapshot.statistics(group_by)[:top]
+            sites = [{
+                "size_bytes": stat.size,
+                "count": stat.count,
+                "traceback": stat.traceback.format(),
+            } for stat in stats]
+        return {**cls.status(), "diff": bool(diff and baseline is not None), "sites": sites}
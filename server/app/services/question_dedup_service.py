@@ -0,0 +1,304 @@
+# Question Deduplication Service Module
+# This module detects near-duplicate questions by the Jaccard similarity of their word
+# shingles (stemmed words and word pairs, with common synonyms folded together). MinHash
+# signatures of the shingles are split into LSH bands stored in question_fingerprint_bands,
+# so a lookup touches only questions sharing a band key instead of the whole bank, and the
+# candidates found are confirmed by their exact Jaccard similarity.
+#
+# Batch dedup over the existing bank (from the server directory):
+#   python -m app.services.question_dedup_service            # report only
+#   python -m app.services.question_dedup_service --apply    # delete unreferenced duplicates
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.question import Question
+from app.models.question_fingerprint import QuestionFingerprint
+
+# 16 bands of 2 MinHash values: pairs with Jaccard 0.5 share a band key with probability
+# 1 - (1 - 0.5 ** 2) ** 16 = 99%, pairs with Jaccard 0.2 are candidates 48% of the time
+LSH_BANDS = 16
+LSH_ROWS = 2
+NUM_PERMUTATIONS = LSH_BANDS * LSH_ROWS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240101)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+# Words that carry no meaning for duplicate detection in behavioral questions
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "for", "with", "about", "from",
+    "you", "your", "yours", "yourself", "i", "me", "my", "we", "our", "it", "its", "this", "that",
+    "is", "are", "was", "were", "be", "been", "do", "did", "does", "have", "had", "has",
+    "can", "could", "would", "should", "will", "please", "tell", "us", "describe", "share",
+    "time", "when", "what", "how", "which", "who", "there", "some", "any", "as", "by",
+    "usually", "typically", "generally", "often", "ever", "recently", "specific", "particular",
+    "feel", "get", "got",
+}
+
+# Words that behavioral questions use interchangeably, folded into one before stemming
+SYNONYMS = {
+    "coworker": "colleague", "coworkers": "colleague", "teammate": "colleague", "teammates": "colleague",
+    "peer": "colleague", "peers": "colleague", "colleagues": "colleague",
+    "criticism": "feedback", "critique": "feedback", "criticized": "feedback", "criticised": "feedback",
+    "boss": "manager", "supervisor": "manager", "superior": "manager",
+    "job": "work", "workplace": "work", "office": "work",
+    "deal": "handle", "cope": "handle", "manage": "handle",
+    "disagreement": "conflict", "dispute": "conflict", "argument": "conflict",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Longest first; 'ies'/'ied' become 'y' so 'stories' and 'story' meet
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ied", "ed", "es", "s", "ly")
+
+
+def _stem(word: str) -> str:
+    """Strip one inflectional suffix, then a final 'e', so every form of a word gets the same stem
+
+    'deadline' and 'deadlines' both become 'deadlin', 'face' and 'facing' both 'fac'.
+    """
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)] + ("y" if suffix in ("ies", "ied") else "")
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def normalize(text: str) -> List[str]:
+    """Lower-case, tokenize, fold synonyms, drop stopwords and stem."""
+    tokens = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        word = SYNONYMS.get(word, word)
+        if word not in STOPWORDS:
+            tokens.append(_stem(word))
+    return tokens
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Word unigrams and bigrams of a question's normalized text."""
+    tokens = normalize(text)
+    return frozenset(tokens) | frozenset(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _hash64(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+def minhash(shingle_set: Iterable[str]) -> List[int]:
+    """MinHash signature of a shingle set, NUM_PERMUTATIONS values."""
+    hashes = [_hash64(shingle.encode()) for shingle in shingle_set]
+    if not hashes:
+        return [0] * NUM_PERMUTATIONS
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(shingle_set: Iterable[str]) -> List[int]:
+    """LSH band keys of a shingle set, as signed 64-bit integers for a BIGINT column."""
+    signature = minhash(shingle_set)
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        key = _hash64(b"".join(value.to_bytes(8, "big") for value in rows))
+        keys.append(key - (1 << 64) if key >= 1 << 63 else key)
+    return keys
+
+
+def is_duplicate(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    return jaccard(a, b) >= settings.QUESTION_DUPLICATE_MIN_JACCARD
+
+
+class QuestionDedupService:
+    """Service for near-duplicate detection over the question bank
+
+    Two questions of the same trait are near-duplicates when the Jaccard
+    similarity of their shingles is at least QUESTION_DUPLICATE_MIN_JACCARD.
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def find_duplicate(
+        db: Session,
+        text: str,
+        shingle_set: Optional[FrozenSet[str]] = None,
+        trait_category: Optional[str] = None
+    ) -> Optional[Question]:
+        """Return an existing question that is a near-duplicate of `text`, if any
+
+        Args:
+            db: Database session
+            text: Question text to check
+            shingle_set: Precomputed shingles(text)
+            trait_category: Only consider questions assessing this trait; a similar
+                question for another trait is not a duplicate
+
+        Returns:
+            Optional[Question]: Most similar existing near-duplicate, or None
+        """
+        if shingle_set is None:
+            shingle_set = shingles(text)
+        keys = band_keys(shingle_set)
+        candidate_ids = db.query(QuestionFingerprint.question_id).filter(or_(*(
+            and_(QuestionFingerprint.band == band, QuestionFingerprint.key == key)
+            for band, key in enumerate(keys)
+        )))
+        query = db.query(Question).filter(Question.id.in_(candidate_ids))
+        if trait_category is not None:
+            query = query.filter(Question.trait_category == trait_category)
+
+        best: Optional[Tuple[float, Question]] = None
+        for question in query:
+            similarity = jaccard(shingle_set, shingles(question.text))
+            if similarity >= settings.QUESTION_DUPLICATE_MIN_JACCARD and (best is None or similarity > best[0]):
+                best = (similarity, question)
+        return best[1] if best else None
+
+    @staticmethod
+    def add_fingerprint(
+        db: Session,
+        question: Question,
+        shingle_set: Optional[FrozenSet[str]] = None
+    ) -> List[QuestionFingerprint]:
+        """Index a question's LSH band keys (without committing)."""
+        if shingle_set is None:
+            shingle_set = shingles(question.text)
+        rows = [
+            QuestionFingerprint(question_id=question.id, band=band, key=key)
+            for band, key in enumerate(band_keys(shingle_set))
+        ]
+        db.add_all(rows)
+        return rows
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> int:
+        """Fingerprint questions that have no fingerprint yet
+
+        Returns:
+            int: Number of questions fingerprinted
+        """
+        count = 0
+        while True:
+            questions = db.query(Question).filter(
+                ~exists().where(QuestionFingerprint.question_id == Question.id)
+            ).order_by(Question.id).limit(batch_size).all()
+            if not questions:
+                return count
+            for question in questions:
+                QuestionDedupService.add_fingerprint(db, question)
+            db.commit()
+            count += len(questions)
+
+    @staticmethod
+    def find_clusters(db: Session) -> List[List[int]]:
+        """Group the whole bank into near-duplicate clusters
+
+        Questions are only compared with others of the same trait sharing a
+        band key, and clusters are merged with union-find, so the cost grows
+        with the bank size and bucket sizes rather than with the number of pairs.
+
+        Returns:
+            List[List[int]]: Clusters of two or more question IDs, each sorted ascending
+        """
+        questions = {
+            question_id: (trait, shingles(text))
+            for question_id, trait, text in db.query(Question.id, Question.trait_category, Question.text)
+        }
+        parent = {question_id: question_id for question_id in questions}
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        buckets: Dict[Tuple[Optional[str], int, int], List[int]] = defaultdict(list)
+        for question_id, band, key in db.query(
+            QuestionFingerprint.question_id, QuestionFingerprint.band, QuestionFingerprint.key
+        ):
+            if question_id in questions:
+                buckets[(questions[question_id][0], band, key)].append(question_id)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if find(first) != find(second) and is_duplicate(questions[first][1], questions[second][1]):
+                        parent[max(find(first), find(second))] = min(find(first), find(second))
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for question_id in questions:
+            clusters[find(question_id)].append(question_id)
+        return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+    @staticmethod
+    def referenced_question_ids(db: Session) -> Set[int]:
+        """IDs of questions answered in any assessment, which must not be deleted."""
+        referenced: Set[int] = set()
+        for (responses,) in db.query(Assessment.responses).yield_per(500):
+            referenced.update(int(question_id) for question_id in (responses or {}))
+        return referenced
+
+    @staticmethod
+    def dedup_bank(db: Session, apply: bool = False) -> Dict[str, int]:
+        """Find near-duplicate clusters in the bank and optionally delete the extras
+
+        The oldest question of each cluster is kept. Duplicates that have been
+        answered in an assessment are kept too, so stored responses still resolve.
+
+        Args:
+            db: Database session
+            apply: Delete duplicates when True, only report when False
+
+        Returns:
+            dict: Counts of fingerprinted, clustered and deleted questions
+        """
+        fingerprinted = QuestionDedupService.backfill(db)
+        clusters = QuestionDedupService.find_clusters(db)
+        referenced = QuestionDedupService.referenced_question_ids(db)
+        removable = [
+            question_id for members in clusters for question_id in members[1:]
+            if question_id not in referenced
+        ]
+        if apply and removable:
+            for start in range(0, len(removable), 500):
+                chunk = removable[start:start + 500]
+                db.query(QuestionFingerprint).filter(
+                    QuestionFingerprint.question_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                db.query(Question).filter(Question.id.in_(chunk)).delete(synchronize_session=False)
+            db.commit()
+        return {
+            "fingerprinted": fingerprinted,
+            "clusters": len(clusters),
+            "duplicates": sum(len(members) - 1 for members in clusters),
+            "deleted": len(removable) if apply else 0,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Find and remove near-duplicate questions")
+    parser.add_argument("--apply", action="store_true", help="Delete unreferenced duplicates")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(f"Question dedup: {QuestionDedupService.dedup_bank(session, apply=args.apply)}")
+    finally:
+        session.close()
@@ -0,0 +1,217 @@
+# Question Pool Service Module
+# This module keeps a pool of pre-generated questions per trait and difficulty.
+# A background task refills buckets that drop below the low watermark through
+# OpenRouterService.generate_questions (admitted at batch priority by the LLM limiter),
+# so drawing questions into the bank never waits on the LLM.
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.question import Question
+from app.models.question_pool import PooledQuestion
+from app.services.adaptive_question_service import TRAITS, question_bank
+from app.services.openrouter_service import OpenRouterService
+from app.services.question_dedup_service import QuestionDedupService, is_duplicate, shingles
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionPoolManager:
+    """Pool of ready questions with background low-watermark refill
+
+    Attributes:
+        target (int): Questions to keep per (trait, difficulty) bucket
+        low_watermark (int): Bucket size that triggers a refill
+        difficulties (List[int]): Difficulty levels kept in the pool
+    """
+    def __init__(
+        self,
+        target: int,
+        low_watermark: int,
+        difficulties: List[int],
+        session_factory=None,
+        service_factory=OpenRouterService
+    ):
+        from app.database import SessionLocal
+
+        self.target = target
+        self.low_watermark = low_watermark
+        self.difficulties = difficulties
+        self.session_factory = session_factory or SessionLocal
+        self.service_factory = service_factory
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.counters = {"refills": 0, "generated": 0, "rejected_duplicates": 0, "drawn": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Drawing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def levels(db: Session) -> Dict[Tuple[str, int], int]:
+        """Number of pooled questions per (trait, difficulty)."""
+        rows = db.query(
+            PooledQuestion.trait_category, PooledQuestion.difficulty, func.count(PooledQuestion.id)
+        ).group_by(PooledQuestion.trait_category, PooledQuestion.difficulty)
+        return {(trait, difficulty): count for trait, difficulty, count in rows}
+
+    def draw(self, db: Session, trait_category: str, count: int, difficulty: Optional[int] = None) -> List[Question]:
+        """Move up to `count` pooled questions into the question bank
+
+        Questions that have become near-duplicates of the bank since they were
+        pooled are discarded. Drawing wakes the refill task.
+
+        Args:
+            db: Database session
+            trait_category: Trait to draw questions for
+            count: Number of questions wanted
+            difficulty: Only draw questions of this difficulty
+
+        Returns:
+            List[Question]: Newly saved questions, possibly fewer than requested
+        """
+        drawn: List[Question] = []
+        query = db.query(PooledQuestion).filter(PooledQuestion.trait_category == trait_category)
+        if difficulty is not None:
+            query = query.filter(PooledQuestion.difficulty == difficulty)
+
+        while len(drawn) < count:
+            rows = query.order_by(PooledQuestion.id).limit(count - len(drawn)).all()
+            if not rows:
+                break
+            for row in rows:
+                db.delete(row)
+                shingle_set = shingles(row.text)
+                if QuestionDedupService.find_duplicate(db, row.text, shingle_set, row.trait_category) is not None:
+                    self.counters["rejected_duplicates"] += 1
+                    continue
+                question = Question(text=row.text, trait_category=row.trait_category, difficulty=row.difficulty)
+                db.add(question)
+                db.flush()
+                QuestionDedupService.add_fingerprint(db, question, shingle_set)
+                drawn.append(question)
+            db.commit()
+
+        if drawn:
+            question_bank.invalidate()
+            self.counters["drawn"] += len(drawn)
+        self.request_refill()
+        return drawn
+
+    # ------------------------------------------------------------------
+    # Refilling
+    # ------------------------------------------------------------------
+    def request_refill(self) -> None:
+        """Ask the background task to check the pool now instead of at its next interval."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def refill_once(self) -> int:
+        """Refill every bucket below the low watermark up to the target
+
+        Returns:
+            int: Number of questions added to the pool
+        """
+        db = self.session_factory()
+        added = 0
+        try:
+            levels = self.levels(db)
+            low = [
+                (trait, difficulty) for trait in TRAITS for difficulty in self.difficulties
+                if levels.get((trait, difficulty), 0) < self.low_watermark
+            ]
+            if not low:
+                return 0
+            service = self.service_factory()
+            for trait, difficulty in low:
+                try:
+                    texts = await service.generate_questions(
+                        trait, count=self.target - levels.get((trait, difficulty), 0), difficulty=difficulty
+                    )
+                except Exception:
+                    self.counters["errors"] += 1
+                    logger.exception("Question pool refill failed for %s difficulty %s", trait, difficulty)
+                    continue
+                added += self._add(db, trait, difficulty, texts)
+            self.counters["refills"] += 1
+            return added
+        finally:
+            db.close()
+
+    def _add(self, db: Session, trait: str, difficulty: int, texts: List[str]) -> int:
+        """Pool generated texts that are not near-duplicates of the bank or the pool."""
+        # Other workers may have refilled the same bucket meanwhile, so never exceed the target
+        room = self.target - db.query(func.count(PooledQuestion.id)).filter(
+            PooledQuestion.trait_category == trait, PooledQuestion.difficulty == difficulty
+        ).scalar()
+        pooled = [
+            shingles(text) for (text,) in
+            db.query(PooledQuestion.text).filter(PooledQuestion.trait_category == trait)
+        ]
+        added = 0
+        for text in texts:
+            if added >= room:
+                break
+            shingle_set = shingles(text)
+            if any(is_duplicate(shingle_set, other) for other in pooled) \
+                    or QuestionDedupService.find_duplicate(db, text, shingle_set, trait) is not None:
+                self.counters["rejected_duplicates"] += 1
+                continue
+            db.add(PooledQuestion(text=text, trait_category=trait, difficulty=difficulty))
+            pooled.append(shingle_set)
+            added += 1
+        db.commit()
+        self.counters["generated"] += added
+        return added
+
+    async def run(self) -> None:
+        """Refill the pool whenever a draw wakes the task, and at least every check interval."""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.refill_once()
+            except Exception:
+                self.counters["errors"] += 1
+                logger.exception("Question pool refill failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.QUESTION_POOL_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {**self.counters, "running": self._task is not None and not self._task.done()}
+
+
+_pool: Optional[QuestionPoolManager] = None
+
+
+def get_question_pool() -> QuestionPoolManager:
+    """Return the process-wide question pool manager, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = QuestionPoolManager(
+            settings.QUESTION_POOL_TARGET,
+            settings.QUESTION_POOL_LOW_WATERMARK,
+            settings.QUESTION_POOL_DIFFICULTIES,
+        )
+    return _pool
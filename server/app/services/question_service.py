@@ -1,12 +1,20 @@
 # Question Service Module
 # This module handles personality assessment question management and generation
 
+from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.question import Question
 from app.schemas.question import QuestionCreate
 from app.services.openrouter_service import OpenRouterService
-from typing import List, Optional
+from app.services.adaptive_question_service import question_bank
+from app.services.question_dedup_service import QuestionDedupService, shingles
+from app.services.question_pool_service import get_question_pool
+from app.config import settings
+from app.tracing import trace_methods
+from typing import List, Optional, Tuple
 
+@trace_methods
 class QuestionService:
     """Service class for managing personality assessment questions
     
@@ -23,16 +31,32 @@ class QuestionService:
     All methods are implemented as static methods for stateless operation.
     """
     @staticmethod
-    async def create_question(db: Session, question: QuestionCreate) -> Question:
+    async def create_question(db: Session, question: QuestionCreate) -> Tuple[Question, bool]:
+        """Save a question unless a near-duplicate for the same trait already exists
+        
+        Near-duplicates are merged into the existing question, which is returned
+        instead of inserting a new row.
+        
+        Returns:
+            Tuple[Question, bool]: The saved or existing question, and whether it was created
+        """
+        shingle_set = shingles(question.text)
+        duplicate = QuestionDedupService.find_duplicate(db, question.text, shingle_set, question.trait_category)
+        if duplicate is not None:
+            return duplicate, False
+
         db_question = Question(
             text=question.text,
             trait_category=question.trait_category,
             difficulty=question.difficulty
         )
         db.add(db_question)
+        db.flush()
+        QuestionDedupService.add_fingerprint(db, db_question, shingle_set)
         db.commit()
         db.refresh(db_question)
-        return db_question
+        question_bank.invalidate()
+        return db_question, True
     
     @staticmethod
     def get_questions(db: Session, skip: int = 0, limit: int = 100) -> List[Question]:
@@ -41,19 +65,46 @@ class QuestionService:
     @staticmethod
     def get_questions_by_trait(db: Session, trait_category: str) -> List[Question]:
         return db.query(Question).filter(Question.trait_category == trait_category).all()
+
+    @staticmethod
+    def get_bank_version(db: Session) -> Tuple[int, Optional[int], int, Optional[datetime]]:
+        """Summarize the question table in one aggregate query, without loading any rows
+
+        Timestamps have one-second resolution and SQLite can reuse the highest ID
+        after a delete, so the total text length is included too: deleting a
+        question and adding another within the same second still changes it.
+
+        Returns:
+            Tuple: Row count, highest ID, total text length and latest modification time
+        """
+        count, max_id, text_length, created, updated = db.query(
+            func.count(Question.id), func.max(Question.id), func.coalesce(func.sum(func.length(Question.text)), 0),
+            func.max(Question.created_at), func.max(Question.updated_at)
+        ).one()
+        modified = max((value for value in (created, updated) if value is not None), default=None)
+        return count, max_id, text_length, modified
     
     @staticmethod
     async def generate_and_save_questions(db: Session, openrouter_service: OpenRouterService) -> List[Question]:
-        """Generate questions for all major personality traits and save them to the database."""
+        """Generate questions for all major personality traits and save them to the database.
+        
+        Questions are drawn from the pre-generated pool when available.
+        """
         traits = [
             "openness", "conscientiousness", "extraversion", 
             "agreeableness", "neuroticism"
         ]
         
         all_questions = []
+        pool = get_question_pool()
         
         for trait in traits:
-            questions_text = await openrouter_service.generate_questions(trait, count=3)
+            # Take ready questions from the pool, and only call the LLM for any shortfall
+            drawn = pool.draw(db, trait, count=3) if settings.QUESTION_POOL_ENABLED else []
+            all_questions.extend(drawn)
+            if len(drawn) >= 3:
+                continue
+            questions_text = await openrouter_service.generate_questions(trait, count=3 - len(drawn))
             
             for text in questions_text:
                 question = QuestionCreate(
@@ -61,7 +112,8 @@ class QuestionService:
                     trait_category=trait,
                     difficulty=2  # Default medium difficulty
                 )
-                db_question = await QuestionService.create_question(db, question)
-                all_questions.append(db_question)
+                db_question, _ = await QuestionService.create_question(db, question)
+                if db_question not in all_questions:
+                    all_questions.append(db_question)
         
         return all_questions
\ No newline at end of file
@@ -0,0 +1,151 @@
+# Refresh Token Service Module
+# This module issues, rotates and revokes refresh tokens. Tokens are random and opaque, so
+# they are stored as a SHA-256 hash and checked with one indexed lookup: unlike a password
+# login, a refresh involves no bcrypt verification.
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused"""
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every stored time is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RefreshTokenService:
+    """Service class for refresh tokens
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """SHA-256 of a token; tokens carry 256 random bits, so no salt or slow hash is needed."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def issue(db: Session, user: User, family_id: Optional[str] = None) -> Tuple[RefreshToken, str]:
+        """Create a refresh token for a user
+        
+        Args:
+            db: Database session, the caller commits
+            user: Owner of the token
+            family_id: Family of the token being rotated, or None for a new login
+            
+        Returns:
+            Tuple[RefreshToken, str]: The stored record and the token to send to the client
+        """
+        token = secrets.token_urlsafe(32)
+        record = RefreshToken(
+            user_id=user.id,
+            token_hash=RefreshTokenService.hash_token(token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        db.add(record)
+        db.flush()
+        return record, token
+
+    @staticmethod
+    def rotate(db: Session, token: str) -> Tuple[User, str]:
+        """Exchange a refresh token for a new one of the same family
+        
+        The old token is revoked with a conditional UPDATE, so of two concurrent
+        refreshes with the same token only one succeeds. Presenting a token that
+        was already rotated revokes its whole family, logging out both the
+        legitimate client and whoever copied the token.
+        
+        Args:
+            db: Database session, committed on success and on reuse
+            token: Refresh token sent by the client
+            
+        Returns:
+            Tuple[User, str]: The token's user and the replacement token
+            
+        Raises:
+            RefreshTokenError: If the token cannot be used
+        """
+        now = datetime.now(timezone.utc)
+        record = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == RefreshTokenService.hash_token(token)
+        ).first()
+        if record is None:
+            raise RefreshTokenError("Invalid refresh token")
+        if record.revoked_at is not None:
+            if record.replaced_by_id is not None:
+                RefreshTokenService.revoke_family(db, record.family_id)
+            raise RefreshTokenError("Refresh token has been revoked")
+        if _aware(record.expires_at) <= now:
+            raise RefreshTokenError("Refresh token has expired")
+
+        user = db.get(User, record.user_id)
+        if user is None or not user.is_active:
+            raise RefreshTokenError("User is inactive")
+
+        claimed = db.query(RefreshToken).filter(
+            RefreshToken.id == record.id, RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        if not claimed:
+            # A concurrent refresh rotated it first: this is a second use of the token
+            db.rollback()
+            RefreshTokenService.revoke_family(db, record.family_id)
+            raise RefreshTokenError("Refresh token has been revoked")
+
+        replacement, new_token = RefreshTokenService.issue(db, user, family_id=record.family_id)
+        db.query(RefreshToken).filter(RefreshToken.id == record.id).update(
+            {RefreshToken.replaced_by_id: replacement.id}, synchronize_session=False
+        )
+        RefreshTokenService.purge_expired(db, user.id)
+        db.commit()
+        return user, new_token
+
+    @staticmethod
+    def revoke(db: Session, token: str) -> bool:
+        """Revoke a token and every token of its family, for logout
+        
+        Returns:
+            bool: True if the token was known
+        """
+        record = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == RefreshTokenService.hash_token(token)
+        ).first()
+        if record is None:
+            return False
+        RefreshTokenService.revoke_family(db, record.family_id)
+        return True
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: str) -> int:
+        """Revoke every active token of a family and commit."""
+        count = db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+        db.commit()
+        return count
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> int:
+        """Revoke every active token of a user, e.g. after a password change, and commit."""
+        count = db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+        db.commit()
+        return count
+
+    @staticmethod
+    def purge_expired(db: Session, user_id: int) -> int:
+        """Delete a user's expired tokens; the caller commits."""
+        return db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id, RefreshToken.expires_at <= datetime.now(timezone.utc)
+        ).delete(synchronize_session=False)
@@ -0,0 +1,348 @@
+# Rescore Service Module
+# This module re-scores completed assessments after a model or prompt change. Results go to
+# a versioned slot (assessment_results) next to the live result, and are copied over the live
+# result only when the version is cut over. Jobs checkpoint after every batch, run with bounded
+# concurrency at batch LLM priority, are capped at a number of assessments per minute, and
+# report progress and an ETA.
+#
+# From the server directory:
+#   python -m app.services.rescore_service run --version v2 --model openai/gpt-4o [--per-minute 30]
+#   python -m app.services.rescore_service status [--version v2]
+#   python -m app.services.rescore_service cutover --version v2
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.assessment_result import AssessmentResultVersion
+from app.models.candidate import Candidate
+from app.models.question import Question
+from app.models.rescore_job import RescoreJob
+from app.services.assessment_service import AssessmentService
+from app.services.candidate_trait_service import CandidateTraitService
+from app.services.llm_limiter import Priority, TokenBucket
+from app.services.openrouter_service import OpenRouterService
+
+logger = logging.getLogger(__name__)
+
+# A running job that has not checkpointed for this long is assumed to have died
+STALE_JOB_SECONDS = 600
+
+
+class RescoreError(Exception):
+    """Raised when an assessment could not be re-scored by the LLM."""
+
+
+class RescoreJobRunner:
+    """Re-scores completed assessments into one result version
+
+    Assessments that already have a result for the version are skipped, so a job
+    can be resumed, re-run with retry_failed, or extended to assessments completed
+    since it last ran.
+
+    Attributes:
+        version (str): Result version to write
+        model (str): LLM model used for scoring
+        concurrency (int): Assessments scored at the same time
+        per_minute (int): Maximum assessments started per minute
+        batch_size (int): Assessments per checkpoint
+    """
+    def __init__(
+        self,
+        version: str,
+        model: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        per_minute: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        session_factory=None,
+        service: Optional[OpenRouterService] = None
+    ):
+        from app.database import SessionLocal
+
+        self.version = version
+        self.model = model or settings.OPENROUTER_MODEL
+        self.concurrency = max(1, concurrency or settings.RESCORE_CONCURRENCY)
+        self.per_minute = max(1, per_minute or settings.RESCORE_MAX_PER_MINUTE)
+        self.batch_size = max(1, batch_size or settings.RESCORE_BATCH_SIZE)
+        self.session_factory = session_factory or SessionLocal
+        # Batch priority lets interactive scoring overtake the job in the LLM limiter
+        self.service = service or OpenRouterService(model=self.model, priority=Priority.BATCH)
+
+    # ------------------------------------------------------------------
+    # Job bookkeeping
+    # ------------------------------------------------------------------
+    def _pending(self, db: Session):
+        """Completed assessments without a result for this version."""
+        done = db.query(AssessmentResultVersion.id).filter(
+            AssessmentResultVersion.version == self.version,
+            AssessmentResultVersion.assessment_id == Assessment.id,
+        ).exists()
+        return db.query(Assessment).filter(Assessment.status == "completed", ~done)
+
+    def _start(self, db: Session, retry_failed: bool, force: bool) -> RescoreJob:
+        job = db.query(RescoreJob).filter(RescoreJob.version == self.version).first()
+        now = datetime.now(timezone.utc)
+        if job is None:
+            job = RescoreJob(version=self.version, model=self.model, last_assessment_id=0, processed=0, failed=0)
+            db.add(job)
+        elif job.status == "running" and not force and job.heartbeat_at is not None:
+            heartbeat = job.heartbeat_at if job.heartbeat_at.tzinfo else job.heartbeat_at.replace(tzinfo=timezone.utc)
+            if (now - heartbeat).total_seconds() < STALE_JOB_SECONDS:
+                raise RuntimeError(f"Rescore job {self.version} is already running (use --force to take it over)")
+        elif job.model and job.model != self.model and not force:
+            raise RuntimeError(f"Rescore job {self.version} was started with model {job.model}")
+
+        if retry_failed or job.status == "completed":
+            # Walk from the start again; assessments that already have a result are skipped
+            job.last_assessment_id = 0
+            job.failed = 0
+        job.model = self.model
+        job.status = "running"
+        job.total = job.processed + job.failed + self._pending(db).filter(
+            Assessment.id > job.last_assessment_id
+        ).count()
+        job.heartbeat_at = now
+        db.commit()
+        return job
+
+    @staticmethod
+    def _progress(job: RescoreJob, attempted: int, started: float) -> None:
+        """Update throughput, ETA and heartbeat from the assessments attempted in this run."""
+        elapsed = time.monotonic() - started
+        job.rate_per_minute = round(attempted / elapsed * 60, 2) if elapsed > 0 else None
+        remaining = max(job.total - job.processed - job.failed, 0)
+        now = datetime.now(timezone.utc)
+        job.eta_at = now + timedelta(minutes=remaining / job.rate_per_minute) if job.rate_per_minute else None
+        job.heartbeat_at = now
+        logger.info(
+            "Rescore %s: %d/%d done, %d failed, %.1f/min, ETA %s",
+            job.version, job.processed, job.total, job.failed, job.rate_per_minute or 0.0,
+            job.eta_at.strftime("%Y-%m-%d %H:%M UTC") if job.eta_at else "unknown",
+        )
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    async def score(self, items: List[Tuple[str, Question, str]]) -> Dict[str, Any]:
+        """Score one assessment's responses with the job's model
+
+        Raises:
+            RescoreError: If any response fell back to the local scorer, so that
+                a local score is never stored as the new model's result
+        """
+        response_analyses = await AssessmentService.analyze_responses(items, self.service, mode="llm")
+        fallbacks = [question_id for question_id, analysis in response_analyses.items() if analysis.get("fallback")]
+        if fallbacks:
+            raise RescoreError(f"LLM scoring failed for questions {fallbacks}")
+        profile = await AssessmentService.build_profile(
+            AssessmentService.analyses_by_trait(items, response_analyses), self.service
+        )
+        return {**profile, "response_analyses": response_analyses}
+
+    async def _score_batch(self, db: Session, batch: List[Assessment], bucket: TokenBucket) -> Dict[int, Dict[str, Any]]:
+        """Score a batch concurrently, returning results of the assessments that succeeded."""
+        question_ids = {int(question_id) for a in batch for question_id in (a.responses or {})}
+        questions = {q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids))}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(assessment: Assessment) -> Tuple[int, Optional[Dict[str, Any]]]:
+            items = [
+                (question_id, questions[int(question_id)], response_text)
+                for question_id, response_text in (assessment.responses or {}).items()
+                if int(question_id) in questions
+            ]
+            async with semaphore:
+                wait = bucket.wait_time(1, time.monotonic())
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = bucket.wait_time(1, time.monotonic())
+                bucket.take(1)
+                try:
+                    return assessment.id, await self.score(items)
+                except Exception:
+                    logger.exception("Rescore %s failed for assessment %s", self.version, assessment.id)
+                    return assessment.id, None
+
+        results = await asyncio.gather(*(run_one(assessment) for assessment in batch))
+        return {assessment_id: result for assessment_id, result in results if result is not None}
+
+    async def run(self, limit: Optional[int] = None, retry_failed: bool = False, force: bool = False) -> RescoreJob:
+        """Re-score pending assessments, resuming from the job's checkpoint
+
+        Args:
+            limit: Stop after attempting this many assessments
+            retry_failed: Walk from the first assessment again to retry earlier failures
+            force: Take over a job that looks like it is still running elsewhere
+
+        Returns:
+            RescoreJob: The job record after the run
+        """
+        db = self.session_factory()
+        try:
+            job = self._start(db, retry_failed, force)
+            started = time.monotonic()
+            attempted = 0
+            bucket = TokenBucket(min(self.concurrency, self.per_minute), self.per_minute / 60.0)
+            try:
+                while limit is None or attempted < limit:
+                    size = self.batch_size if limit is None else min(self.batch_size, limit - attempted)
+                    batch = self._pending(db).filter(
+                        Assessment.id > job.last_assessment_id
+                    ).order_by(Assessment.id).limit(size).all()
+                    if not batch:
+                        job.status = "completed"
+                        break
+                    results = await self._score_batch(db, batch, bucket)
+                    for assessment_id, result in results.items():
+                        db.add(AssessmentResultVersion(
+                            assessment_id=assessment_id, version=self.version, model=self.model, result=result
+                        ))
+                    attempted += len(batch)
+                    job.processed += len(results)
+                    job.failed += len(batch) - len(results)
+                    job.last_assessment_id = batch[-1].id
+                    self._progress(job, attempted, started)
+                    db.commit()
+                else:
+                    job.status = "paused"
+            except BaseException:
+                db.rollback()
+                job.status = "interrupted"
+                raise
+            finally:
+                db.commit()
+            if job.failed:
+                logger.warning("Rescore %s: %d assessments failed, re-run with --retry-failed", self.version, job.failed)
+            return job
+        finally:
+            db.close()
+
+
+class RescoreService:
+    """Service class for inspecting and cutting over re-scored results
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def status(db: Session, version: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return progress of every rescore job, or of one version."""
+        query = db.query(RescoreJob).order_by(RescoreJob.id)
+        if version:
+            query = query.filter(RescoreJob.version == version)
+        return [{
+            "version": job.version,
+            "model": job.model,
+            "status": job.status,
+            "processed": job.processed,
+            "failed": job.failed,
+            "total": job.total,
+            "checkpoint": job.last_assessment_id,
+            "rate_per_minute": job.rate_per_minute,
+            "eta_at": job.eta_at.isoformat() if job.eta_at else None,
+        } for job in query]
+
+    @staticmethod
+    def cutover(db: Session, version: str, backup_version: Optional[str] = None, batch_size: int = 500) -> int:
+        """Make a version's results the live results
+
+        The live result of each assessment is first saved under backup_version,
+        so the cutover can be reverted by cutting over to the backup. Candidates
+        whose latest completed assessment changed get their profile and trait
+        projection updated. Safe to re-run.
+
+        Args:
+            db: Database session
+            version: Result version to make live
+            backup_version: Version label for the replaced results, defaults to 'pre-<version>'
+            batch_size: Assessments per commit
+
+        Returns:
+            int: Number of assessments updated
+        """
+        backup_version = backup_version or f"pre-{version}"
+        updated = 0
+        last_id = 0
+        while True:
+            rows = db.query(AssessmentResultVersion).filter(
+                AssessmentResultVersion.version == version, AssessmentResultVersion.assessment_id > last_id
+            ).order_by(AssessmentResultVersion.assessment_id).limit(batch_size).all()
+            if not rows:
+                return updated
+            assessments = {
+                a.id: a for a in db.query(Assessment).filter(Assessment.id.in_([row.assessment_id for row in rows]))
+            }
+            backed_up = {
+                assessment_id for (assessment_id,) in db.query(AssessmentResultVersion.assessment_id).filter(
+                    AssessmentResultVersion.version == backup_version,
+                    AssessmentResultVersion.assessment_id.in_(list(assessments)),
+                )
+            }
+            candidate_ids = {a.candidate_id for a in assessments.values()}
+            latest = dict(db.query(Assessment.candidate_id, func.max(Assessment.id)).filter(
+                Assessment.candidate_id.in_(candidate_ids), Assessment.status == "completed"
+            ).group_by(Assessment.candidate_id))
+
+            for row in rows:
+                assessment = assessments.get(row.assessment_id)
+                if assessment is None or assessment.result == row.result:
+                    continue
+                if assessment.result and assessment.id not in backed_up:
+                    db.add(AssessmentResultVersion(
+                        assessment_id=assessment.id, version=backup_version, result=assessment.result
+                    ))
+                assessment.result = row.result
+                updated += 1
+                if latest.get(assessment.candidate_id) == assessment.id:
+                    profile = {key: value for key, value in row.result.items() if key != "response_analyses"}
+                    candidate = db.get(Candidate, assessment.candidate_id)
+                    if candidate is not None:
+                        candidate.personality_profile = profile
+                        CandidateTraitService.sync(db, candidate.id, profile, assessment.id)
+            db.commit()
+            last_id = rows[-1].assessment_id
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Re-score completed assessments into a versioned result slot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Start or resume a rescore job")
+    run_parser.add_argument("--version", required=True, help="Result version label, e.g. v2")
+    run_parser.add_argument("--model", help="LLM model (default: OPENROUTER_MODEL)")
+    run_parser.add_argument("--concurrency", type=int, help="Assessments scored at once")
+    run_parser.add_argument("--per-minute", type=int, help="Maximum assessments per minute")
+    run_parser.add_argument("--limit", type=int, help="Stop after this many assessments")
+    run_parser.add_argument("--retry-failed", action="store_true", help="Retry assessments that failed earlier")
+    run_parser.add_argument("--force", action="store_true", help="Take over a job that appears to be running")
+    status_parser = commands.add_parser("status", help="Show job progress")
+    status_parser.add_argument("--version")
+    cutover_parser = commands.add_parser("cutover", help="Make a version's results live")
+    cutover_parser.add_argument("--version", required=True)
+    cutover_parser.add_argument("--backup-version", help="Label for the replaced results (default: pre-<version>)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "run":
+        runner = RescoreJobRunner(args.version, args.model, args.concurrency, args.per_minute)
+        try:
+            asyncio.run(runner.run(limit=args.limit, retry_failed=args.retry_failed, force=args.force))
+        except KeyboardInterrupt:
+            print("Interrupted, re-run the same command to resume from the last checkpoint")
+    session = SessionLocal()
+    try:
+        if args.command == "cutover":
+            print(f"Assessments cut over: {RescoreService.cutover(session, args.version, args.backup_version)}")
+        print(json.dumps(RescoreService.status(session, args.version), indent=2))
+    finally:
+        session.close()
@@ -0,0 +1,311 @@
+# Search Service Module
+# This module maintains the full-text index over candidate responses and resume text
+# and runs ranked searches against it: SQLite FTS5 (bm25) by default, or a tsvector
+# GIN index (ts_rank) when DATABASE_URL points at PostgreSQL. Other databases fall back
+# to unindexed LIKE matching over the newest documents.
+#
+# Index existing assessments (from the server directory):
+#   python -m app.services.search_service
+
+import logging
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.search_document import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+# Resume text beyond this many characters is not indexed
+MAX_RESUME_CHARS = 200_000
+
+SNIPPET_START, SNIPPET_END = "[", "]"
+
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+_SQLITE_SEARCH = """
+    SELECT d.id, d.assessment_id, d.candidate_id, d.kind, d.question_id,
+           snippet(search_documents_fts, 0, :start, :end, '...', 16) AS snippet,
+           bm25(search_documents_fts) AS score
+    FROM search_documents_fts
+    JOIN search_documents d ON d.id = search_documents_fts.rowid
+    WHERE search_documents_fts MATCH :query AND search_documents_fts.rowid >= :cutoff {kind_filter}
+    ORDER BY score
+    LIMIT :limit OFFSET :skip
+"""
+
+# Newest-first walks of the match list stop after SEARCH_MAX_RANKED_MATCHES rows, so the
+# rowid of that match bounds how much of a very common term's match list gets ranked
+_SQLITE_CUTOFF = """
+    SELECT search_documents_fts.rowid
+    FROM search_documents_fts {kind_join}
+    WHERE search_documents_fts MATCH :query {kind_filter}
+    ORDER BY search_documents_fts.rowid DESC
+    LIMIT 1 OFFSET :window
+"""
+
+_POSTGRES_CUTOFF = """
+    SELECT d.id FROM search_documents d
+    WHERE d.body_tsv @@ websearch_to_tsquery('english', :query) {kind_filter}
+    ORDER BY d.id DESC
+    LIMIT 1 OFFSET :window
+"""
+
+# Headlines are only built for the page of hits, not for every match
+_POSTGRES_SEARCH = """
+    SELECT hits.id, hits.assessment_id, hits.candidate_id, hits.kind, hits.question_id,
+           ts_headline('english', hits.body, websearch_to_tsquery('english', :query),
+                       'MaxFragments=1, MinWords=5, MaxWords=24, StartSel=' || :start || ', StopSel=' || :end
+           ) AS snippet,
+           hits.score
+    FROM (
+        SELECT d.id, d.assessment_id, d.candidate_id, d.kind, d.question_id, d.body,
+               ts_rank(d.body_tsv, websearch_to_tsquery('english', :query)) AS score
+        FROM search_documents d
+        WHERE d.body_tsv @@ websearch_to_tsquery('english', :query) AND d.id >= :cutoff {kind_filter}
+        ORDER BY score DESC
+        LIMIT :limit OFFSET :skip
+    ) hits
+    ORDER BY hits.score DESC
+"""
+
+
+def search_terms(query: str) -> List[Tuple[str, bool]]:
+    """Split free text into (term, is_prefix) pairs: words and "quoted phrases"
+
+    A trailing '*' on a word marks a prefix match.
+    """
+    terms = []
+    for phrase, word in _TERM_RE.findall(query or ""):
+        term = phrase or word
+        prefix = not phrase and term.endswith("*") and len(term) > 1
+        term = term.rstrip("*") if prefix else term
+        if term.strip():
+            terms.append((term, prefix))
+    return terms
+
+
+def build_fts5_query(query: str) -> str:
+    """Turn free text into a safe FTS5 query
+
+    Every word or "quoted phrase" must match (implicit AND); a trailing '*'
+    on a word is kept as a prefix match. FTS5 operators are not interpreted.
+    """
+    return " ".join(
+        '"' + term.replace('"', '""') + '"' + ("*" if prefix else "")
+        for term, prefix in search_terms(query)
+    )
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _snippet(body: str, terms: List[str], width: int = 60) -> str:
+    """Text around the first matched term, with matches marked like the indexed snippets."""
+    lower = body.lower()
+    first = min((i for i in (lower.find(term.lower()) for term in terms) if i >= 0), default=0)
+    start, end = max(0, first - width), min(len(body), first + width)
+    fragment = body[start:end]
+    for term in terms:
+        fragment = re.sub(re.escape(term), lambda m: f"{SNIPPET_START}{m.group(0)}{SNIPPET_END}", fragment, flags=re.I)
+    return ("..." if start > 0 else "") + fragment + ("..." if end < len(body) else "")
+
+
+def extract_pdf_text(file_path: str) -> str:
+    """Extract the text of a PDF resume, or return '' if it cannot be read."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("pypdf is not installed, resume text is not indexed")
+        return ""
+    try:
+        reader = PdfReader(file_path)
+        parts, size = [], 0
+        for page in reader.pages:
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            size += len(page_text)
+            if size >= MAX_RESUME_CHARS:
+                break
+        return "\n".join(parts)[:MAX_RESUME_CHARS]
+    except Exception:
+        logger.exception("Could not extract text from resume %s", file_path)
+        return ""
+
+
+class SearchService:
+    """Service class for full-text search over responses and resumes
+
+    All methods are implemented as static methods for stateless operation.
+    """
+    @staticmethod
+    def _upsert(db: Session, assessment: Assessment, kind: str, question_id: Optional[int], body: str) -> None:
+        document = db.query(SearchDocument).filter(
+            SearchDocument.assessment_id == assessment.id,
+            SearchDocument.kind == kind,
+            SearchDocument.question_id == question_id if question_id is not None
+            else SearchDocument.question_id.is_(None),
+        ).first()
+        if not body.strip():
+            if document is not None:
+                db.delete(document)
+            return
+        if document is None:
+            db.add(SearchDocument(
+                assessment_id=assessment.id, candidate_id=assessment.candidate_id,
+                kind=kind, question_id=question_id, body=body,
+            ))
+        elif document.body != body:
+            document.body = body
+
+    @staticmethod
+    def index_response(db: Session, assessment: Assessment, question_id: int, response_text: str) -> None:
+        """Add or update the indexed text of one response (without committing)."""
+        SearchService._upsert(db, assessment, "response", int(question_id), response_text or "")
+
+    @staticmethod
+    def index_resume(db: Session, assessment: Assessment, resume_text: str) -> None:
+        """Add or update the indexed resume text of an assessment (without committing)."""
+        SearchService._upsert(db, assessment, "resume", None, resume_text or "")
+
+    @staticmethod
+    def search(
+        db: Session,
+        query: str,
+        kind: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Ranked full-text search over indexed responses and resumes
+
+        Args:
+            db: Database session
+            query: Words and "quoted phrases" that must all match
+            kind: Restrict to 'response' or 'resume' documents
+            skip: Number of hits to skip for pagination
+            limit: Maximum number of hits to return
+
+        Returns:
+            List[dict]: Hits, best first, with candidate, assessment, snippet and score
+
+        Note:
+            Ranking every match of a term found in most documents costs time linear in
+            the corpus, so only the newest SEARCH_MAX_RANKED_MATCHES matches (at least
+            skip + limit) are ranked; rarer queries rank all of their matches.
+        """
+        params = {"query": query, "kind": kind, "skip": skip, "limit": limit,
+                  "start": SNIPPET_START, "end": SNIPPET_END,
+                  "window": max(settings.SEARCH_MAX_RANKED_MATCHES, skip + limit)}
+        kind_filter = "AND d.kind = :kind" if kind else ""
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            params["cutoff"] = db.execute(text(_POSTGRES_CUTOFF.format(kind_filter=kind_filter)), params).scalar() or 0
+            rows = db.execute(text(_POSTGRES_SEARCH.format(kind_filter=kind_filter)), params)
+            return [SearchService._hit(row, row.score) for row in rows]
+
+        if dialect != "sqlite":
+            return SearchService._like_search(db, query, kind, skip, limit, params["window"])
+        params["query"] = build_fts5_query(query)
+        if not params["query"]:
+            return []
+        kind_join = "JOIN search_documents d ON d.id = search_documents_fts.rowid" if kind else ""
+        params["cutoff"] = db.execute(
+            text(_SQLITE_CUTOFF.format(kind_join=kind_join, kind_filter=kind_filter)), params
+        ).scalar() or 0
+        rows = db.execute(text(_SQLITE_SEARCH.format(kind_filter=kind_filter)), params)
+        # bm25() is lower-is-better and negative, report it as a positive relevance score
+        return [SearchService._hit(row, -row.score) for row in rows]
+
+    @staticmethod
+    def _like_search(
+        db: Session,
+        query: str,
+        kind: Optional[str],
+        skip: int,
+        limit: int,
+        window: int
+    ) -> List[Dict[str, Any]]:
+        """Unindexed fallback for databases without a full-text index
+
+        Documents containing every term are found with LIKE, newest first and
+        at most `window` of them, and ranked by how often the terms occur.
+        """
+        terms = [term for term, _ in search_terms(query)]
+        if not terms:
+            return []
+        documents = db.query(SearchDocument)
+        for term in terms:
+            documents = documents.filter(SearchDocument.body.ilike(_like_pattern(term), escape="\\"))
+        if kind:
+            documents = documents.filter(SearchDocument.kind == kind)
+        matches = documents.order_by(SearchDocument.id.desc()).limit(window).all()
+
+        ranked = sorted(
+            ((sum(d.body.lower().count(term.lower()) for term in terms), d) for d in matches),
+            key=lambda pair: pair[0], reverse=True
+        )[skip:skip + limit]
+        return [
+            SearchService._hit(
+                SimpleNamespace(
+                    id=d.id, assessment_id=d.assessment_id, candidate_id=d.candidate_id,
+                    kind=d.kind, question_id=d.question_id, snippet=_snippet(d.body, terms),
+                ),
+                count,
+            )
+            for count, d in ranked
+        ]
+
+    @staticmethod
+    def _hit(row, score: float) -> Dict[str, Any]:
+        return {
+            "document_id": row.id,
+            "assessment_id": row.assessment_id,
+            "candidate_id": row.candidate_id,
+            "kind": row.kind,
+            "question_id": row.question_id,
+            "snippet": row.snippet,
+            "score": round(float(score), 6),
+        }
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 500) -> int:
+        """Index the responses and resumes of every assessment
+
+        Safe to re-run: unchanged documents are left as they are.
+
+        Returns:
+            int: Number of assessments processed
+        """
+        processed = 0
+        last_id = 0
+        while True:
+            batch = db.query(Assessment).filter(Assessment.id > last_id).order_by(Assessment.id).limit(batch_size).all()
+            if not batch:
+                return processed
+            for assessment in batch:
+                for question_id, response_text in (assessment.responses or {}).items():
+                    SearchService.index_response(db, assessment, question_id, response_text)
+                if assessment.resume_file_path:
+                    SearchService.index_resume(db, assessment, extract_pdf_text(assessment.resume_file_path))
+                db.flush()
+            db.commit()
+            processed += len(batch)
+            last_id = batch[-1].id
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Indexed assessments: {SearchService.backfill(session)}")
+    finally:
+        session.close()
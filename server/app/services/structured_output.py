@@ -0,0 +1,412 @@
+# Structured Output Module
+# This module extracts, repairs and validates JSON objects embedded in LLM completions.
+# It replaces the greedy regex extraction previously used by OpenRouterService.
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type, get_args
+
+from pydantic import BaseModel, ValidationError
+
+# Characters that change the scanner state; everything else is skipped in bulk
+_SPECIAL = re.compile(r'[{}\[\]"\\]')
+_FIELD_SPECIAL = re.compile(r'[{}\[\]",\\]')
+
+_SMART_QUOTES = str.maketrans({
+    "“": '"', "”": '"', "„": '"', "″": '"',
+    "‘": "'", "’": "'", "′": "'",
+})
+_BARE_WORDS = {"True": "true", "False": "false", "None": "null", "NaN": "null", "undefined": "null"}
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*")
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM completion does not contain a valid structured object
+
+    Attributes:
+        reason (str): Short description of why parsing or validation failed
+        raw_text (str): The completion text that failed to parse
+        errors (list): Validation error details, if a JSON object was found
+    """
+    def __init__(self, reason: str, raw_text: str = "", errors: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.raw_text = raw_text
+        self.errors = errors or []
+
+
+class JSONObjectScanner:
+    """Incremental, bracket-balanced scanner for JSON objects in free text
+
+    Text can be fed in chunks (for example from a streaming completion). Each
+    call to feed() returns the top-level objects completed by that chunk. Prose
+    outside of objects is discarded as it is scanned, so memory use is bounded
+    by the size of the object currently being read.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk of text and return any completed top-level objects."""
+        buf = self._buffer + chunk
+        pos = self._pos
+        found = []
+        while True:
+            match = _SPECIAL.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            ch = match.group()
+            i = match.start()
+            pos = i + 1
+
+            if self._in_string:
+                if ch == "\\":
+                    if i + 1 >= len(buf):
+                        pos = i  # escape split across chunks, rescan once more data arrives
+                        break
+                    pos = i + 2
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._start is None:
+                # Outside of any object only an opening brace matters
+                if ch == "{":
+                    self._start = i
+                    self._stack = ["}"]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._stack.append("}")
+            elif ch == "[":
+                self._stack.append("]")
+            elif ch in "}]":
+                # Tolerate mismatched closers, the repair pass deals with the content
+                self._stack.pop()
+                if not self._stack:
+                    found.append(buf[self._start:pos])
+                    self._start = None
+
+        if self._start is None:
+            self._buffer = ""
+            self._pos = 0
+        else:
+            self._buffer = buf[self._start:]
+            self._pos = pos - self._start
+            self._start = 0
+        return found
+
+    def pending(self) -> str:
+        """Return the text of an object that has been started but not closed."""
+        return self._buffer if self._start is not None else ""
+
+
+class JSONFieldStreamer:
+    """Incremental parser that emits top-level fields of a streamed JSON object
+
+    Chunks of a completion are fed as they arrive; each call to feed() returns
+    the (key, value) pairs of the first object whose values were completed by
+    that chunk. Text before the object is skipped and parsed fields are dropped
+    from the buffer, so memory is bounded by the largest single field.
+
+    Attributes:
+        done (bool): True once the closing brace of the object has been seen
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._field_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk of text and return the fields it completed."""
+        if self.done:
+            return []
+        buf = self._buffer + chunk
+        pos = self._pos
+        fields: List[Tuple[str, Any]] = []
+        while True:
+            match = _FIELD_SPECIAL.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            ch = match.group()
+            i = match.start()
+            pos = i + 1
+
+            if self._in_string:
+                if ch == "\\":
+                    if i + 1 >= len(buf):
+                        pos = i
+                        break
+                    pos = i + 2
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._field_start = i + 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    fields.extend(_parse_fields(buf[self._field_start:i]))
+                    self._field_start = None
+                    self.done = True
+                    break
+            elif ch == "," and self._depth == 1:
+                fields.extend(_parse_fields(buf[self._field_start:i]))
+                self._field_start = i + 1
+
+        if self._field_start is None:
+            self._buffer = ""
+            self._pos = 0
+        else:
+            self._buffer = buf[self._field_start:]
+            self._pos = pos - self._field_start
+            self._field_start = 0
+        return fields
+
+
+def _parse_fields(segment: str) -> List[Tuple[str, Any]]:
+    """Parse a '"key": value' segment of an object into (key, value) pairs."""
+    segment = segment.strip()
+    if not segment:
+        return []
+    for text in ("{" + segment + "}", None):
+        try:
+            obj = json.loads(text if text is not None else repair_json("{" + segment + "}"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict):
+            return list(obj.items())
+    return []
+
+
+def repair_json(text: str) -> str:
+    """Fix common LLM formatting errors in a JSON object string
+
+    Handles smart quotes, single-quoted strings, unquoted keys, Python literals,
+    comments, trailing commas, raw newlines inside strings and truncated output
+    (unterminated strings and unclosed brackets).
+
+    Args:
+        text: JSON-like text
+
+    Returns:
+        str: Text that is more likely to be accepted by json.loads
+    """
+    text = text.translate(_SMART_QUOTES)
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if quote is not None:
+            if ch == "\\" and i + 1 < n:
+                nxt = text[i + 1]
+                # \' is not a valid JSON escape
+                out.append("'" if nxt == "'" else ch + nxt)
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')  # double quote inside a single-quoted string
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif ch == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+        elif (ch.isalpha() or ch == "_") and not (out and out[-1][-1:].isdigit()):
+            word = _IDENTIFIER.match(text, i).group()
+            rest = text[i + len(word):].lstrip()
+            if word in ("true", "false", "null"):
+                out.append(word)
+            elif rest.startswith(":"):
+                out.append(json.dumps(word))  # unquoted key
+            elif word in _BARE_WORDS:
+                out.append(_BARE_WORDS[word])
+            else:
+                out.append(json.dumps(word))  # bare string value
+            i += len(word)
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Close whatever the model left open (usually a truncated completion)
+    if quote is not None:
+        out.append('"')
+    tail = "".join(out).rstrip()
+    if tail.endswith(":"):
+        tail += " null"
+    out = [tail]
+    _strip_trailing_comma(out)
+    while stack:
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    """Remove a trailing comma (ignoring whitespace) from the output buffer."""
+    j = len(out) - 1
+    while j >= 0 and out[j].strip() == "":
+        j -= 1
+    if j >= 0:
+        stripped = out[j].rstrip()
+        if stripped.endswith(","):
+            out[j] = stripped[:-1]
+            del out[j + 1:]
+
+
+def _candidate_objects(text: str) -> List[str]:
+    """Return every top-level object in text that could hold key/value pairs,
+    plus a trailing unclosed one."""
+    scanner = JSONObjectScanner()
+    candidates = scanner.feed(text)
+    pending = scanner.pending()
+    if pending:
+        candidates.append(pending)
+    return [candidate for candidate in candidates if ":" in candidate]
+
+
+def _strict_loads(candidate: str) -> Optional[Any]:
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+
+
+def _repaired_loads(candidate: str) -> Optional[Any]:
+    try:
+        return json.loads(repair_json(candidate))
+    except json.JSONDecodeError:
+        return None
+
+
+def extract_json(text: str, schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """Extract the first JSON object from an LLM completion
+
+    Objects are located with a bracket-balanced scan. All candidates are tried
+    with a strict parse first, and only if none of them is usable are they
+    tried again after a repair pass. When a schema is given, the first object
+    (or single nested object) that validates against it is returned.
+
+    Args:
+        text: Raw completion text
+        schema: Optional Pydantic model to validate against
+
+    Returns:
+        dict: The parsed object, normalized through the schema if one was given
+
+    Raises:
+        StructuredOutputError: If no object could be parsed or none matches the schema
+    """
+    candidates = _candidate_objects(text or "")
+    if not candidates:
+        raise StructuredOutputError("no JSON object found in the response", raw_text=text)
+
+    # Errors of the last pass that parsed an object: the repair pass usually parses the
+    # same objects again, and reporting both would repeat every field error in the re-ask
+    errors: List[Dict[str, Any]] = []
+    parsed_any = False
+    for loads in (_strict_loads, _repaired_loads):
+        pass_errors: List[Dict[str, Any]] = []
+        pass_parsed = False
+        for candidate in candidates:
+            obj = loads(candidate)
+            if not isinstance(obj, dict):
+                continue
+            pass_parsed = True
+            if schema is None:
+                return obj
+
+            # Models sometimes wrap the payload, e.g. {"analysis": {...}}
+            options = [obj]
+            nested = [value for value in obj.values() if isinstance(value, dict)]
+            if len(nested) == 1:
+                options.append(nested[0])
+            for option in options:
+                try:
+                    return schema.model_validate(option).model_dump()
+                except ValidationError as e:
+                    pass_errors.extend(e.errors(include_url=False))
+        if pass_parsed:
+            parsed_any = True
+            errors = pass_errors
+
+    if not parsed_any:
+        raise StructuredOutputError("response contains malformed JSON", raw_text=text)
+    raise StructuredOutputError(
+        f"response does not match the {schema.__name__} schema",
+        raw_text=text,
+        errors=errors
+    )
+
+
+def describe_schema(schema: Type[BaseModel]) -> str:
+    """Return a compact 'key: type' description of a schema for re-ask prompts."""
+    fields = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        annotation = str(annotation) if get_args(annotation) else annotation.__name__
+        fields.append(f"'{name}': {annotation.replace('typing.', '')}")
+    return ", ".join(fields)
+
+
+def build_reask_prompt(raw_text: str, error: StructuredOutputError, schema: Type[BaseModel]) -> str:
+    """Build a short follow-up prompt asking the model to fix its previous output."""
+    details = "; ".join(
+        f"{'.'.join(str(p) for p in e.get('loc', ()))}: {e.get('msg')}" for e in error.errors[:5]
+    )
+    return f"""
+        Your previous reply could not be used: {error.reason}{f' ({details})' if details else ''}.
+
+        Previous reply:
+        {raw_text[:4000]}
+
+        Reply with only a single valid JSON object with these keys: {describe_schema(schema)}.
+        Do not include any text before or after the JSON.
+        """
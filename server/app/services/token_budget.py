@@ -0,0 +1,183 @@
+# Token Budget Module
+# This module estimates prompt sizes offline, compacts over-long candidate text to a token
+# budget before it is put into a prompt, and keeps per-operation token usage metrics.
+# Together with the per-operation completion limits this bounds the size, latency and cost
+# of every LLM call.
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.services.question_dedup_service import normalize
+
+# Word pieces, digit runs and single punctuation marks, roughly how BPE tokenizers split text
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+
+TRUNCATION_MARK = " [...]"
+SENTENCE_SEPARATOR = " ... "
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece.isalpha():
+        return 1 if len(piece) <= 6 else math.ceil(len(piece) / 4)
+    if piece.isdigit():
+        return math.ceil(len(piece) / 3)
+    return 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text without a model-specific tokenizer
+
+    Short words count as one token, longer words as one per four letters,
+    digits as one per three and every punctuation mark as one. This is close
+    to, and usually slightly above, what GPT- and Claude-style tokenizers count
+    for English prose.
+    """
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(text or ""))
+
+
+def completion_budget(operation: str) -> int:
+    """Maximum completion tokens requested for an LLM operation."""
+    return {
+        "questions": settings.LLM_COMPLETION_TOKENS_QUESTIONS,
+        "analysis": settings.LLM_COMPLETION_TOKENS_ANALYSIS,
+        "profile": settings.LLM_COMPLETION_TOKENS_PROFILE,
+    }.get(operation, settings.LLM_COMPLETION_TOKEN_ESTIMATE)
+
+
+def truncate(text: str, budget: int) -> str:
+    """Keep the beginning of text up to `budget` estimated tokens."""
+    used = 0
+    for match in _PIECE_RE.finditer(text):
+        cost = _piece_tokens(match.group())
+        if used + cost > budget:
+            return text[:match.start()].rstrip() + TRUNCATION_MARK
+        used += cost
+    return text
+
+
+def extract_key_sentences(text: str, budget: int, keywords: Iterable[str] = ()) -> str:
+    """Keep the most representative sentences of text within `budget` estimated tokens
+
+    Sentences are scored by how frequent their content words are in the whole
+    text (so sentences on the main topic of the answer win), boosted for every
+    keyword they contain and, slightly, for being the opening sentence. Repeated
+    sentences are kept once. The chosen sentences are returned in their original
+    order. The result is deterministic for a given text, budget and keywords.
+    """
+    keywords = set(normalize(" ".join(keywords)))
+    sentences, words, seen = [], [], set()
+    for sentence in _SENTENCE_RE.findall(text):
+        sentence_words = normalize(sentence)
+        key = " ".join(sentence_words)
+        if sentence_words and key not in seen:
+            seen.add(key)
+            sentences.append(sentence.strip())
+            words.append(sentence_words)
+    frequency = Counter(word for sentence_words in words for word in sentence_words)
+
+    ranked: List[Tuple[float, int]] = []
+    for index, sentence_words in enumerate(words):
+        unique = set(sentence_words)
+        score = sum(frequency[word] for word in unique) / math.sqrt(len(sentence_words))
+        score *= 1 + len(unique & keywords)
+        if index == 0:
+            score *= 1.5
+        ranked.append((-score, index))
+
+    separator_cost = estimate_tokens(SENTENCE_SEPARATOR)
+    chosen, used = [], 0
+    for _, index in sorted(ranked):
+        cost = estimate_tokens(sentences[index]) + (separator_cost if chosen else 0)
+        if used + cost <= budget:
+            chosen.append(index)
+            used += cost
+    if not chosen:
+        return truncate(text, budget)
+    return SENTENCE_SEPARATOR.join(sentences[index] for index in sorted(chosen))
+
+
+def compact(
+    text: str,
+    budget: int,
+    strategy: Optional[str] = None,
+    keywords: Iterable[str] = ()
+) -> Tuple[str, bool]:
+    """Shorten text to a token budget if it is over it
+
+    Args:
+        text: Candidate-provided text
+        budget: Maximum estimated tokens
+        strategy: 'extractive' (key sentences) or 'truncate', defaults to settings.LLM_COMPACTION_STRATEGY
+        keywords: Words that make a sentence more worth keeping in extractive mode
+
+    Returns:
+        Tuple[str, bool]: The text to use, and whether it was shortened
+    """
+    text = text or ""
+    if estimate_tokens(text) <= budget:
+        return text, False
+    strategy = strategy or settings.LLM_COMPACTION_STRATEGY
+    if strategy == "truncate":
+        return truncate(text, budget), True
+    return extract_key_sentences(text, budget, keywords), True
+
+
+class TokenMetrics:
+    """Per-operation token usage of LLM calls made by this process
+
+    Prompt tokens are counted both as estimated before the call and as reported
+    by the provider, so the estimate can be checked against reality. Streamed
+    calls carry no usage report: their completion tokens are estimated from the
+    content and kept apart from the reported counts.
+    """
+    FIELDS = (
+        "calls", "compacted", "usage_reports", "estimated_prompt_tokens", "prompt_tokens",
+        "estimated_completion_tokens", "completion_tokens",
+    )
+
+    def __init__(self):
+        self.operations: Dict[str, Dict[str, int]] = {}
+
+    def _counters(self, operation: str) -> Dict[str, int]:
+        return self.operations.setdefault(operation, dict.fromkeys(self.FIELDS, 0))
+
+    def record_call(self, operation: str, estimated_prompt_tokens: int) -> None:
+        counters = self._counters(operation)
+        counters["calls"] += 1
+        counters["estimated_prompt_tokens"] += estimated_prompt_tokens
+
+    def record_usage(self, operation: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        if prompt_tokens is None and completion_tokens is None:
+            return
+        counters = self._counters(operation)
+        counters["usage_reports"] += 1
+        counters["prompt_tokens"] += prompt_tokens or 0
+        counters["completion_tokens"] += completion_tokens or 0
+
+    def record_estimated_completion(self, operation: str, completion_tokens: int) -> None:
+        self._counters(operation)["estimated_completion_tokens"] += completion_tokens
+
+    def record_compaction(self, operation: str) -> None:
+        self._counters(operation)["compacted"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for operation, counters in self.operations.items():
+            # Averages over reported usage when there is any, estimates otherwise
+            if counters["usage_reports"]:
+                calls, prompt, completion = counters["usage_reports"], "prompt_tokens", "completion_tokens"
+            else:
+                calls, prompt, completion = counters["calls"] or 1, "estimated_prompt_tokens", "estimated_completion_tokens"
+            result[operation] = {
+                **counters,
+                "avg_prompt_tokens": round(counters[prompt] / calls, 1),
+                "avg_completion_tokens": round(counters[completion] / calls, 1),
+            }
+        return result
+
+
+token_metrics = TokenMetrics()
@@ -0,0 +1,407 @@
+# Tracing Module
+# This module records request traces: a tree of timed spans for the HTTP request, the service
+# methods it calls, every SQL statement and every LLM call, linked by trace and parent span IDs.
+# Finished traces are written in batches by a background thread to a JSON-lines file or to an
+# OTLP/HTTP collector. Trace context is read from and propagated with W3C traceparent headers.
+#
+# Tracing is off unless TRACING_EXPORTER is 'file' or 'otlp'. With it off, or for a request
+# that was not sampled, instrumented code only pays for one context variable lookup.
+
+import asyncio
+import atexit
+import functools
+import inspect
+import logging
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Longest SQL statement text kept on a span
+MAX_STATEMENT_LENGTH = 1000
+
+
+class Span:
+    """One timed operation of a trace
+
+    Attributes:
+        name (str): Operation name, e.g. 'POST /api/assessments/{assessment_id}/submit'
+        trace_id (str): 32 hex digits shared by every span of the request
+        span_id (str): 16 hex digits identifying this span
+        parent_id (str): span_id of the enclosing span, None for the root
+        sampled (bool): Whether the trace is recorded and exported
+        attributes (dict): Key/value details such as the SQL statement or model
+        status (str): 'ok' or 'error'
+    """
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "kind",
+                 "attributes", "status", "start_ns", "end_ns", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: str = "internal"):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.set_attribute("error.type", type(exc).__name__)
+        self.set_attribute("error.message", str(exc)[:500])
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost active span of this task or thread, if any."""
+    return _current_span.get()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Parse a W3C traceparent header into (trace ID, parent span ID, sampled)."""
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+class FileExporter:
+    """Appends spans to a file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "ab") as f:
+            f.write(b"".join(orjson.dumps(span.to_dict()) + b"\n" for span in spans))
+
+
+class OTLPExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding of ExportTraceServiceRequest"""
+
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint: str, service_name: str):
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                    "name": span.name,
+                    "kind": self.KINDS.get(span.kind, 1),
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [{"key": k, "value": self._value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 2 if span.status == "error" else 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def export(self, spans: List[Span]) -> None:
+        import httpx
+
+        response = httpx.post(self.endpoint, json=self.payload(spans), timeout=5.0)
+        response.raise_for_status()
+
+
+class Tracer:
+    """Creates spans and hands finished sampled spans to a background exporter
+
+    Attributes:
+        exporter: FileExporter, OTLPExporter or None when tracing is off
+        sample_rate (float): Fraction of new traces recorded; a propagated
+            traceparent's sampled flag takes precedence
+    """
+    def __init__(self, exporter=None, sample_rate: float = 1.0, batch_size: int = 256, flush_seconds: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.stats = {"spans": 0, "dropped": 0, "exported": 0, "export_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        traceparent: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Optional[Span]:
+        """Start a span as a child of the current span, or of a propagated traceparent
+
+        Returns:
+            Optional[Span]: The new span, made current; None when tracing is off
+        """
+        if not self.enabled:
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, parent.sampled, kind)
+        else:
+            propagated = parse_traceparent(traceparent) if settings.TRACING_PROPAGATE else None
+            if propagated is not None:
+                trace_id, parent_id, sampled = propagated
+            else:
+                trace_id, parent_id = secrets.token_hex(16), None
+                sampled = random.random() < self.sample_rate
+            span = Span(name, trace_id, parent_id, sampled, kind)
+        if attributes and span.sampled:
+            span.attributes.update(attributes)
+        span._token = _current_span.set(span)
+        return span
+
+    def end_span(self, span: Optional[Span]) -> None:
+        """Finish a span, restore its parent as current and queue it for export."""
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Ended in a different context than it started in (e.g. an async generator
+            # finalized by another task); the span is still recorded
+            pass
+        if span.sampled:
+            self._submit(span)
+
+    def _submit(self, span: Span) -> None:
+        self.stats["spans"] += 1
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    # Spans still queued when the process exits would be lost with the daemon thread
+                    atexit.register(self.flush)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Export every queued span now, in batches, from the calling thread."""
+        with self._export_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                try:
+                    self.exporter.export(batch)
+                    self.stats["exported"] += len(batch)
+                except Exception:
+                    self.stats["export_errors"] += 1
+                    logger.exception("Exporting %d spans failed", len(batch))
+
+
+def _build_tracer() -> Tracer:
+    exporter = None
+    if settings.TRACING_EXPORTER == "file":
+        exporter = FileExporter(settings.TRACING_FILE_PATH)
+    elif settings.TRACING_EXPORTER == "otlp":
+        exporter = OTLPExporter(settings.TRACING_OTLP_ENDPOINT, settings.TRACING_SERVICE_NAME)
+    return Tracer(exporter, settings.TRACING_SAMPLE_RATE)
+
+
+tracer = _build_tracer()
+
+
+# ----------------------------------------------------------------------
+# Instrumentation helpers
+# ----------------------------------------------------------------------
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Run a block inside a child span of the current one
+
+    Nothing is recorded outside of a traced request, so background jobs and
+    scripts are not traced unless they open a root span with tracer.start_span.
+    """
+    if not tracer.enabled or _current_span.get() is None:
+        yield None
+        return
+    active = tracer.start_span(name, kind, attributes=attributes)
+    try:
+        yield active
+    except BaseException as e:
+        active.record_exception(e)
+        raise
+    finally:
+        tracer.end_span(active)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorator running a function, coroutine function or async generator inside a span."""
+    def decorate(func: Callable) -> Callable:
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                with span(name):
+                    async for item in func(*args, **kwargs):
+                        yield item
+            return async_gen_wrapper
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator tracing every public static, class and instance method as 'Class.method'
+
+    The class is left untouched when tracing is off.
+    """
+    if not tracer.enabled:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, staticmethod):
+            setattr(cls, attr, staticmethod(traced(name)(value.__func__)))
+        elif isinstance(value, classmethod):
+            setattr(cls, attr, classmethod(traced(name)(value.__func__)))
+        elif inspect.isfunction(value):
+            setattr(cls, attr, traced(name)(value))
+    return cls
+
+
+def instrument_sqlalchemy() -> None:
+    """Record a span for every SQL statement executed by any engine of this process."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return
+    active = tracer.start_span("db.query", "client", attributes={
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        "db.executemany": executemany,
+    })
+    conn.info.setdefault("trace_spans", []).append(active)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        active = spans.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            active.set_attribute("db.rows", cursor.rowcount)
+        tracer.end_span(active)
+
+
+def _handle_error(exception_context):
+    spans = exception_context.connection.info.get("trace_spans") if exception_context.connection is not None else None
+    if spans:
+        active = spans.pop()
+        active.record_exception(exception_context.original_exception)
+        tracer.end_span(active)
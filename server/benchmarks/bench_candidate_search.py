@@ -0,0 +1,100 @@
+# Candidate Search Benchmark
+# Compares trait-range filtering over the JSON profile blob (load + parse in Python)
+# with the indexed candidate_traits projection used by GET /api/candidates/search.
+#
+# Usage (from the server directory):
+#   python -m benchmarks.bench_candidate_search [--rows 1000000] [--json-rows 50000]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+from app.database import build_engine
+from app.models import Candidate, CandidateTraits
+from app.models.base import Base
+from app.services.candidate_trait_service import BIG_FIVE, CandidateTraitService
+from sqlalchemy.orm import sessionmaker
+
+MBTI = ["INTJ", "ENTJ", "INFJ", "ENFP", "ISTJ", "ESTP", "ISFP", "ENTP"]
+
+QUERIES = {
+    "openness>70, neuroticism<40, mbti in (INTJ, ENTJ)": (
+        {"openness": (70, None), "neuroticism": (None, 40)}, ["INTJ", "ENTJ"]),
+    "conscientiousness 80-90": ({"conscientiousness": (80, 90)}, None),
+    "extraversion<10, agreeableness>90": ({"extraversion": (None, 10), "agreeableness": (90, None)}, None),
+    "mbti = ISFP": ({}, ["ISFP"]),
+    "openness>99.5, extraversion<1": ({"openness": (99.5, None), "extraversion": (None, 1)}, None),
+}
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        for start in range(0, rows, 20000):
+            candidates, traits = [], []
+            for i in range(start + 1, min(rows, start + 20000) + 1):
+                scores = {trait: round(rng.uniform(0, 100), 1) for trait in BIG_FIVE}
+                mbti = rng.choice(MBTI)
+                candidates.append({"id": i, "name": f"Candidate {i}", "email": f"c{i}@example.com",
+                                   "personality_profile": {"big_five": scores, "mbti": mbti}})
+                traits.append({"candidate_id": i, "mbti": mbti, **scores})
+            conn.execute(insert(Candidate), candidates)
+            conn.execute(insert(CandidateTraits), traits)
+
+
+def json_scan(db, ranges, mbti, limit):
+    """Previous approach: load every profile and filter in Python."""
+    matches = []
+    for candidate in db.query(Candidate).order_by(Candidate.id).yield_per(5000):
+        profile = candidate.personality_profile or {}
+        scores = profile.get("big_five", {})
+        if mbti and profile.get("mbti") not in mbti:
+            continue
+        if all((lo is None or scores.get(t, -1) >= lo) and (hi is None or scores.get(t, 101) <= hi)
+               for t, (lo, hi) in ranges.items()):
+            matches.append(candidate)
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--json-rows", type=int, default=50000,
+                        help="Rows for the JSON scan baseline (it is linear, so kept smaller)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    for label, rows in (("json scan", args.json_rows), ("indexed", args.rows)):
+        engine = build_engine(f"sqlite:///{os.path.join(directory, f'{rows}.db')}")
+        start = time.perf_counter()
+        seed(engine, rows)
+        print(f"\n{label}: {rows} candidates (seeded in {time.perf_counter() - start:.0f}s)")
+        db = sessionmaker(bind=engine)()
+        for name, (ranges, mbti) in QUERIES.items():
+            if label == "indexed":
+                fn = lambda: CandidateTraitService.search(db, ranges, mbti=mbti, limit=100)
+                ms, n = timed(fn, args.repeat)
+            else:
+                ms, n = timed(lambda: json_scan(db, ranges, mbti, 100), 1)
+            print(f"  {name:<52}{ms:>10.2f} ms  ({n} rows)")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
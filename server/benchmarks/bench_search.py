@@ -0,0 +1,86 @@
+# Full-Text Search Benchmark
+# Seeds synthetic response documents into the search index and times ranked searches
+# for rare, medium and very common terms (the latter rank every matching document).
+#
+# Usage (from the server directory):
+#   python -m benchmarks.bench_search [--rows 1000000] [--url sqlite:///./bench.db]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import build_engine
+from app.models import SearchDocument
+from app.models.base import Base
+from app.services.search_service import SearchService
+
+COMMON = ["team", "project", "work", "people", "deadline", "plan", "help", "learn", "time", "manager"]
+MEDIUM = ["conflict", "customer", "migration", "prototype", "mentor", "budget", "launch", "hiring"]
+RARE = ["kubernetes", "terraform", "haskell", "kafka"]
+FILLER = ["i", "we", "the", "a", "with", "and", "to", "my", "on", "after", "during", "because"]
+
+QUERIES = ["kubernetes", "kafka migration", '"team lead"', "mentor*", "conflict customer", "team"]
+
+
+def sentence(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(25, 60)):
+        roll = rng.random()
+        if roll < 0.0005:
+            words.append(rng.choice(RARE))
+        elif roll < 0.02:
+            words.append(rng.choice(MEDIUM))
+        elif roll < 0.25:
+            words.append(rng.choice(COMMON))
+        elif roll < 0.2505:
+            words.extend(["team", "lead"])
+        else:
+            words.append(rng.choice(FILLER))
+    return " ".join(words)
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(11)
+    with engine.begin() as conn:
+        for start in range(0, rows, 20000):
+            conn.execute(insert(SearchDocument), [
+                {"assessment_id": i // 10 + 1, "candidate_id": i // 10 + 1, "kind": "response",
+                 "question_id": i % 10 + 1, "body": sentence(rng)}
+                for i in range(start, min(rows, start + 20000))
+            ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--url", default=None, help="Database URL (default: a temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}"
+    engine = build_engine(url)
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"{args.rows} documents indexed in {time.perf_counter() - start:.0f}s\n")
+
+    db = sessionmaker(bind=engine)()
+    print(f"{'query':<24}{'page 1 ms':>12}{'page 5 ms':>12}{'hits':>8}")
+    for query in QUERIES:
+        timings = []
+        for skip in (0, 80):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = SearchService.search(db, query, skip=skip, limit=20)
+            timings.append((time.perf_counter() - start) / args.repeat * 1000)
+        print(f"{query:<24}{timings[0]:>12.2f}{timings[1]:>12.2f}{len(hits):>8}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
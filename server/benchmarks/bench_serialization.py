@@ -0,0 +1,105 @@
+# Serialization Benchmark
+# Measures per-request serialization time of list endpoints for:
+#   - the default FastAPI path (response_model validation + JSONResponse)
+#   - the default path with ORJSONResponse
+#   - pre-built TypeAdapter validation + dump_json
+#   - the trusted-row fast path used by the list routes (app.serialization)
+#
+# Usage (from the server directory):
+#   python -m benchmarks.bench_serialization [--rows 100] [--repeat 200]
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.assessment import Assessment
+from app.models.candidate import Candidate
+from app.schemas.assessment import AssessmentResponse
+from app.schemas.candidate import CandidateResponse
+from app.serialization import serialize_rows
+
+PROFILE = {
+    "big_five": {"openness": 72.0, "conscientiousness": 81.0, "extraversion": 45.0,
+                 "agreeableness": 68.0, "neuroticism": 32.0},
+    "mbti": "INTJ",
+    "strengths": ["Strategic planning", "Reliability", "Analytical thinking"],
+    "weaknesses": ["Delegation", "Tolerance for ambiguity", "Public speaking"],
+    "career_recommendations": ["Software architecture", "Operations management", "Data science"],
+    "response_analyses": {
+        str(i): {"score": 70.0, "explanation": "Consistent planning behaviour " * 8,
+                 "indicators": ["plans ahead", "tracks deadlines"], "source": "llm"}
+        for i in range(10)
+    },
+}
+
+
+def make_rows(n: int):
+    now = datetime.now(timezone.utc)
+    candidates = [
+        Candidate(id=i, name=f"Candidate {i}", email=f"candidate{i}@example.com",
+                  personality_profile=PROFILE, created_at=now)
+        for i in range(n)
+    ]
+    assessments = [
+        Assessment(id=i, candidate_id=i, status="completed", resume_file_path=None,
+                   responses={str(q): "I usually plan my week on Sunday evening. " * 6 for q in range(10)},
+                   result=PROFILE, created_at=now)
+        for i in range(n)
+    ]
+    return candidates, assessments
+
+
+# Adapters are built once, outside the timed loop, as a route would at import time
+LIST_ADAPTERS = {schema: TypeAdapter(List[schema]) for schema in (AssessmentResponse, CandidateResponse)}
+
+
+def validate_rows(rows: Iterable[Any], schema: Type[BaseModel]) -> bytes:
+    adapter = LIST_ADAPTERS[schema]
+    return adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+
+
+def default_path(loop, rows, schema, response_class):
+    field = create_response_field(name="response", type_=List[schema])
+    content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+    return response_class(content).body
+
+
+def time_it(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(n_rows: int, repeat: int) -> None:
+    candidates, assessments = make_rows(n_rows)
+    loop = asyncio.new_event_loop()
+    print(f"{n_rows} rows per response, {repeat} repetitions\n")
+    print(f"{'endpoint':<24}{'default':>10}{'orjson':>10}{'adapter':>10}{'trusted':>10}   (ms/request)")
+    for name, rows, schema in (
+        ("read_candidates", candidates, CandidateResponse),
+        ("candidate_assessments", assessments, AssessmentResponse),
+    ):
+        timings = [
+            time_it(lambda: default_path(loop, rows, schema, JSONResponse), repeat),
+            time_it(lambda: default_path(loop, rows, schema, ORJSONResponse), repeat),
+            time_it(lambda: validate_rows(rows, schema), repeat),
+            time_it(lambda: serialize_rows(rows, schema).body, repeat),
+        ]
+        print(f"{name:<24}" + "".join(f"{t:>10.3f}" for t in timings))
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
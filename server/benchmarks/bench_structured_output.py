@@ -0,0 +1,73 @@
+# Structured Output Benchmark
+# Compares the legacy greedy-regex JSON extraction with the bracket-balanced
+# extractor over a corpus of model outputs, reporting success rate and parse time.
+#
+# Usage (from the server directory):
+#   python -m benchmarks.bench_structured_output [--corpus PATH] [--repeat N]
+
+import argparse
+import json
+import os
+import re
+import time
+
+from app.schemas.assessment import AssessmentResult, ResponseAnalysis
+from app.services.structured_output import StructuredOutputError, extract_json
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "model_outputs.jsonl")
+SCHEMAS = {"analysis": ResponseAnalysis, "profile": AssessmentResult}
+
+
+def legacy_extract(text, schema):
+    """The previous OpenRouterService._extract_json behaviour, plus schema validation."""
+    try:
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        data = json.loads(match.group(0) if match else text)
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    try:
+        return schema.model_validate(data).model_dump()
+    except Exception:
+        return None
+
+
+def balanced_extract(text, schema):
+    try:
+        return extract_json(text, schema)
+    except StructuredOutputError:
+        return None
+
+
+def run(corpus_path, repeat):
+    with open(corpus_path) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{len(corpus)} outputs, {repeat} repetitions each\n")
+    print(f"{'case':<30}{'legacy':>10}{'balanced':>10}{'legacy us':>12}{'balanced us':>13}")
+    totals = {"legacy": [0, 0.0], "balanced": [0, 0.0]}
+    for row in corpus:
+        schema = SCHEMAS[row["kind"]]
+        line = [f"{row['kind']}/{row['case']}"[:29]]
+        timings = []
+        for name, fn in (("legacy", legacy_extract), ("balanced", balanced_extract)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                result = fn(row["text"], schema)
+            elapsed = (time.perf_counter() - start) / repeat * 1e6
+            totals[name][0] += result is not None
+            totals[name][1] += elapsed
+            line.append("ok" if result is not None else "FAIL")
+            timings.append(f"{elapsed:.1f}")
+        print(f"{line[0]:<30}{line[1]:>10}{line[2]:>10}{timings[0]:>12}{timings[1]:>13}")
+
+    print()
+    for name, (ok, total_us) in totals.items():
+        print(f"{name:<10} parsed {ok}/{len(corpus)}  mean {total_us / len(corpus):.1f} us/output")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file with kind/case/text rows")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.corpus, args.repeat)
@@ -1,10 +1,17 @@
+import sys
 import uvicorn
-from app.main import app
 from app.init_db import init_db
 
 if __name__ == "__main__":
-    # Initialize database tables
-    init_db()
-    
-    # Run application
-    uvicorn.run("app.main:app", host="localhost", port=8000, reload=True)
\ No newline at end of file
+    if "--production" in sys.argv[1:]:
+        # Multi-worker gunicorn server bound to HOST (all interfaces by default), same as
+        # `python -m app.serve`; see `python -m app.serve --help` for worker and timeout options
+        from app.serve import main
+
+        main([arg for arg in sys.argv[1:] if arg != "--production"])
+    else:
+        # Initialize database tables
+        init_db()
+
+        # Run application
+        uvicorn.run("app.main:app", host="localhost", port=8000, reload=True)
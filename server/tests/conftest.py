@@ -0,0 +1,52 @@
+# Test configuration
+# Every test runs against a throwaway SQLite database. The environment is set before the
+# application is imported, since app.config reads it at import time.
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("QUESTION_POOL_ENABLED", "false")
+os.environ.setdefault("TRACING_EXPORTER", "none")
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LLM_MOCK_LATENCY_SECONDS", "0")
+
+import pytest
+
+from app.database import SessionLocal, engine
+from app.init_db import init_db
+from app.models.base import Base
+
+init_db()
+
+
+@pytest.fixture
+def db():
+    """A database session on empty tables."""
+    session = SessionLocal()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """A test client for the API, on empty tables."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization headers of a freshly registered user."""
+    client.post("/api/auth/register", json={"username": "tester", "email": "tester@example.com", "password": "secret123"})
+    token = client.post("/api/auth/token", data={"username": "tester", "password": "secret123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,30 @@
+from app.models.assessment import Assessment
+from app.models.candidate import Candidate
+from app.models.question import Question
+from app.services.adaptive_question_service import TRAITS, question_bank
+
+
+def test_invalid_frames_get_an_error_and_keep_the_session(client, auth_headers, db):
+    candidate = Candidate(name="Socket", email="socket@example.com")
+    db.add(candidate)
+    db.flush()
+    db.add_all(
+        Question(text=f"Question {i} about {trait}?", trait_category=trait, difficulty=1 + i % 5)
+        for trait in TRAITS for i in range(3)
+    )
+    assessment = Assessment(candidate_id=candidate.id, status="in_progress", responses={})
+    db.add(assessment)
+    db.commit()
+    question_bank.invalidate()
+
+    with client.websocket_connect(f"/api/assessments/{assessment.id}/session", headers=auth_headers) as websocket:
+        question = websocket.receive_json()
+        assert question["type"] == "question"
+
+        websocket.send_bytes(b"\x00\x01")
+        assert websocket.receive_json() == {"type": "error", "detail": "Messages must be JSON text"}
+        websocket.send_text("{not json")
+        assert websocket.receive_json() == {"type": "error", "detail": "Messages must be JSON text"}
+
+        websocket.send_json({"type": "answer", "question_id": question["question_id"], "response_text": "I plan ahead"})
+        assert websocket.receive_json()["type"] == "question"
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.models.assessment import Assessment
+from app.models.candidate import Candidate
+from app.models.question import Question
+from app.schemas.assessment import ResponseSubmit
+from app.services.assessment_service import AssessmentService
+
+
+def make_assessment(db, status="in_progress", responses=None, age_seconds=0):
+    candidate = Candidate(name="Status", email=f"status{datetime.now().timestamp()}@example.com")
+    db.add(candidate)
+    db.flush()
+    assessment = Assessment(candidate_id=candidate.id, status=status, responses=responses or {})
+    db.add(assessment)
+    db.commit()
+    if age_seconds:
+        set_age(db, assessment, age_seconds)
+    return assessment
+
+
+def make_question(db):
+    question = Question(text="How do you plan your week?", trait_category="conscientiousness")
+    db.add(question)
+    db.commit()
+    return question
+
+
+def set_age(db, assessment, age_seconds):
+    db.query(Assessment).filter(Assessment.id == assessment.id).update(
+        {"updated_at": datetime.now(timezone.utc) - timedelta(seconds=age_seconds)}, synchronize_session=False
+    )
+    db.commit()
+
+
+def status_of(db, assessment):
+    db.expire_all()
+    return db.get(Assessment, assessment.id).status
+
+
+def test_transition_status_only_moves_from_expected_status(db):
+    assessment = make_assessment(db)
+
+    assert AssessmentService.transition_status(db, assessment.id, "in_progress", "submitted")
+    assert not AssessmentService.transition_status(db, assessment.id, "in_progress", "submitted")
+    assert AssessmentService.transition_status(db, assessment.id, "submitted", "scoring")
+    db.commit()
+    assert status_of(db, assessment) == "scoring"
+
+
+def test_fresh_scoring_claim_is_not_taken_over(db):
+    assessment = make_assessment(db, status="scoring")
+
+    assert not AssessmentService.transition_status(db, assessment.id, "submitted", "scoring")
+    assert not AssessmentService.take_over_stale_claim(db, assessment.id)
+
+
+def test_stale_scoring_claim_is_taken_over_once(db):
+    assessment = make_assessment(db, status="scoring", age_seconds=settings.SCORING_CLAIM_TIMEOUT_SECONDS + 5)
+
+    assert AssessmentService.take_over_stale_claim(db, assessment.id)
+    db.commit()
+    # Taking the claim over renews it, so a second worker cannot take it too
+    assert not AssessmentService.take_over_stale_claim(db, assessment.id)
+    assert not AssessmentService.transition_status(db, assessment.id, "submitted", "scoring")
+
+    set_age(db, assessment, settings.SCORING_CLAIM_TIMEOUT_SECONDS + 5)
+    assert AssessmentService.transition_status(db, assessment.id, "submitted", "scoring")
+
+
+def test_submit_retry_scores_assessment_with_stale_claim(db, monkeypatch):
+    question = make_question(db)
+    assessment = make_assessment(
+        db, status="scoring", responses={str(question.id): "final answer"},
+        age_seconds=settings.SCORING_CLAIM_TIMEOUT_SECONDS + 5
+    )
+    scored = []
+
+    async def score_claimed(db, assessment, openrouter_service):
+        scored.append(assessment.id)
+        assessment.status = "completed"
+
+    monkeypatch.setattr(AssessmentService, "_score_claimed", staticmethod(score_claimed))
+    retry = ResponseSubmit(question_id=question.id, response_text="final answer")
+
+    result = asyncio.run(AssessmentService.submit_response(db, assessment.id, retry, None))
+    assert scored == [assessment.id]
+    assert result.status == "completed"
+
+    # Once completed, a retry only returns the assessment
+    asyncio.run(AssessmentService.submit_response(db, assessment.id, retry, None))
+    assert scored == [assessment.id]
+
+
+def test_submit_retry_leaves_fresh_claim_alone(db, monkeypatch):
+    question = make_question(db)
+    assessment = make_assessment(db, status="scoring", responses={str(question.id): "final answer"})
+    monkeypatch.setattr(AssessmentService, "_score_claimed", staticmethod(lambda *args: pytest.fail("scored twice")))
+
+    result = asyncio.run(AssessmentService.submit_response(
+        db, assessment.id, ResponseSubmit(question_id=question.id, response_text="final answer"), None
+    ))
+    assert result.status == "scoring"
+
+
+def test_result_of_unscored_assessment_points_to_stream(client, auth_headers, db):
+    assessment = make_assessment(db, status="submitted")
+
+    response = client.get(f"/api/assessments/{assessment.id}/result", headers=auth_headers)
+    assert response.status_code == 409
+    assert response.headers["location"] == f"/api/assessments/{assessment.id}/result/stream"
+
+
+def test_assessment_links_to_where_its_result_is(client, auth_headers, db):
+    assessment = make_assessment(db)
+    url = f"/api/assessments/{assessment.id}"
+
+    assert client.get(url, headers=auth_headers).json()["result_url"] is None
+    AssessmentService.transition_status(db, assessment.id, "in_progress", "submitted")
+    db.commit()
+    assert client.get(url, headers=auth_headers).json()["result_url"] == f"{url}/result/stream"
@@ -0,0 +1,24 @@
+from fastapi import Depends, FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_read_db
+
+
+def test_session_dependencies_serve_websockets():
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def socket(websocket: WebSocket, db: Session = Depends(get_db), read_db: Session = Depends(get_read_db)):
+        await websocket.accept()
+        db.commit()
+        await websocket.send_json({
+            "db": db.execute(text("SELECT 1")).scalar(),
+            "read_db": read_db.execute(text("SELECT 2")).scalar(),
+            "committed": websocket.state.db_committed,
+        })
+        await websocket.close()
+
+    with TestClient(app).websocket_connect("/ws") as websocket:
+        assert websocket.receive_json() == {"db": 1, "read_db": 2, "committed": True}
@@ -0,0 +1,51 @@
+from app.models.assessment import Assessment
+from app.models.candidate import Candidate
+from app.models.question import Question
+
+RESULT = {
+    "big_five": {"openness": 60.0}, "mbti": "ENFJ",
+    "strengths": ["Planning"], "weaknesses": [], "career_recommendations": ["Engineer"],
+}
+
+
+def test_result_etag_changes_with_rescore_in_same_second(client, auth_headers, db):
+    candidate = Candidate(name="Cache", email="cache@example.com")
+    db.add(candidate)
+    db.flush()
+    assessment = Assessment(candidate_id=candidate.id, status="completed", responses={}, result=RESULT)
+    db.add(assessment)
+    db.commit()
+    url = f"/api/assessments/{assessment.id}/result"
+
+    first = client.get(url, headers=auth_headers)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    # Rescored within the same second: updated_at does not change, the content does
+    db.query(Assessment).filter(Assessment.id == assessment.id).update(
+        {"result": {**RESULT, "mbti": "INTJ"}, "updated_at": assessment.created_at}, synchronize_session=False
+    )
+    db.commit()
+    second = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.json()["mbti"] == "INTJ"
+    assert second.headers["etag"] != etag
+
+
+def test_question_etag_changes_when_highest_id_is_reused(client, auth_headers, db):
+    db.add_all([Question(text="Do you plan ahead?", trait_category="conscientiousness"),
+                Question(text="Do you enjoy parties?", trait_category="extraversion")])
+    db.commit()
+
+    etag = client.get("/api/questions/", headers=auth_headers).headers["etag"]
+    last = db.query(Question).order_by(Question.id.desc()).first()
+    last_id, created_at = last.id, last.created_at
+    db.delete(last)
+    db.commit()
+    # Same ID, same timestamps, different question
+    db.add(Question(id=last_id, text="How do you handle stress?", trait_category="neuroticism", created_at=created_at))
+    db.commit()
+
+    response = client.get("/api/questions/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[-1]["text"] == "How do you handle stress?"
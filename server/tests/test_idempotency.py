@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.idempotency_service import (
+    IdempotencyInProgressError,
+    IdempotencyMismatchError,
+    IdempotencyService,
+)
+
+
+def test_key_replays_stored_response(db):
+    request_hash = IdempotencyService.request_hash({"candidate_id": 1})
+
+    record, replay = IdempotencyService.begin(db, "scope", "key-1", request_hash)
+    assert not replay
+    with pytest.raises(IdempotencyInProgressError):
+        IdempotencyService.begin(db, "scope", "key-1", request_hash)
+
+    IdempotencyService.complete(db, record, 201, {"id": 7})
+    record, replay = IdempotencyService.begin(db, "scope", "key-1", request_hash)
+    assert replay
+    assert (record.status_code, record.response) == (201, {"id": 7})
+
+
+def test_key_reused_for_other_request_conflicts(db):
+    record, _ = IdempotencyService.begin(db, "scope", "key-1", IdempotencyService.request_hash({"candidate_id": 1}))
+    IdempotencyService.complete(db, record, 201, {"id": 7})
+
+    with pytest.raises(IdempotencyMismatchError):
+        IdempotencyService.begin(db, "scope", "key-1", IdempotencyService.request_hash({"candidate_id": 2}))
+    # Keys are scoped per user and route
+    _, replay = IdempotencyService.begin(db, "other", "key-1", IdempotencyService.request_hash({"candidate_id": 2}))
+    assert not replay
+
+
+def test_released_key_runs_again(db):
+    request_hash = IdempotencyService.request_hash({"candidate_id": 1})
+    record, _ = IdempotencyService.begin(db, "scope", "key-1", request_hash)
+
+    IdempotencyService.release(db, record)
+    _, replay = IdempotencyService.begin(db, "scope", "key-1", request_hash)
+    assert not replay
+
+
+def test_create_assessment_with_idempotency_key(client, auth_headers):
+    candidate = client.post(
+        "/api/candidates/", json={"name": "Idem", "email": "idem@example.com"}, headers=auth_headers
+    ).json()
+    headers = {**auth_headers, "Idempotency-Key": "create-1"}
+
+    first = client.post("/api/assessments/", json={"candidate_id": candidate["id"]}, headers=headers)
+    retry = client.post("/api/assessments/", json={"candidate_id": candidate["id"]}, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers.get("idempotent-replayed") == "true"
+
+    other = client.post("/api/assessments/", json={"candidate_id": candidate["id"] + 1}, headers=headers)
+    assert other.status_code == 422
+
+    failed = client.post("/api/assessments/", json={"candidate_id": 9999}, headers={**auth_headers, "Idempotency-Key": "bad"})
+    retried = client.post("/api/assessments/", json={"candidate_id": 9999}, headers={**auth_headers, "Idempotency-Key": "bad"})
+    assert failed.status_code == retried.status_code == 400
+    assert "idempotent-replayed" not in retried.headers
@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from app.services.adaptive_question_service import TRAITS
+from app.services.profile_aggregation_service import ProfileAggregationService
+
+
+def test_identical_scores_give_that_score():
+    result = ProfileAggregationService.trait_scores({
+        "openness": [{"score": 80, "difficulty": 3} for _ in range(4)],
+    })["openness"]
+
+    assert result["score"] == 80.0
+    assert result["responses"] == 4
+    # No spread, so the interval comes from the noise of a single response: 12 / sqrt(4)
+    assert result["stderr"] == 6.0
+    assert (result["ci_low"], result["ci_high"]) == (68.2, 91.8)
+
+
+def test_trait_without_responses_gets_prior():
+    result = ProfileAggregationService.trait_scores({})["neuroticism"]
+
+    assert result == {"score": 50.0, "ci_low": 10.8, "ci_high": 89.2, "stderr": 20.0, "responses": 0}
+
+
+def test_confidence_weights_the_mean():
+    result = ProfileAggregationService.trait_scores({
+        "extraversion": [
+            {"score": 90, "confidence": 1.0, "difficulty": 3},
+            {"score": 30, "confidence": 0.25, "difficulty": 3},
+        ],
+    })["extraversion"]
+
+    assert 30 < result["score"] < 90
+    assert result["score"] > 60
+    assert result["ci_low"] < result["score"] < result["ci_high"]
+
+
+def test_dominant_weight_keeps_interval_bounded():
+    # One response outweighs the others, so the effective number of responses is close to 1
+    analyses = [{"score": 95, "confidence": 1.0, "difficulty": 3}, {"score": 5, "confidence": 0.05, "difficulty": 3}]
+    result = ProfileAggregationService.trait_scores({"agreeableness": analyses})["agreeableness"]
+
+    assert math.isfinite(result["stderr"])
+    # Uncapped, the n / (n - 1) correction of about 11 would give a standard error above 60
+    assert result["stderr"] < 30
+    assert 0.0 <= result["ci_low"] <= result["score"] <= result["ci_high"] <= 100.0
+
+
+@pytest.mark.parametrize("scores, expected", [
+    ({"extraversion": 70, "openness": 60, "agreeableness": 55, "conscientiousness": 80}, "ENFJ"),
+    ({"extraversion": 30, "openness": 40, "agreeableness": 45, "conscientiousness": 20}, "ISTP"),
+    ({"extraversion": 50, "openness": 49.9, "agreeableness": 50, "conscientiousness": 49.9}, "ESFP"),
+    ({}, "ENFJ"),
+])
+def test_mbti_mapping(scores, expected):
+    assert ProfileAggregationService.mbti(scores) == expected
+
+
+def test_score_profile_shape():
+    profile = ProfileAggregationService.score_profile({"openness": [{"score": 20, "difficulty": 1}]})
+
+    assert set(profile["big_five"]) == set(TRAITS)
+    assert profile["big_five"]["openness"] == 20.0
+    assert profile["big_five_intervals"]["openness"][0] < 20.0 < profile["big_five_intervals"]["openness"][1]
+    assert profile["mbti"] == "ESFJ"
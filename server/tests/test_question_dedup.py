@@ -0,0 +1,85 @@
+import pytest
+
+from app.models.question import Question
+from app.models.question_fingerprint import QuestionFingerprint
+from app.services.question_dedup_service import QuestionDedupService, jaccard, normalize, shingles
+
+PARAPHRASES = [
+    ("How do you handle tight deadlines?", "How do you handle a tight deadline?"),
+    ("Describe a time you were facing a difficult decision.", "Describe a time you had to face a difficult decision."),
+    ("Tell me about a conflict with a coworker and how you resolved it.",
+     "Tell me about a conflict with a colleague and how you resolved it."),
+    ("How do you respond to criticism of your work?", "How do you respond to feedback on your work?"),
+    ("Describe a time when you had to adapt to a new situation at work.",
+     "Tell us about a time you adapted to a new situation at work?"),
+    ("What do you do when you feel overwhelmed by stress at work?",
+     "What do you do when you are overwhelmed by stress at work?"),
+    ("How do you prepare for meeting new people at a social event?",
+     "How do you prepare to meet new people at social events?"),
+]
+
+# Different questions about the same trait
+UNRELATED = [
+    ("How do you handle tight deadlines?", "How do you keep your workspace organized?"),
+    ("Tell me about a conflict with a coworker and how you resolved it.",
+     "Tell me about a time you helped a colleague who was struggling."),
+    ("Describe a time you tried a new approach at work.", "Describe a time you learned a new skill outside work."),
+    ("What do you do when you feel overwhelmed by stress at work?", "What do you do when a project you care about fails?"),
+    ("How do you prepare for meeting new people at a social event?", "How do you recharge after a busy social event?"),
+]
+
+
+def test_stemming_is_consistent_across_word_forms():
+    assert normalize("deadline deadlines") == ["deadlin", "deadlin"]
+    assert normalize("face facing faced") == ["fac", "fac", "fac"]
+    assert normalize("story stories") == ["story", "story"]
+
+
+@pytest.mark.parametrize("first, second", PARAPHRASES)
+def test_paraphrases_are_similar(first, second):
+    assert jaccard(shingles(first), shingles(second)) >= 0.5
+
+
+@pytest.mark.parametrize("first, second", UNRELATED)
+def test_unrelated_questions_are_not_similar(first, second):
+    assert jaccard(shingles(first), shingles(second)) < 0.5
+
+
+def _save(db, text, trait="conscientiousness"):
+    question = Question(text=text, trait_category=trait, difficulty=2)
+    db.add(question)
+    db.flush()
+    QuestionDedupService.add_fingerprint(db, question)
+    db.commit()
+    return question
+
+
+@pytest.mark.parametrize("first, second", PARAPHRASES)
+def test_find_duplicate_merges_paraphrases(db, first, second):
+    existing = _save(db, first)
+    assert QuestionDedupService.find_duplicate(db, second, trait_category="conscientiousness").id == existing.id
+
+
+@pytest.mark.parametrize("first, second", UNRELATED)
+def test_find_duplicate_keeps_unrelated_questions(db, first, second):
+    _save(db, first)
+    assert QuestionDedupService.find_duplicate(db, second, trait_category="conscientiousness") is None
+
+
+def test_find_duplicate_ignores_other_traits(db):
+    _save(db, "How do you handle tight deadlines?", trait="neuroticism")
+    assert QuestionDedupService.find_duplicate(db, "How do you handle a tight deadline?", trait_category="openness") is None
+
+
+def test_dedup_bank_clusters_paraphrases_per_trait(db):
+    keep = _save(db, PARAPHRASES[0][0])
+    duplicate_id = _save(db, PARAPHRASES[0][1]).id
+    other = _save(db, UNRELATED[0][1])
+    other_trait = _save(db, PARAPHRASES[0][1], trait="neuroticism")
+
+    report = QuestionDedupService.dedup_bank(db, apply=True)
+
+    assert report["clusters"] == 1 and report["deleted"] == 1
+    remaining = {question_id for (question_id,) in db.query(Question.id)}
+    assert remaining == {keep.id, other.id, other_trait.id}
+    assert duplicate_id not in {row.question_id for row in db.query(QuestionFingerprint)}
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.refresh_token_service import RefreshTokenError, RefreshTokenService
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="rotator", email="rotator@example.com", password_hash="x", is_active=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def issue(db, user):
+    _, token = RefreshTokenService.issue(db, user)
+    db.commit()
+    return token
+
+
+def test_rotate_replaces_token(db, user):
+    token = issue(db, user)
+
+    rotated_user, new_token = RefreshTokenService.rotate(db, token)
+    assert rotated_user.id == user.id
+    assert new_token != token
+    with pytest.raises(RefreshTokenError):
+        RefreshTokenService.rotate(db, token)
+
+
+def test_reuse_of_rotated_token_revokes_family(db, user):
+    token = issue(db, user)
+    other_login = issue(db, user)
+    _, new_token = RefreshTokenService.rotate(db, token)
+    _, newest_token = RefreshTokenService.rotate(db, new_token)
+
+    with pytest.raises(RefreshTokenError, match="revoked"):
+        RefreshTokenService.rotate(db, token)
+    # The whole family is revoked, including the token the legitimate client holds ...
+    with pytest.raises(RefreshTokenError, match="revoked"):
+        RefreshTokenService.rotate(db, newest_token)
+    # ... but not the tokens of other logins
+    RefreshTokenService.rotate(db, other_login)
+
+
+def test_expired_and_unknown_tokens_are_rejected(db, user):
+    token = issue(db, user)
+    db.query(RefreshToken).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+
+    with pytest.raises(RefreshTokenError, match="expired"):
+        RefreshTokenService.rotate(db, token)
+    with pytest.raises(RefreshTokenError, match="Invalid"):
+        RefreshTokenService.rotate(db, "not-a-token")
+
+
+def test_refresh_and_logout_endpoints(client):
+    client.post("/api/auth/register", json={"username": "tester", "email": "tester@example.com", "password": "secret123"})
+    login = client.post("/api/auth/token", data={"username": "tester", "password": "secret123"}).json()
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert refreshed.status_code == 200
+    tokens = refreshed.json()
+    assert tokens["access_token"] and tokens["refresh_token"] != login["refresh_token"]
+    assert client.get("/api/auth/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}).status_code == 200
+
+    assert client.post("/api/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    login = client.post("/api/auth/token", data={"username": "tester", "password": "secret123"}).json()
+    assert client.post("/api/auth/logout", json={"refresh_token": login["refresh_token"]}).status_code == 204
+    assert client.post("/api/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
@@ -0,0 +1,86 @@
+# The PostgreSQL tsvector branch of SearchService.search is not covered here: these tests run
+# on SQLite (FTS5) only, plus the LIKE fallback used by other databases.
+
+from app.models.search_document import SearchDocument
+from app.services.search_service import SearchService, build_fts5_query
+
+
+def make_pdf(text: str) -> bytes:
+    """A one-page PDF showing `text`, enough for pypdf to extract it."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def test_uploaded_resume_is_found_by_search(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    candidate = client.post(
+        "/api/candidates/", json={"name": "Tester", "email": "tester@example.com"}, headers=auth_headers
+    ).json()
+    assessment = client.post("/api/assessments/", json={"candidate_id": candidate["id"]}, headers=auth_headers).json()
+
+    response = client.post(
+        "/api/assessments/upload-resume",
+        files={"resume": ("cv.pdf", make_pdf("Led the Kubernetes migration as platform team lead"), "application/pdf")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["assessment_id"] == assessment["id"]
+
+    hits = client.get("/api/search/", params={"q": 'kubernetes "team lead"'}, headers=auth_headers).json()
+    assert [(hit["assessment_id"], hit["kind"]) for hit in hits] == [(assessment["id"], "resume")]
+    assert "[Kubernetes]" in hits[0]["snippet"]
+
+
+def test_upload_resume_to_explicit_assessment(client, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    candidate = client.post(
+        "/api/candidates/", json={"name": "Other", "email": "other@example.com"}, headers=auth_headers
+    ).json()
+    assessment = client.post("/api/assessments/", json={"candidate_id": candidate["id"]}, headers=auth_headers).json()
+    pdf = make_pdf("Certified accountant")
+
+    response = client.post(
+        "/api/assessments/upload-resume", data={"assessment_id": str(assessment["id"])},
+        files={"resume": ("cv.pdf", pdf, "application/pdf")}, headers=auth_headers,
+    )
+    assert response.json()["assessment_id"] == assessment["id"]
+    missing = client.post(
+        "/api/assessments/upload-resume", data={"assessment_id": "999"},
+        files={"resume": ("cv.pdf", pdf, "application/pdf")}, headers=auth_headers,
+    )
+    assert missing.status_code == 404
+
+
+def test_fts5_query_quotes_terms_and_keeps_prefixes():
+    assert build_fts5_query('team* "lead dev" AND') == '"team"* "lead dev" "AND"'
+
+
+def test_like_fallback_matches_all_terms_and_escapes_wildcards(db):
+    db.add_all([
+        SearchDocument(assessment_id=1, candidate_id=1, kind="response", question_id=1,
+                       body="As team lead I ran the Kubernetes upgrade; kubernetes again later."),
+        SearchDocument(assessment_id=2, candidate_id=2, kind="resume", body="Team lead for 50% of kubernetes_ops."),
+        SearchDocument(assessment_id=3, candidate_id=3, kind="response", question_id=2, body="I enjoy painting."),
+    ])
+    db.commit()
+
+    hits = SearchService._like_search(db, 'kubernetes "team lead"', None, 0, 10, 100)
+    assert [hit["assessment_id"] for hit in hits] == [1, 2]
+    assert [hit["assessment_id"] for hit in SearchService._like_search(db, "50%", "resume", 0, 10, 100)] == [2]
+    assert SearchService._like_search(db, "x_o", None, 0, 10, 100) == []
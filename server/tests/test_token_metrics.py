@@ -0,0 +1,28 @@
+from app.services.token_budget import TokenMetrics
+
+
+def test_streamed_estimates_stay_out_of_reported_counts():
+    metrics = TokenMetrics()
+    metrics.record_call("analysis", 100)
+    metrics.record_usage("analysis", 120, 30)
+    # A streamed call: only estimates
+    metrics.record_call("analysis", 500)
+    metrics.record_estimated_completion("analysis", 200)
+
+    stats = metrics.stats()["analysis"]
+    assert (stats["prompt_tokens"], stats["completion_tokens"]) == (120, 30)
+    assert (stats["estimated_prompt_tokens"], stats["estimated_completion_tokens"]) == (600, 200)
+    assert (stats["calls"], stats["usage_reports"]) == (2, 1)
+    assert (stats["avg_prompt_tokens"], stats["avg_completion_tokens"]) == (120.0, 30.0)
+
+
+def test_averages_fall_back_to_estimates_without_reports():
+    metrics = TokenMetrics()
+    for _ in range(2):
+        metrics.record_call("profile", 300)
+        metrics.record_estimated_completion("profile", 50)
+    metrics.record_usage("profile", None, None)
+
+    stats = metrics.stats()["profile"]
+    assert stats["usage_reports"] == 0
+    assert (stats["avg_prompt_tokens"], stats["avg_completion_tokens"]) == (300.0, 50.0)